@@ -38,6 +38,25 @@ namespace AuroraDbManager.Database
             return File.Exists(_xboxGamesDbPath);
         }
         
+        /// <summary>
+        /// 检查数据库是否已迁移出TitleIdNum整数列（由import_xbox_data.py生成）
+        /// </summary>
+        /// <param name="connection">已打开的数据库连接</param>
+        /// <returns>是否存在TitleIdNum列</returns>
+        private static bool HasTitleIdNumColumn(SQLiteConnection connection)
+        {
+            using (var command = new SQLiteCommand("PRAGMA table_info(ContentItems)", connection))
+            using (var reader = command.ExecuteReader())
+            {
+                while (reader.Read())
+                {
+                    if (string.Equals(reader["name"]?.ToString(), "TitleIdNum", StringComparison.OrdinalIgnoreCase))
+                        return true;
+                }
+            }
+            return false;
+        }
+        
         /// <summary>
         /// 根据TitleId获取中文标题
         /// </summary>
@@ -54,14 +73,22 @@ namespace AuroraDbManager.Database
                 {
                     connection.Open();
                     
-                    // 将十六进制字符串转换为整数进行比较
-                    if (!int.TryParse(titleId, System.Globalization.NumberStyles.HexNumber, null, out int titleIdInt))
+                    // 将十六进制字符串转换为无符号32位整数进行比较
+                    if (!uint.TryParse(titleId, System.Globalization.NumberStyles.HexNumber, null, out uint titleIdNum))
                         return null;
                     
-                    using (var command = new SQLiteCommand(
-                        "SELECT Title_cn FROM ContentItems WHERE TitleId = @titleId LIMIT 1", connection))
+                    // 优先使用TitleIdNum覆盖索引，旧数据库回退到TitleId文本比较
+                    var useTitleIdNum = HasTitleIdNumColumn(connection);
+                    var sql = useTitleIdNum
+                        ? "SELECT Title, Title_cn FROM ContentItems WHERE TitleIdNum = @titleId LIMIT 1"
+                        : "SELECT Title, Title_cn FROM ContentItems WHERE TitleId = @titleId LIMIT 1";
+                    
+                    using (var command = new SQLiteCommand(sql, connection))
                     {
-                        command.Parameters.AddWithValue("@titleId", titleIdInt.ToString("x8")); // 转换为8位小写十六进制
+                        if (useTitleIdNum)
+                            command.Parameters.AddWithValue("@titleId", (long)titleIdNum);
+                        else
+                            command.Parameters.AddWithValue("@titleId", titleIdNum.ToString("x8")); // 转换为8位小写十六进制
                         
                         using (var reader = command.ExecuteReader())
                         {
@@ -111,19 +138,23 @@ namespace AuroraDbManager.Database
                     if (titleIdList.Count == 0)
                         return result;
                         
-                    var parameters = new List<string>();
+                    var useTitleIdNum = HasTitleIdNumColumn(connection);
                     using (var command = new SQLiteCommand())
                     {
                         command.Connection = connection;
-                        command.CommandText = "SELECT TitleId, Title, Title_cn FROM ContentItems WHERE TitleId IN (" + 
+                        command.CommandText = (useTitleIdNum
+                            ? "SELECT TitleIdNum AS TitleId, Title, Title_cn FROM ContentItems WHERE TitleIdNum IN ("
+                            : "SELECT TitleId, Title, Title_cn FROM ContentItems WHERE TitleId IN (") +
                             string.Join(",", titleIdList.Select((_, i) => "@titleId" + i)) + ")";
                         
                         for (int i = 0; i < titleIdList.Count; i++)
                         {
-                            // 转换为8位小写十六进制格式
-                            if (int.TryParse(titleIdList[i], System.Globalization.NumberStyles.HexNumber, null, out int titleIdInt))
+                            if (uint.TryParse(titleIdList[i], System.Globalization.NumberStyles.HexNumber, null, out uint titleIdNum))
                             {
-                                command.Parameters.AddWithValue("@titleId" + i, titleIdInt.ToString("x8"));
+                                if (useTitleIdNum)
+                                    command.Parameters.AddWithValue("@titleId" + i, (long)titleIdNum);
+                                else
+                                    command.Parameters.AddWithValue("@titleId" + i, titleIdNum.ToString("x8")); // 转换为8位小写十六进制格式
                             }
                         }
                         
@@ -131,7 +162,10 @@ namespace AuroraDbManager.Database
                         {
                             while (reader.Read())
                             {
-                                var dbTitleId = reader["TitleId"]?.ToString();
+                                // 统一转换为8位小写十六进制作为字典键
+                                var dbTitleId = useTitleIdNum
+                                    ? ((uint)Convert.ToInt64(reader["TitleId"])).ToString("x8")
+                                    : reader["TitleId"]?.ToString();
                                 var titleCn = reader["Title_cn"]?.ToString();
                                 var title = reader["Title"]?.ToString();
                                 
@@ -1,99 +1,213 @@
+import argparse
 import json
+import os
+import sqlite3
+import time
 
-def analyze_xbox_data():
-    # 读取更新后的游戏数据
-    with open('xbox360_games_updated.json', 'r', encoding='utf-8') as f:
-        games_data = json.load(f)
-    
-    # 读取翻译数据
-    with open('xbox_translations.json', 'r', encoding='utf-8') as f:
+from instrumentation import add_profile_arguments, span, start_profiling
+
+# 统计结果缓存在数据库的CatalogStats表中，由import_xbox_data.py导入后刷新
+STATS_TABLE_SQL = '''
+    CREATE TABLE IF NOT EXISTS CatalogStats (
+        Metric TEXT NOT NULL,
+        Key TEXT NOT NULL DEFAULT '',
+        Value INTEGER NOT NULL,
+        PRIMARY KEY (Metric, Key)
+    )
+'''
+
+# GROUP BY 统计使用的索引
+STATS_INDEXES = {
+    'IDX_ContentItems_Platform': 'Platform',
+    'IDX_ContentItems_Developer': 'Developer',
+    'IDX_ContentItems_Category': 'Category',
+    'IDX_ContentItems_Year': 'Year',
+    'IDX_ContentItems_Title': 'Title',
+}
+
+# 按列分组计数的统计项: 统计名 -> (列, 额外条件)
+GROUPED_METRICS = {
+    'platform': ('Platform', ''),
+    'developer': ('Developer', "AND Developer NOT IN ('', '???')"),
+    'category': ('Category', "AND Category != ''"),
+    'year': ('Year', "AND Year != ''"),
+}
+
+def refresh_catalog_stats(conn, source_duplicates=None):
+    """用SQL聚合重新计算统计信息并写入CatalogStats表
+
+    source_duplicates: 导入时源数据中重复出现的Title ID -> 出现次数
+    （数据库中TitleId唯一，重复只能在导入阶段统计）；为None时保留上次的结果。
+    """
+    cursor = conn.cursor()
+    cursor.execute(STATS_TABLE_SQL)
+    for index_name, column in STATS_INDEXES.items():
+        cursor.execute(f'CREATE INDEX IF NOT EXISTS {index_name} ON ContentItems({column})')
+
+    kept_metrics = () if source_duplicates is not None else ('duplicate_title_id',)
+    cursor.execute(f'''
+        DELETE FROM CatalogStats WHERE Metric NOT IN ({', '.join('?' * len(kept_metrics))})
+    ''', kept_metrics)
+
+    cursor.execute('''
+        INSERT INTO CatalogStats (Metric, Key, Value)
+        SELECT 'total', '', COUNT(*) FROM ContentItems
+        UNION ALL
+        SELECT 'with_chinese', '', COUNT(*) FROM ContentItems
+        WHERE Title_cn IS NOT NULL AND Title_cn != '' AND Title_cn != Title
+    ''')
+    for metric, (column, condition) in GROUPED_METRICS.items():
+        cursor.execute(f'''
+            INSERT INTO CatalogStats (Metric, Key, Value)
+            SELECT ?, COALESCE({column}, 'Unknown'), COUNT(*) FROM ContentItems
+            WHERE 1 {condition}
+            GROUP BY {column}
+        ''', (metric,))
+    # 同一标题对应多个Title ID
+    cursor.execute('''
+        INSERT INTO CatalogStats (Metric, Key, Value)
+        SELECT 'duplicate_title', Title, COUNT(*) FROM ContentItems
+        WHERE Title IS NOT NULL AND Title != ''
+        GROUP BY Title HAVING COUNT(*) > 1
+    ''')
+    if source_duplicates is not None:
+        cursor.executemany("INSERT INTO CatalogStats (Metric, Key, Value) VALUES ('duplicate_title_id', ?, ?)",
+                           sorted(source_duplicates.items()))
+    cursor.execute("INSERT INTO CatalogStats (Metric, Key, Value) VALUES ('refreshed_at', '', ?)",
+                   (int(time.time()),))
+
+def stats_available(conn):
+    row = conn.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'CatalogStats'").fetchone()
+    return row is not None and conn.execute('SELECT 1 FROM CatalogStats LIMIT 1').fetchone() is not None
+
+def load_report(conn, top_developers=20):
+    """从CatalogStats表读取统计报告（dict，可直接序列化为JSON）"""
+    def scalar(metric):
+        row = conn.execute('SELECT Value FROM CatalogStats WHERE Metric = ? AND Key = ?', (metric, '')).fetchone()
+        return row[0] if row else 0
+
+    def grouped(metric, limit=-1):
+        return dict(conn.execute('''
+            SELECT Key, Value FROM CatalogStats WHERE Metric = ?
+            ORDER BY Value DESC, Key LIMIT ?
+        ''', (metric, limit)).fetchall())
+
+    total = scalar('total')
+    with_chinese = scalar('with_chinese')
+    return {
+        'total_games': total,
+        'games_with_chinese': with_chinese,
+        'games_without_chinese': total - with_chinese,
+        'chinese_coverage': round(with_chinese / total * 100, 2) if total else 0.0,
+        'platforms': grouped('platform'),
+        'top_developers': grouped('developer', top_developers),
+        'categories': grouped('category'),
+        'years': grouped('year'),
+        'duplicate_title_ids': grouped('duplicate_title_id'),
+        'duplicate_titles': grouped('duplicate_title'),
+        'refreshed_at': scalar('refreshed_at'),
+    }
+
+def translation_usage(conn, translations_file):
+    """统计翻译数据中有多少英文标题在数据库中出现"""
+    with open(translations_file, 'r', encoding='utf-8') as f:
         translations_data = json.load(f)
-    
-    # 统计信息
-    total_games = len(games_data)
-    games_with_chinese = 0
-    games_without_chinese = 0
-    
-    # 平台统计
-    platform_count = {}
-    
-    # 开发商统计
-    developer_count = {}
-    
-    # 标题ID统计
-    title_id_count = {}
-    
-    # 分析游戏数据
-    for game in games_data:
-        # 统计中文标题
-        if 'Title_cn' in game and game['Title_cn'] != game['Title']:
-            games_with_chinese += 1
-        else:
-            games_without_chinese += 1
-        
-        # 统计平台
-        platform = game.get('Platform', 'Unknown')
-        platform_count[platform] = platform_count.get(platform, 0) + 1
-        
-        # 统计开发商
-        developer = game.get('Developer', 'Unknown')
-        if developer != '???':
-            developer_count[developer] = developer_count.get(developer, 0) + 1
-            
-        # 统计标题ID
-        title_id = game.get('TitleID', 'Unknown')
-        title_id_count[title_id] = title_id_count.get(title_id, 0) + 1
-    
+    game_titles = {row[0] for row in conn.execute('SELECT Title FROM ContentItems')}
+    unused = [title for title in translations_data if title not in game_titles]
+    return {
+        'total': len(translations_data),
+        'used': len(translations_data) - len(unused),
+        'unused': len(unused),
+        'unused_samples': unused[:10],
+    }
+
+def print_report(report):
     # 输出统计报告
+    total_games = report['total_games']
     print("=" * 60)
     print("Xbox 360 游戏数据统计报告")
     print("=" * 60)
     print(f"总游戏数量: {total_games}")
-    print(f"有中文标题的游戏: {games_with_chinese}")
-    print(f"无中文标题的游戏: {games_without_chinese}")
-    print(f"中文标题覆盖率: {games_with_chinese/total_games*100:.2f}%")
-    
+    print(f"有中文标题的游戏: {report['games_with_chinese']}")
+    print(f"无中文标题的游戏: {report['games_without_chinese']}")
+    print(f"中文标题覆盖率: {report['chinese_coverage']:.2f}%")
+
     print("\n平台分布:")
     print("-" * 30)
-    for platform, count in sorted(platform_count.items(), key=lambda x: x[1], reverse=True):
+    for platform, count in report['platforms'].items():
         print(f"{platform}: {count}")
-    
-    print("\n主要开发商 (Top 20):")
+
+    print(f"\n主要开发商 (Top {len(report['top_developers'])}):")
     print("-" * 30)
-    sorted_developers = sorted(developer_count.items(), key=lambda x: x[1], reverse=True)
-    for developer, count in sorted_developers[:20]:
+    for developer, count in report['top_developers'].items():
         print(f"{developer}: {count}")
-    
+
     print("\n重复标题ID:")
     print("-" * 30)
-    duplicate_ids = {tid: count for tid, count in title_id_count.items() if count > 1}
-    if duplicate_ids:
-        for tid, count in sorted(duplicate_ids.items(), key=lambda x: x[1], reverse=True):
+    if report['duplicate_title_ids']:
+        for tid, count in report['duplicate_title_ids'].items():
             print(f"{tid}: {count} 次出现")
     else:
         print("未发现重复的标题ID")
-    
-    # 检查翻译数据使用情况
-    print("\n翻译数据使用情况:")
+
+    print("\n对应多个标题ID的标题:")
     print("-" * 30)
-    used_translations = 0
-    unused_translations = []
-    
-    game_titles = {game['Title'] for game in games_data}
-    for english_title in translations_data:
-        if english_title in game_titles:
-            used_translations += 1
-        else:
-            unused_translations.append(english_title)
-    
-    print(f"翻译数据总数: {len(translations_data)}")
-    print(f"已使用的翻译: {used_translations}")
-    print(f"未使用的翻译: {len(unused_translations)}")
-    
-    if unused_translations:
-        print("\n部分未使用的翻译:")
-        for title in unused_translations[:10]:
-            print(f"- {title}")
+    if report['duplicate_titles']:
+        for title, count in report['duplicate_titles'].items():
+            print(f"{title}: {count} 个标题ID")
+    else:
+        print("未发现重复的标题")
+
+    usage = report.get('translation_usage')
+    if usage:
+        # 检查翻译数据使用情况
+        print("\n翻译数据使用情况:")
+        print("-" * 30)
+        print(f"翻译数据总数: {usage['total']}")
+        print(f"已使用的翻译: {usage['used']}")
+        print(f"未使用的翻译: {usage['unused']}")
+
+        if usage['unused_samples']:
+            print("\n部分未使用的翻译:")
+            for title in usage['unused_samples']:
+                print(f"- {title}")
+
+def analyze_xbox_data(db_file='xbox_games.db', output_json=False, refresh=False, translations_file=None):
+    """从数据库的CatalogStats表读取统计信息并输出报告（缓存不存在时先刷新）"""
+    if not os.path.exists(db_file):
+        print(f"错误: 找不到数据库 {db_file}，请先运行 import_xbox_data.py")
+        return None
+
+    conn = sqlite3.connect(db_file)
+    try:
+        if refresh or not stats_available(conn):
+            with span('refresh_stats'), conn:
+                refresh_catalog_stats(conn)
+        with span('load_report'):
+            report = load_report(conn)
+        if translations_file:
+            with span('translation_usage'):
+                report['translation_usage'] = translation_usage(conn, translations_file)
+    finally:
+        conn.close()
+
+    if output_json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        print_report(report)
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description='Xbox 360 游戏数据统计报告')
+    parser.add_argument('--db', default='xbox_games.db', help='游戏数据库')
+    parser.add_argument('--json', action='store_true', help='输出机器可读的JSON')
+    parser.add_argument('--refresh', action='store_true', help='重新计算统计缓存')
+    parser.add_argument('--translations', nargs='?', const='xbox_translations.json', metavar='FILE',
+                        help='同时统计翻译数据使用情况（默认 xbox_translations.json）')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    start_profiling(args, 'analyze_xbox_data')
+    analyze_xbox_data(args.db, args.json, args.refresh, args.translations)
 
 if __name__ == "__main__":
-    analyze_xbox_data()
\ No newline at end of file
+    main()
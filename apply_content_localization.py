@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Aurora content.db 批量本地化工具
+复制一份Aurora的content.db，ATTACH xbox_games.db 后用一条 UPDATE ... FROM 语句
+在单个事务中把所有匹配游戏的 TitleName 替换为中文标题（可选同时补充 Developer/Publisher/ReleaseDate），
+并报告修改内容。
+
+用法:
+    python apply_content_localization.py AuroraDbManager/content2.db [--output content2_cn.db]
+           [--games-db xbox_games.db] [--developer] [--publisher] [--release-date]
+"""
+
+import argparse
+import os
+import shutil
+import sqlite3
+
+from instrumentation import add_profile_arguments, count, span, start_profiling
+
+# 可选补充的字段: 参数名 -> (content.db列, xbox_games.db列)
+OPTIONAL_FIELDS = {
+    'developer': ('Developer', 'Developer'),
+    'publisher': ('Publisher', 'Publisher'),
+    'release_date': ('ReleaseDate', 'Year'),
+}
+
+# xbox_games.db 中表示未知的取值
+UNKNOWN_VALUES = ('', '???')
+
+def build_update_sql(fields):
+    """生成把中文标题及可选字段写入content.db的单条UPDATE语句"""
+    unknown = ', '.join(f"'{value}'" for value in UNKNOWN_VALUES)
+    # 只有中文标题与英文标题不同时才替换TitleName
+    values = {'TitleName': ("CASE WHEN x.Title_cn IS NOT NULL AND x.Title_cn != '' AND x.Title_cn != x.Title "
+                            "THEN x.Title_cn ELSE c.TitleName END")}
+    for field in fields:
+        content_column, games_column = OPTIONAL_FIELDS[field]
+        values[content_column] = (f"CASE WHEN x.{games_column} IS NOT NULL AND x.{games_column} NOT IN ({unknown}) "
+                                  f"THEN x.{games_column} ELSE c.{content_column} END")
+
+    assignments = ',\n            '.join(f'{column} = {value}' for column, value in values.items())
+    changed = '\n            OR '.join(f'c.{column} IS NOT ({value})' for column, value in values.items())
+    returning = ', '.join(values)
+    return f'''
+        UPDATE ContentItems AS c SET
+            {assignments}
+        FROM games.ContentItems AS x
+        WHERE x.TitleIdNum = (c.TitleId & 0xFFFFFFFF)
+          AND ({changed})
+        RETURNING Id, {returning}
+    '''
+
+def apply_content_localization(content_db, output_db, games_db='xbox_games.db', fields=()):
+    """复制content_db到output_db并批量写入本地化信息，返回 [(TitleId, 字段, 原值, 新值), ...]"""
+    if os.path.abspath(content_db) != os.path.abspath(output_db):
+        shutil.copy2(content_db, output_db)
+
+    columns = ['TitleName'] + [OPTIONAL_FIELDS[field][0] for field in fields]
+    conn = sqlite3.connect(output_db)
+    try:
+        conn.execute('ATTACH DATABASE ? AS games', (games_db,))
+
+        games_columns = {row[1] for row in conn.execute('PRAGMA games.table_info(ContentItems)')}
+        if 'TitleIdNum' not in games_columns:
+            raise ValueError(f"{games_db} 缺少TitleIdNum列，请先运行 import_xbox_data.py --migrate")
+
+        # 记录修改前的值用于生成报告
+        before = {row[0]: row[1:] for row in conn.execute(
+            f'SELECT Id, TitleId, {", ".join(columns)} FROM ContentItems')}
+
+        with span('update'), conn:
+            updated_rows = conn.execute(build_update_sql(fields)).fetchall()
+        count('rows_updated', len(updated_rows))
+    finally:
+        conn.close()
+
+    changes = []
+    for row in updated_rows:
+        old = before[row[0]]
+        title_id = old[0] & 0xFFFFFFFF
+        for column, old_value, new_value in zip(columns, old[1:], row[1:]):
+            if old_value != new_value:
+                changes.append((f'{title_id:08X}', column, old_value, new_value))
+    return changes
+
+def main():
+    parser = argparse.ArgumentParser(description='用xbox_games.db批量本地化Aurora content.db')
+    parser.add_argument('content_db', help='Aurora的content.db')
+    parser.add_argument('--output', help='输出文件（默认 <原文件名>_cn.db）')
+    parser.add_argument('--games-db', default='xbox_games.db', help='包含中文标题的xbox_games.db')
+    parser.add_argument('--developer', action='store_true', help='同时补充开发商')
+    parser.add_argument('--publisher', action='store_true', help='同时补充发行商')
+    parser.add_argument('--release-date', action='store_true', help='同时用年份补充发行日期')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    start_profiling(args, 'apply_content_localization')
+
+    for path in (args.content_db, args.games_db):
+        if not os.path.exists(path):
+            print(f"错误: 找不到文件 {path}")
+            return
+
+    output_db = args.output or os.path.splitext(args.content_db)[0] + '_cn.db'
+    fields = [field for field in OPTIONAL_FIELDS if getattr(args, field)]
+
+    try:
+        changes = apply_content_localization(args.content_db, output_db, args.games_db, fields)
+    except (sqlite3.Error, ValueError) as e:
+        print(f"本地化失败: {e}")
+        return
+
+    print("本地化完成！")
+    print("=" * 60)
+    for title_id, column, old_value, new_value in changes:
+        print(f"{title_id} {column}: {old_value} -> {new_value}")
+    print("=" * 60)
+    print(f"共修改 {len({change[0] for change in changes})} 个游戏, {len(changes)} 个字段")
+    print(f"输出文件: {output_db}")
+
+if __name__ == "__main__":
+    main()
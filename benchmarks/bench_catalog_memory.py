@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+内存目录基准测试
+用合成的N倍目录（默认100倍）比较 json.load 得到的 list-of-dicts 与列式 Catalog 的
+常驻内存（tracemalloc统计），以及按TitleId/开发商+年份/发行商前缀查找和按分类计数的耗时。
+
+用法:
+    python benchmarks/bench_catalog_memory.py [--scale 100] [--repeat 20]
+"""
+
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from bench_pipeline import load_seed, synthetic_games  # noqa: E402
+from catalog import Catalog  # noqa: E402
+
+def write_merged_catalog(path, scale, seed=360):
+    """生成与 xbox360_games_updated.json 格式相同的N倍合成目录，返回游戏数"""
+    rng = random.Random(seed + scale)
+    seed_games, seed_translations = load_seed()
+    games = []
+    for index, game in enumerate(synthetic_games(seed_games, len(seed_games) * scale, rng)):
+        chinese = game.pop('Chinese')
+        game['Title_cn'] = seed_translations[index % len(seed_translations)] if chinese else game['Title']
+        games.append(game)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(games, f, ensure_ascii=False)
+    return len(games)
+
+def measure(load):
+    """返回 (load()的结果, 常驻内存MB, 峰值内存MB, 耗时秒)"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = load()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current / 1024 / 1024, peak / 1024 / 1024, elapsed
+
+def load_dicts(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def time_queries(label, repeat, queries):
+    results = {}
+    for name, query in queries:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            value = query()
+        results[name] = value
+        print(f"  {label:<14}{name:<22}{(time.perf_counter() - start) / repeat * 1000:>10.3f} ms")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='比较list-of-dicts与列式Catalog的内存占用和查询耗时')
+    parser.add_argument('--scale', type=int, default=100, help='合成目录相对真实目录的倍数')
+    parser.add_argument('--repeat', type=int, default=20, help='每个查询的重复次数')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        path = os.path.join(work_dir, 'xbox360_games_updated.json')
+        count = write_merged_catalog(path, args.scale)
+        print(f"合成目录: {args.scale}x, {count} 个游戏, JSON {os.path.getsize(path) / 1024 / 1024:.1f} MB")
+        print("-" * 60)
+
+        games, dict_mb, dict_peak, dict_time = measure(lambda: load_dicts(path))
+        print(f"{'list-of-dicts':<14} 常驻 {dict_mb:8.1f} MB, 峰值 {dict_peak:8.1f} MB, 加载 {dict_time:6.2f}s")
+        catalog, catalog_mb, catalog_peak, catalog_time = measure(lambda: Catalog.load(path))
+        print(f"{'Catalog':<14} 常驻 {catalog_mb:8.1f} MB, 峰值 {catalog_peak:8.1f} MB, 加载 {catalog_time:6.2f}s")
+        print(f"常驻内存减少 {(1 - catalog_mb / dict_mb) * 100:.1f}%")
+
+    sample = games[len(games) // 2]
+    title_id, developer, year = sample['Title ID'], sample['Developer'], sample['Year']
+    prefix = int(title_id, 16) >> 16
+
+    print("-" * 60)
+    dict_results = time_queries('list-of-dicts', args.repeat, (
+        ('按TitleId', lambda: next(game for game in games if game['Title ID'] == title_id)),
+        ('开发商+年份', lambda: [game for game in games if game['Developer'] == developer and game['Year'] == year]),
+        ('发行商前缀', lambda: [game for game in games if int(game['Title ID'], 16) >> 16 == prefix]),
+        ('按分类计数', lambda: Counter(game['Category'] for game in games)),
+    ))
+    catalog_results = time_queries('Catalog', args.repeat, (
+        ('按TitleId', lambda: catalog.get(title_id)),
+        ('开发商+年份', lambda: catalog.find(developer=developer, year=year)),
+        ('发行商前缀', lambda: catalog.find(prefix=prefix)),
+        ('按分类计数', lambda: catalog.group_counts('Category')),
+    ))
+
+    if (dict_results['按TitleId'] != catalog_results['按TitleId']
+            or dict_results['开发商+年份'] != catalog_results['开发商+年份']
+            or dict_results['发行商前缀'] != catalog_results['发行商前缀']
+            or dict_results['按分类计数'] != catalog_results['按分类计数']):
+        print("错误: 两种实现的查询结果不一致")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
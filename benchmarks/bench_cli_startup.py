@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+命令行启动时间检查
+在独立子进程中运行 xbox_cli.py 的 --help、不带子命令的调用以及每个子命令的 --help，
+取多次运行中的最短耗时，任何一项超过毫秒预算时以非零状态退出；
+同时检查不带子命令的调用没有导入任何子命令模块（子命令必须按需加载）。
+
+用法:
+    python benchmarks/bench_cli_startup.py [--budget-ms 250] [--repeat 5]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from xbox_cli import COMMANDS  # noqa: E402
+
+CLI = os.path.join(ROOT_DIR, 'xbox_cli.py')
+
+# 默认预算（毫秒），包含解释器本身约10~20ms的启动时间
+DEFAULT_BUDGET_MS = 250
+
+# 在子进程中不带子命令运行入口后，列出已导入的子命令模块（最后一行）
+LAZY_CHECK = '''
+import sys
+sys.argv = [{cli!r}]
+import xbox_cli
+xbox_cli.main([])
+print('imported:', *sorted(module for module, _ in xbox_cli.COMMANDS.values() if module in sys.modules))
+'''
+
+def time_invocation(args, repeat):
+    """返回多次运行中的最短耗时（毫秒）；调用失败时抛出RuntimeError"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, CLI] + args, cwd=ROOT_DIR,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        elapsed = (time.perf_counter() - start) * 1000
+        if result.returncode != 0:
+            raise RuntimeError(f"{' '.join(args)} 退出状态 {result.returncode}: "
+                               f"{result.stderr.decode('utf-8', 'replace').strip()}")
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def eagerly_imported():
+    """不带子命令调用入口时被导入的子命令模块"""
+    code = LAZY_CHECK.format(cli=CLI)
+    output = subprocess.run([sys.executable, '-c', code], cwd=ROOT_DIR, check=True,
+                            capture_output=True, text=True).stdout
+    return output.strip().splitlines()[-1].split()[1:]
+
+def main():
+    parser = argparse.ArgumentParser(description='检查统一入口及各子命令 --help 的启动时间')
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS,
+                        help=f'每次调用允许的最长耗时(默认 {DEFAULT_BUDGET_MS}ms)')
+    parser.add_argument('--repeat', type=int, default=5, help='每项运行次数，取最短耗时')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', 'pass'], check=True)
+    baseline = (time.perf_counter() - start) * 1000
+    print(f"Python {sys.version.split()[0]}, 空解释器启动 {baseline:.1f}ms, 预算 {args.budget_ms:.0f}ms")
+    print("-" * 60)
+
+    invocations = [[], ['--help']] + [[name, '--help'] for name in COMMANDS]
+    over_budget = []
+    for invocation in invocations:
+        label = ' '.join(invocation) or '(无参数)'
+        try:
+            elapsed = time_invocation(invocation, args.repeat)
+        except RuntimeError as e:
+            print(f"  {label:<24}失败: {e}")
+            over_budget.append(label)
+            continue
+        flag = '' if elapsed <= args.budget_ms else '  超出预算'
+        print(f"  {label:<24}{elapsed:>8.1f} ms{flag}")
+        if flag:
+            over_budget.append(label)
+
+    imported = eagerly_imported()
+    if imported:
+        print(f"\n错误: 不带子命令的调用导入了 {', '.join(imported)}")
+    if over_budget or imported:
+        if over_budget:
+            print(f"\n超出预算或失败: {', '.join(over_budget)}")
+        sys.exit(1)
+    print("\n全部调用都在预算之内")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地查询服务压力测试
+用多个并发客户端（每个客户端一个保持连接的HTTP连接）反复发送批量查询，
+报告不同并发数下的每秒请求数、每秒查询TitleId数和延迟分位数。
+默认在本进程中启动一个查询服务，也可以用 --url 测试已经运行的服务。
+
+用法:
+    python benchmarks/bench_lookup_server.py [--db xbox_games.db] [--clients 1 4 16 64]
+           [--batch 50] [--duration 5] [--url http://127.0.0.1:8360]
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import sqlite3
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from lookup_server import create_server  # noqa: E402
+
+def load_title_ids(db_file):
+    conn = sqlite3.connect(db_file)
+    try:
+        return [row[0] for row in conn.execute('SELECT TitleId FROM ContentItems')]
+    finally:
+        conn.close()
+
+def client_worker(host, port, title_ids, batch, miss_ratio, deadline, latencies, errors, seed):
+    """持续发送批量查询直到deadline，记录每个请求的延迟"""
+    rng = random.Random(seed)
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    try:
+        while time.perf_counter() < deadline:
+            ids = [rng.choice(title_ids) if rng.random() >= miss_ratio else f'{rng.getrandbits(32):08x}'
+                   for _ in range(batch)]
+            body = json.dumps({'titleIds': ids})
+            start = time.perf_counter()
+            conn.request('POST', '/titles', body, {'Content-Type': 'application/json'})
+            response = conn.getresponse()
+            response.read()
+            latencies.append(time.perf_counter() - start)
+            if response.status != 200:
+                errors.append(response.status)
+    except OSError as e:
+        errors.append(str(e))
+    finally:
+        conn.close()
+
+def run_level(host, port, title_ids, clients, batch, duration, miss_ratio):
+    latencies = []
+    errors = []
+    deadline = time.perf_counter() + duration
+    threads = [threading.Thread(target=client_worker,
+                                args=(host, port, title_ids, batch, miss_ratio, deadline, latencies, errors, index))
+               for index in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return latencies, errors, elapsed
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+def main():
+    parser = argparse.ArgumentParser(description='本地查询服务并发压力测试')
+    parser.add_argument('--db', default=os.path.join(ROOT_DIR, 'xbox_games.db'), help='游戏数据库')
+    parser.add_argument('--url', help='已运行的查询服务地址（默认在本进程中启动）')
+    parser.add_argument('--clients', type=int, nargs='+', default=[1, 4, 16, 64], help='并发客户端数')
+    parser.add_argument('--batch', type=int, default=50, help='每个请求查询的TitleId数')
+    parser.add_argument('--duration', type=float, default=5.0, help='每个并发级别的持续时间（秒）')
+    parser.add_argument('--miss-ratio', type=float, default=0.05, help='请求中不存在的TitleId比例')
+    parser.add_argument('--pool-size', type=int, default=8, help='本进程启动服务时的连接数')
+    args = parser.parse_args()
+
+    title_ids = load_title_ids(args.db)
+    server = None
+    if args.url:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port
+    else:
+        server = create_server(args.db, port=0, pool_size=args.pool_size)
+        host, port = server.server_address
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    print(f"查询服务: http://{host}:{port}/, 数据库中 {len(title_ids)} 个TitleId, 每请求 {args.batch} 个")
+    print(f"{'并发':>6}{'请求/秒':>12}{'TitleId/秒':>14}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}{'错误':>6}")
+    print("-" * 68)
+    failed = False
+    try:
+        for clients in args.clients:
+            latencies, errors, elapsed = run_level(host, port, title_ids, clients, args.batch,
+                                                   args.duration, args.miss_ratio)
+            requests_per_second = len(latencies) / elapsed
+            print(f"{clients:>6}{requests_per_second:>12.0f}{requests_per_second * args.batch:>14.0f}"
+                  f"{percentile(latencies, 0.50) * 1000:>10.2f}{percentile(latencies, 0.95) * 1000:>10.2f}"
+                  f"{percentile(latencies, 0.99) * 1000:>10.2f}{len(errors):>6}")
+            failed = failed or bool(errors)
+    finally:
+        if server is not None:
+            stats = server.lookup.stats()
+            print("-" * 68)
+            print(f"缓存命中率 {stats['cache_hit_rate'] * 100:.1f}%, SQL查询 {stats['sql_queries']} 次")
+            server.shutdown()
+            server.server_close()
+
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
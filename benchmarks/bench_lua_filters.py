@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Lua过滤器刷新开销基准测试
+分别用 or 链式比较、set 查表和 range 区间查找模式生成全部分类过滤器，
+在本地Lua解释器中模拟Aurora的一次过滤刷新（每个分类过滤器对库中每个游戏求值一次），
+比较各模式的耗时和文件大小，并校验匹配结果一致。
+
+用法:
+    python benchmarks/bench_lua_filters.py [--lua luajit] [--library content.db] [--refreshes 20]
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from generate_lua_filters import LUA_MODES, Xbox360LuaGenerator  # noqa: E402
+
+# 默认使用仓库中的Aurora示例库（644个游戏）模拟主机上的游戏库
+DEFAULT_LIBRARY = os.path.join(ROOT_DIR, 'AuroraDbManager', 'content2.db')
+
+LUA_DRIVER = '''GameListFilterCategories = { User = {} }
+for _, path in ipairs(FilterFiles) do
+    dofile(path)
+end
+local items = {}
+for i, id in ipairs(LibraryTitleIds) do
+    items[i] = { TitleId = id }
+end
+local matched = 0
+local start = os.clock()
+for r = 1, Refreshes do
+    for _, filter in pairs(GameListFilterCategories.User) do
+        for i = 1, #items do
+            if filter(items[i]) then
+                matched = matched + 1
+            end
+        end
+    end
+end
+print(string.format("%.6f %d", os.clock() - start, matched))
+'''
+
+def find_lua(preferred=None):
+    """查找本地Lua解释器"""
+    candidates = [preferred] if preferred else ['luajit', 'lua', 'lua5.4', 'lua5.3', 'lua5.1']
+    for name in candidates:
+        path = shutil.which(name)
+        if path:
+            return path
+    return None
+
+def load_library_title_ids(library, size, catalog_ids):
+    """从Aurora content.db读取TitleId，找不到时从目录中随机抽取size个"""
+    if library and os.path.exists(library):
+        conn = sqlite3.connect(library)
+        try:
+            rows = conn.execute('SELECT TitleId FROM ContentItems WHERE TitleId IS NOT NULL').fetchall()
+        finally:
+            conn.close()
+        title_ids = [row[0] & 0xFFFFFFFF for row in rows]
+        if title_ids:
+            return title_ids
+    rng = random.Random(360)
+    return [rng.choice(catalog_ids) for _ in range(size)]
+
+def generate_filters(mode, categories, output_dir):
+    """以指定模式生成全部分类Lua文件，返回文件路径列表和总字节数"""
+    generator = Xbox360LuaGenerator(mode=mode)
+    paths = []
+    total_bytes = 0
+    for index, (category, games) in enumerate(sorted(categories.items())):
+        if not games:
+            continue
+        content = generator.build_lua_content(category, games)
+        path = os.path.join(output_dir, f"{mode}_{index}.lua")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        paths.append(path)
+        total_bytes += len(content.encode('utf-8'))
+    return paths, total_bytes
+
+def run_driver(lua, filter_files, title_ids, refreshes, work_dir, mode):
+    """运行Lua驱动脚本，返回 (总耗时秒, 匹配次数)"""
+    driver = os.path.join(work_dir, f"driver_{mode}.lua")
+    with open(driver, 'w', encoding='utf-8') as f:
+        f.write("FilterFiles = {\n")
+        f.write("".join(f"  {lua_string(path)},\n" for path in filter_files))
+        f.write("}\nLibraryTitleIds = {\n")
+        f.write("".join(f"  0x{title_id:08X},\n" for title_id in title_ids))
+        f.write(f"}}\nRefreshes = {refreshes}\n")
+        f.write(LUA_DRIVER)
+    output = subprocess.run([lua, driver], check=True, capture_output=True, text=True).stdout.split()
+    return float(output[0]), int(output[1])
+
+def lua_string(value):
+    return '"' + value.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+def main():
+    parser = argparse.ArgumentParser(description='比较 or 链、set 查表和 range 区间查找Lua过滤器的刷新开销')
+    parser.add_argument('--lua', help='Lua解释器（默认依次查找 luajit/lua/lua5.4/lua5.3/lua5.1）')
+    parser.add_argument('--library', default=DEFAULT_LIBRARY, help='Aurora content.db，用其中的TitleId模拟游戏库')
+    parser.add_argument('--library-size', type=int, default=650, help='找不到content.db时随机抽取的游戏数')
+    parser.add_argument('--refreshes', type=int, default=20, help='模拟的过滤刷新次数')
+    args = parser.parse_args()
+
+    lua = find_lua(args.lua)
+    if not lua:
+        print("错误: 找不到Lua解释器，请安装 lua/luajit 或用 --lua 指定")
+        sys.exit(1)
+
+    generator = Xbox360LuaGenerator()
+    games = generator.parse_game_file(os.path.join(ROOT_DIR, 'xbox360.txt'))
+    games += generator.parse_game_file(os.path.join(ROOT_DIR, 'xbox360live.txt'))
+    categories = generator.categorize_games(games)
+    catalog_ids = [int(game['hex_id'], 16) for game in games if game['hex_id']]
+    title_ids = load_library_title_ids(args.library, args.library_size, catalog_ids)
+
+    print(f"Lua解释器: {lua}")
+    print(f"分类数: {len(categories)}, 游戏库: {len(title_ids)} 个游戏, 刷新次数: {args.refreshes}")
+    print("-" * 60)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        for mode in LUA_MODES:
+            filter_files, total_bytes = generate_filters(mode, categories, work_dir)
+            elapsed, matched = run_driver(lua, filter_files, title_ids, args.refreshes, work_dir, mode)
+            results[mode] = (elapsed, matched)
+            print(f"{mode:>5}: 每次刷新 {elapsed / args.refreshes * 1000:.3f} ms, "
+                  f"匹配 {matched // args.refreshes} 次, 过滤器文件 {total_bytes / 1024:.1f} KB")
+
+    print("-" * 60)
+    if len({matched for _, matched in results.values()}) > 1:
+        print("错误: 各模式的匹配结果不一致")
+        sys.exit(1)
+    for mode in LUA_MODES[1:]:
+        if results[mode][0] > 0:
+            print(f"{mode} 模式加速比: {results['or'][0] / results[mode][0]:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据处理流程基准测试
+以仓库中的真实数据为种子，生成当前规模（约2,700个游戏）10×/100×/1000× 的合成输入：
+制表符分隔游戏列表、游戏JSON、翻译JSON 和 Redump风格的XML datfile；
+然后在独立子进程中依次运行各个处理阶段，记录耗时、峰值内存(RSS)和输出大小，
+并与保存的基线比较；同一阶段在相邻两个规模之间的耗时增长超过线性上限（超线性）时也视为退化，
+出现退化时以非零状态退出。
+
+阶段: parse_txt, merge, import, lua, analyze, datfile
+
+用法:
+    python benchmarks/bench_pipeline.py [--scales 1 10 100] [--stages merge import]
+    python benchmarks/bench_pipeline.py --scales 1 10 --update-baseline
+"""
+
+import argparse
+import contextlib
+import hashlib
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from xml.sax.saxutils import escape, quoteattr
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from instrumentation import peak_rss_mb  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pipeline_baseline.json')
+DEFAULT_SCALES = (1, 10)
+STAGES = ('parse_txt', 'merge', 'import', 'lua', 'analyze', 'datfile')
+
+# 超过基线多少倍视为退化；耗时另加绝对容差，避免毫秒级阶段因抖动误报
+MAX_SLOWDOWN = 1.5
+MAX_MEMORY_GROWTH = 1.25
+MAX_OUTPUT_GROWTH = 1.10
+WALL_SLACK_SECONDS = 0.25
+# 规模扩大N倍时耗时最多增长 N * MAX_SCALING_EXCESS 倍（另加绝对容差），超过视为超线性
+MAX_SCALING_EXCESS = 1.5
+
+# 合成数据的分布，按仓库中现有数据的比例估算
+JSON_RATIO = 0.65          # 出现在游戏JSON中的比例（其余只在txt中）
+TXT_RATIO = 0.90           # 出现在txt列表中的比例
+LIVE_RATIO = 0.25          # txt中属于XBLA列表的比例
+TRANSLATED_RATIO = 0.60    # 有中文翻译的比例
+DISCS_PER_GAME = 1.3       # Redump光盘条目与游戏数之比
+REGIONS = ('USA', 'Europe', 'Japan', 'USA, Europe', 'World', 'Asia', 'Korea')
+LANGUAGES = ('En', 'En,Fr,De,Es,It', 'Ja', 'En,Ja,Fr,De,Es,It,Zh,Ko')
+
+# 种子数据
+SEED_GAMES_FILE = os.path.join(ROOT_DIR, 'xbox360_games_updated.json')
+SEED_TRANSLATIONS_FILE = os.path.join(ROOT_DIR, 'xbox_translations.json')
+
+# 各阶段在工作目录中使用的文件
+GAMES_FILE = 'xbox360_games.json'
+TRANSLATIONS_FILE = 'xbox_translations.json'
+XBOX360_FILE = 'xbox360.txt'
+XBOXLIVE_FILE = 'xbox360live.txt'
+DATFILE = 'datfile.dat'
+MERGED_FILE = 'xbox360_games_updated.json'
+DB_FILE = 'xbox_games.db'
+REDUMP_DB_FILE = 'redump.db'
+LUA_DIR = 'lua'
+REPORT_FILE = 'report.json'
+
+def load_seed():
+    """读取仓库中的游戏和翻译数据作为合成数据的种子"""
+    with open(SEED_GAMES_FILE, 'r', encoding='utf-8') as f:
+        games = json.load(f)
+    with open(SEED_TRANSLATIONS_FILE, 'r', encoding='utf-8') as f:
+        translations = list(json.load(f).values())
+    return games, translations
+
+def synthetic_games(seed_games, count, rng):
+    """生成count个Title ID唯一的游戏
+
+    前一批直接使用种子游戏的标题，之后的标题由种子标题中的词随机组合而成，
+    使标题的字符分布与真实目录接近，而不是同一标题的大量变体。
+    """
+    title_ids = set()
+    developers = sorted({game.get('Developer') or '???' for game in seed_games})
+    categories = sorted({game.get('Category') or '' for game in seed_games} - {''})
+    words = [word for game in seed_games for word in (game.get('Title') or '').split()]
+    for index in range(count):
+        seed = seed_games[index % len(seed_games)]
+        while True:
+            title_id = rng.getrandbits(32)
+            if title_id not in title_ids:
+                title_ids.add(title_id)
+                break
+        if index < len(seed_games):
+            title = seed.get('Title') or 'Untitled'
+        else:
+            title = ' '.join(rng.choice(words) for _ in range(rng.randint(2, 5)))
+            if rng.random() < 0.2:
+                title += f' {rng.randint(2, 5)}'
+        yield {
+            'Title ID': f'{title_id:08x}',
+            'Title': title,
+            'Developer': rng.choice(developers),
+            'Publisher': seed.get('Publisher') or '???',
+            'Platform': seed.get('Platform') or 'Xbox 360',
+            'Folder Title': title,
+            'Category': rng.choice(categories),
+            'Year': str(rng.randint(2005, 2016)) if rng.random() < 0.45 else '',
+            'Chinese': rng.random() < TRANSLATED_RATIO,
+        }
+
+def generate_inputs(work_dir, scale, seed=360):
+    """在work_dir中生成指定倍数的全部合成输入，返回游戏数量"""
+    rng = random.Random(seed + scale)
+    seed_games, seed_translations = load_seed()
+    count = len(seed_games) * scale
+
+    header = 'Title ID\tGame\t \tDeveloper\tCategory\tYear\n'
+    translations = {}
+    with open(os.path.join(work_dir, GAMES_FILE), 'w', encoding='utf-8') as games_file, \
+         open(os.path.join(work_dir, XBOX360_FILE), 'w', encoding='utf-8-sig') as retail_file, \
+         open(os.path.join(work_dir, XBOXLIVE_FILE), 'w', encoding='utf-8') as live_file, \
+         open(os.path.join(work_dir, DATFILE), 'w', encoding='utf-8') as dat_file:
+        retail_file.write(header)
+        live_file.write(header)
+        dat_file.write('<?xml version="1.0"?>\n<datafile>\n\t<header>\n'
+                       f'\t\t<name>Synthetic - Xbox 360</name>\n'
+                       f'\t\t<description>Synthetic Xbox 360 Discs ({scale}x)</description>\n'
+                       f'\t\t<version>{scale}x</version>\n\t</header>\n')
+        games_file.write('[')
+        first = True
+        for index, game in enumerate(synthetic_games(seed_games, count, rng)):
+            if game.pop('Chinese'):
+                translations[game['Title']] = seed_translations[index % len(seed_translations)]
+
+            if rng.random() < JSON_RATIO:
+                record = {field: game[field] for field in
+                          ('Platform', 'Title', 'Title ID', 'Developer', 'Publisher', 'Folder Title')}
+                games_file.write(('' if first else ',') + '\n' + json.dumps(record, ensure_ascii=False))
+                first = False
+            if rng.random() < TXT_RATIO:
+                target = live_file if rng.random() < LIVE_RATIO else retail_file
+                target.write('\t'.join((game['Title ID'].upper(), game['Title'], game['Developer'],
+                                        game['Category'], game['Year'])) + '\n')
+
+            discs = int(DISCS_PER_GAME) + (rng.random() < DISCS_PER_GAME % 1)
+            for disc in range(discs):
+                name = f"{game['Title']} ({rng.choice(REGIONS)}) ({rng.choice(LANGUAGES)})"
+                if discs > 1:
+                    name += f' (Disc {disc + 1})'
+                digest = hashlib.sha1(f'{game["Title ID"]}/{disc}'.encode()).hexdigest()
+                dat_file.write(
+                    f'\t<game name={quoteattr(name)}>\n\t\t<category>Games</category>\n'
+                    f'\t\t<description>{escape(name)}</description>\n'
+                    f'\t\t<rom name={quoteattr(name + ".iso")} size="{rng.choice((7307001856, 7834892288, 8738846720))}" '
+                    f'crc="{digest[:8]}" md5="{digest[:32]}" sha1="{digest}"/>\n\t</game>\n')
+        games_file.write('\n]\n')
+        dat_file.write('</datafile>\n')
+
+    with open(os.path.join(work_dir, TRANSLATIONS_FILE), 'w', encoding='utf-8') as f:
+        json.dump(translations, f, ensure_ascii=False, indent=4)
+    return count
+
+def path_size(path):
+    """文件或目录的总字节数"""
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(root, name))
+                   for root, _, files in os.walk(path) for name in files)
+    return os.path.getsize(path) if os.path.exists(path) else 0
+
+def run_stage(stage, work_dir):
+    """在当前进程中运行一个阶段，返回输出文件/目录路径"""
+    path = lambda name: os.path.join(work_dir, name)  # noqa: E731
+
+    if stage == 'parse_txt':
+        from update_xbox_games import parse_txt_file
+        parse_txt_file(path(XBOX360_FILE))
+        parse_txt_file(path(XBOXLIVE_FILE))
+        return None
+    if stage == 'merge':
+        from update_xbox_games import update_xbox_games_with_chinese_titles
+        update_xbox_games_with_chinese_titles(path(GAMES_FILE), path(TRANSLATIONS_FILE),
+                                              (path(XBOX360_FILE), path(XBOXLIVE_FILE)), path(MERGED_FILE))
+        return path(MERGED_FILE)
+    if stage == 'import':
+        from import_xbox_data import import_xbox_games_to_db
+        import_xbox_games_to_db(path(MERGED_FILE), path(DB_FILE))
+        return path(DB_FILE)
+    if stage == 'lua':
+        from generate_lua_filters import Xbox360LuaGenerator
+        Xbox360LuaGenerator().generate_all_lua_files(path(XBOX360_FILE), path(XBOXLIVE_FILE),
+                                                     path(TRANSLATIONS_FILE), path(LUA_DIR))
+        return path(LUA_DIR)
+    if stage == 'analyze':
+        from analyze_xbox_data import analyze_xbox_data
+        report = analyze_xbox_data(path(DB_FILE), output_json=True, refresh=True)
+        with open(path(REPORT_FILE), 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        return path(REPORT_FILE)
+    if stage == 'datfile':
+        from import_redump_dat import import_redump_datfile
+        if os.path.exists(path(REDUMP_DB_FILE)):
+            os.remove(path(REDUMP_DB_FILE))
+        import_redump_datfile(path(DATFILE), path(REDUMP_DB_FILE))
+        return path(REDUMP_DB_FILE)
+    raise ValueError(f"未知阶段: {stage}")
+
+def stage_worker(stage, work_dir):
+    """子进程入口：运行阶段并把测量结果以JSON输出到stdout"""
+    start = time.perf_counter()
+    with open(os.devnull, 'w', encoding='utf-8') as devnull, contextlib.redirect_stdout(devnull):
+        output = run_stage(stage, work_dir)
+    wall = time.perf_counter() - start
+    print(json.dumps({
+        'wall_s': round(wall, 3),
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+        'output_bytes': path_size(output) if output else None,
+    }))
+
+def measure_stage(stage, work_dir):
+    """在独立子进程中运行阶段，使峰值内存只反映该阶段本身"""
+    result = subprocess.run([sys.executable, os.path.abspath(__file__), '--worker', stage, work_dir],
+                            capture_output=True, text=True, encoding='utf-8')
+    if result.returncode != 0:
+        raise RuntimeError(f"阶段 {stage} 失败:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def compare(results, baseline, max_slowdown=MAX_SLOWDOWN):
+    """与基线比较，返回退化说明列表"""
+    regressions = []
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if not previous:
+            continue
+        if current['wall_s'] > previous['wall_s'] * max_slowdown + WALL_SLACK_SECONDS:
+            regressions.append(f"{key}: 耗时 {previous['wall_s']:.3f}s -> {current['wall_s']:.3f}s")
+        if current['peak_rss_mb'] > previous['peak_rss_mb'] * MAX_MEMORY_GROWTH:
+            regressions.append(f"{key}: 峰值内存 {previous['peak_rss_mb']:.1f}MB -> {current['peak_rss_mb']:.1f}MB")
+        if (current['output_bytes'] is not None and previous.get('output_bytes')
+                and current['output_bytes'] > previous['output_bytes'] * MAX_OUTPUT_GROWTH):
+            regressions.append(f"{key}: 输出大小 {previous['output_bytes']} -> {current['output_bytes']} 字节")
+    return regressions
+
+def check_scaling(results, max_excess=MAX_SCALING_EXCESS):
+    """检查每个阶段相邻两个规模之间的耗时比例是否在线性上限之内，返回退化说明列表"""
+    regressions = []
+    for stage in STAGES:
+        scales = sorted(int(key.split('@')[1][:-1]) for key in results if key.split('@')[0] == stage)
+        for small, large in zip(scales, scales[1:]):
+            before = results[f'{stage}@{small}x']['wall_s']
+            after = results[f'{stage}@{large}x']['wall_s']
+            bound = before * (large / small) * max_excess + WALL_SLACK_SECONDS
+            if after > bound:
+                regressions.append(f"{stage}: {small}x -> {large}x 耗时 {before:.3f}s -> {after:.3f}s，"
+                                   f"超过线性上限 {bound:.3f}s")
+    return regressions
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f).get('results', {})
+
+def save_baseline(path, results):
+    merged = load_baseline(path)
+    merged.update(results)
+    data = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'results': dict(sorted(merged.items())),
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+        f.write('\n')
+
+def format_size(size):
+    if size is None:
+        return '-'
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024:
+            return f'{size:.0f}{unit}' if unit == 'B' else f'{size:.1f}{unit}'
+        size /= 1024
+    return f'{size:.1f}GB'
+
+def main():
+    if len(sys.argv) == 4 and sys.argv[1] == '--worker':
+        stage_worker(sys.argv[2], sys.argv[3])
+        return
+
+    parser = argparse.ArgumentParser(description='用合成大目录测量各处理阶段的耗时/内存/输出大小')
+    parser.add_argument('--scales', type=int, nargs='+', default=DEFAULT_SCALES,
+                        help='相对当前数据规模的倍数（默认 1 10；100倍、1000倍用于容量评估，耗时较长）')
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=STAGES, help='要运行的阶段（按依赖顺序执行）')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='基线文件')
+    parser.add_argument('--update-baseline', action='store_true', help='把本次结果写入基线')
+    parser.add_argument('--max-slowdown', type=float, default=MAX_SLOWDOWN, help='耗时超过基线的倍数阈值')
+    parser.add_argument('--max-scaling', type=float, default=MAX_SCALING_EXCESS,
+                        help='规模扩大N倍时耗时允许增长 N×该值 倍')
+    parser.add_argument('--keep', metavar='DIR', help='在指定目录生成数据并保留（默认使用临时目录）')
+    args = parser.parse_args()
+
+    stages = [stage for stage in STAGES if stage in args.stages]
+    baseline = load_baseline(args.baseline)
+    results = {}
+
+    print(f"Python {platform.python_version()} / {platform.platform()}")
+    print(f"{'阶段':<16}{'耗时':>10}{'峰值内存':>12}{'输出大小':>12}{'基线耗时':>12}")
+    print("-" * 64)
+    for scale in args.scales:
+        with contextlib.ExitStack() as stack:
+            if args.keep:
+                work_dir = os.path.join(args.keep, f'{scale}x')
+                os.makedirs(work_dir, exist_ok=True)
+            else:
+                work_dir = stack.enter_context(tempfile.TemporaryDirectory(prefix=f'bench_{scale}x_'))
+
+            start = time.perf_counter()
+            count = generate_inputs(work_dir, scale)
+            print(f"[{scale}x] {count} 个游戏, 生成输入 {time.perf_counter() - start:.1f}s, "
+                  f"datfile {format_size(path_size(os.path.join(work_dir, DATFILE)))}")
+
+            for stage in stages:
+                key = f'{stage}@{scale}x'
+                result = results[key] = measure_stage(stage, work_dir)
+                previous = baseline.get(key, {}).get('wall_s')
+                print(f"{key:<16}{result['wall_s']:>9.3f}s{result['peak_rss_mb']:>10.1f}MB"
+                      f"{format_size(result['output_bytes']):>12}"
+                      f"{(f'{previous:.3f}s' if previous is not None else '-'):>12}")
+
+    # 超线性的阶段不能写入基线，否则以后的比较会把它当作正常值
+    regressions = check_scaling(results, args.max_scaling)
+    if args.update_baseline and not regressions:
+        save_baseline(args.baseline, results)
+        print(f"\n基线已更新: {args.baseline}")
+        return
+
+    if not baseline and not regressions:
+        print(f"\n没有基线文件 {args.baseline}，使用 --update-baseline 生成")
+        return
+
+    if not args.update_baseline:
+        regressions += compare(results, baseline, args.max_slowdown)
+    if regressions:
+        print("\n" + "!" * 64)
+        print(f"性能退化 ({len(regressions)} 项):")
+        for regression in regressions:
+            print(f"  {regression}")
+        print("!" * 64)
+        sys.exit(1)
+    print("\n未发现性能退化")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+增量构建清单
+记录每个处理阶段输入文件的哈希以及按Title ID的记录哈希，
+update_xbox_games.py / import_xbox_data.py / generate_lua_filters.py
+据此跳过未变化的输入，只重新处理受影响的游戏、数据库行和Lua分类文件。
+"""
+
+import hashlib
+import json
+import os
+import time
+
+MANIFEST_FILE = 'build_manifest.json'
+
+# 计算文件哈希时每次读取的字节数
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# 保存清单时等待其他进程释放锁文件的最长时间（秒）
+LOCK_TIMEOUT = 30
+
+def file_hash(file_path):
+    """计算文件的SHA-256，文件不存在时返回None"""
+    if not file_path or not os.path.exists(file_path):
+        return None
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def record_hash(record):
+    """计算单条记录（dict/list/str）的稳定哈希"""
+    data = json.dumps(record, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha1(data.encode('utf-8')).hexdigest()
+
+class BuildManifest:
+    """按阶段保存输入文件哈希和记录哈希的清单文件"""
+
+    def __init__(self, manifest_path=MANIFEST_FILE):
+        self.manifest_path = manifest_path
+        self.stages = self._load()
+        # 本对象修改过的阶段，保存时只写回这些阶段
+        self._dirty = set()
+
+    def _load(self):
+        if not os.path.exists(self.manifest_path):
+            return {}
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f).get('stages', {})
+        except (OSError, ValueError) as e:
+            print(f"读取构建清单失败，将完整重建: {e}")
+            return {}
+
+    def _stage(self, stage):
+        self._dirty.add(stage)
+        return self.stages.setdefault(stage, {'files': {}, 'records': {}})
+
+    def files_unchanged(self, stage, file_paths, options=None):
+        """检查阶段的所有输入/输出文件（及影响输出的选项）是否与上次记录一致，返回 (是否未变化, 当前哈希)"""
+        current = {path: file_hash(path) for path in file_paths if path}
+        for name, value in (options or {}).items():
+            current[f'option:{name}'] = value
+        previous = self.stages.get(stage, {}).get('files', {})
+        unchanged = bool(previous) and current == previous
+        return unchanged, current
+
+    def diff_records(self, stage, record_hashes):
+        """与上次记录比较，返回 (新增或变化的键集合, 已删除的键集合)"""
+        previous = self.stages.get(stage, {}).get('records', {})
+        changed = {key for key, h in record_hashes.items() if previous.get(key) != h}
+        removed = set(previous) - set(record_hashes)
+        return changed, removed
+
+    def update(self, stage, file_hashes=None, record_hashes=None):
+        """更新阶段的文件哈希和/或记录哈希（需调用save写盘）"""
+        entry = self._stage(stage)
+        if file_hashes is not None:
+            entry['files'] = file_hashes
+        if record_hashes is not None:
+            entry['records'] = record_hashes
+
+    def invalidate(self, stage):
+        """丢弃某阶段的记录，下次运行将完整重建"""
+        self._dirty.add(stage)
+        self.stages.pop(stage, None)
+
+    def save(self):
+        """写回本对象修改过的阶段
+
+        流水线中多个进程可能同时更新不同阶段，保存时持有锁文件，
+        重新读取磁盘上的清单后只替换自己修改过的阶段，不覆盖其他进程的结果。
+        """
+        lock_path = self.manifest_path + '.lock'
+        deadline = time.monotonic() + LOCK_TIMEOUT
+        while True:
+            try:
+                lock_fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                break
+            except FileExistsError:
+                if time.monotonic() > deadline:
+                    # 锁文件是崩溃进程遗留的
+                    try:
+                        os.remove(lock_path)
+                    except FileNotFoundError:
+                        pass
+                    deadline = time.monotonic() + LOCK_TIMEOUT
+                time.sleep(0.01)
+
+        try:
+            stages = self._load()
+            for stage in self._dirty:
+                if stage in self.stages:
+                    stages[stage] = self.stages[stage]
+                else:
+                    stages.pop(stage, None)
+            tmp_path = self.manifest_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': 1, 'stages': stages}, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp_path, self.manifest_path)
+            self.stages = stages
+            self._dirty.clear()
+        finally:
+            os.close(lock_fd)
+            os.remove(lock_path)
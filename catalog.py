@@ -0,0 +1,212 @@
+"""
+按列保存的内存游戏目录
+合并后的游戏数据（xbox360_games_updated.json）按列存储：TitleId 保存在 array('I') 中，
+字符串列做字典编码（每个不同的值只保存一次，行中只存整数编码，各列之间共享相同的字符串对象），
+并预先建立按 标题/开发商/分类/年份/发行商前缀（TitleId高16位）的二级索引，
+筛选和分组计数直接查索引，不必逐个遍历游戏dict。
+
+    catalog = Catalog.load('xbox360_games_updated.json')
+    catalog.get('415407d1')
+    catalog.find(developer='Ubisoft', year='2008')
+    catalog.group_counts('Category').most_common(10)
+"""
+
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from itertools import accumulate
+
+from import_xbox_data import normalize_title_id, title_id_to_int
+from update_xbox_games import iter_games
+
+# 合并数据中的字符串字段（不含Title ID）
+FIELDS = ('Platform', 'Title', 'Developer', 'Publisher', 'Folder Title', 'Title_cn', 'Category', 'Year')
+
+# 建立二级索引的字段: 查询参数名 -> 字段
+INDEXED_FIELDS = {
+    'title': 'Title',
+    'developer': 'Developer',
+    'category': 'Category',
+    'year': 'Year',
+}
+
+def publisher_prefix(value):
+    """发行商前缀（TitleId高16位）；参数可以是前缀本身或完整TitleId（十六进制字符串或整数）"""
+    if isinstance(value, str):
+        value = int(value, 16)
+    return value >> 16 if value > 0xFFFF else value
+
+class StringColumn:
+    """字典编码的字符串列"""
+
+    def __init__(self, values, strings=None, keep_lookup=True):
+        """对values编码；strings为跨列共享的字符串驻留表
+
+        keep_lookup为False时构建后丢弃 值→编码 映射（不需要按值查找的列）。
+        """
+        self.values = []
+        self.codes = array('I')
+        lookup = {}
+        append_code = self.codes.append
+        for value in values:
+            code = lookup.get(value)
+            if code is None:
+                code = lookup[value] = len(self.values)
+                if strings is not None and isinstance(value, str):
+                    value = strings.setdefault(value, value)
+                self.values.append(value)
+            append_code(code)
+        self._lookup = lookup if keep_lookup else None
+
+    def code_of(self, value):
+        """值对应的编码，不存在时返回None"""
+        return self._lookup.get(value)
+
+    def __getitem__(self, row):
+        return self.values[self.codes[row]]
+
+    def __len__(self):
+        return len(self.codes)
+
+class PostingIndex:
+    """编码 -> 行号列表 的紧凑倒排索引
+
+    全部行号按编码排序后存入一个数组，offsets[code]:offsets[code + 1] 为该编码的行号，
+    不为每个不同的值单独创建列表。
+    """
+
+    def __init__(self, codes, size):
+        counts = [0] * (size + 1)
+        for code in codes:
+            counts[code + 1] += 1
+        self.offsets = array('I', accumulate(counts))
+        self.rows = array('I', bytes(4 * len(codes)))
+        positions = list(self.offsets)
+        for row, code in enumerate(codes):
+            self.rows[positions[code]] = row
+            positions[code] += 1
+
+    def __getitem__(self, code):
+        return self.rows[self.offsets[code]:self.offsets[code + 1]]
+
+    def count(self, code):
+        return self.offsets[code + 1] - self.offsets[code]
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+class Catalog:
+    """列式游戏目录，带TitleId主索引和按字段的二级索引"""
+
+    def __init__(self, games=()):
+        rows = []
+        self.title_ids = array('I')
+        # Title ID无效而跳过的记录数
+        self.skipped = 0
+        for game in games:
+            title_id = normalize_title_id(game.get('Title ID'))
+            if title_id is None:
+                self.skipped += 1
+                continue
+            rows.append(game)
+            self.title_ids.append(title_id_to_int(title_id))
+
+        # 构建期间的字符串驻留表，不同列中相同的字符串（如Title与Folder Title）只保存一份
+        strings = {}
+        indexed = set(INDEXED_FIELDS.values())
+        self.columns = {field: StringColumn((game.get(field) for game in rows), strings, field in indexed)
+                        for field in FIELDS}
+        del rows, strings
+
+        self._build_indexes()
+
+    @classmethod
+    def load(cls, games_file='xbox360_games_updated.json'):
+        """从合并后的游戏数据构建目录（JSON数组或 .ndjson，与其他读取合并数据的脚本一致）"""
+        return cls(iter_games(games_file))
+
+    def _build_indexes(self):
+        # 按TitleId排序的 (TitleId, 行号) 两个数组，二分查找；重复的TitleId保留第一行
+        order = sorted(range(len(self.title_ids)), key=self.title_ids.__getitem__)
+        self.sorted_title_ids = array('I', (self.title_ids[row] for row in order))
+        self.sorted_rows = array('I', order)
+
+        # 字段编码 -> 行号
+        self.indexes = {field: PostingIndex(self.columns[field].codes, len(self.columns[field].values))
+                        for field in INDEXED_FIELDS.values()}
+
+        # 发行商前缀按大小排序编码，前缀 -> 行号
+        self.prefixes = array('I', sorted({title_id >> 16 for title_id in self.title_ids}))
+        prefix_codes = {prefix: code for code, prefix in enumerate(self.prefixes)}
+        self.by_publisher_prefix = PostingIndex([prefix_codes[title_id >> 16] for title_id in self.title_ids],
+                                                len(self.prefixes))
+
+    def __len__(self):
+        return len(self.title_ids)
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield self.row(row)
+
+    def row(self, row):
+        """按行号返回与合并JSON相同格式的游戏dict（原记录中缺少的字段不出现）"""
+        game = {'Title ID': f'{self.title_ids[row]:08x}'}
+        for field, column in self.columns.items():
+            value = column[row]
+            if value is not None:
+                game[field] = value
+        return game
+
+    def get(self, title_id, default=None):
+        """按TitleId（十六进制字符串或整数）查找游戏"""
+        if isinstance(title_id, str):
+            title_id = normalize_title_id(title_id)
+            if title_id is None:
+                return default
+            title_id = title_id_to_int(title_id)
+        position = bisect_left(self.sorted_title_ids, title_id)
+        if position == len(self.sorted_title_ids) or self.sorted_title_ids[position] != title_id:
+            return default
+        return self.row(self.sorted_rows[position])
+
+    def rows_where(self, title=None, developer=None, category=None, year=None, prefix=None):
+        """返回同时满足所有条件的行号列表（按行号排序），条件均为索引查找"""
+        candidates = []
+        for name, value in (('title', title), ('developer', developer), ('category', category), ('year', year)):
+            if value is None:
+                continue
+            field = INDEXED_FIELDS[name]
+            code = self.columns[field].code_of(value)
+            if code is None:
+                return []
+            candidates.append(self.indexes[field][code])
+        if prefix is not None:
+            prefix = publisher_prefix(prefix)
+            code = bisect_left(self.prefixes, prefix)
+            if code == len(self.prefixes) or self.prefixes[code] != prefix:
+                return []
+            candidates.append(self.by_publisher_prefix[code])
+
+        if not candidates:
+            return list(range(len(self)))
+        # 从最短的行号列表开始求交集
+        candidates.sort(key=len)
+        rows = set(candidates[0])
+        for postings in candidates[1:]:
+            rows.intersection_update(postings)
+            if not rows:
+                break
+        return sorted(rows)
+
+    def find(self, **criteria):
+        """返回满足条件的游戏dict列表，参数同rows_where"""
+        return [self.row(row) for row in self.rows_where(**criteria)]
+
+    def group_counts(self, field, rows=None):
+        """按字段分组计数，返回Counter；有索引的字段直接取各行号列表的长度"""
+        column = self.columns[field]
+        if rows is None and field in self.indexes:
+            index = self.indexes[field]
+            return Counter({column.values[code]: index.count(code) for code in range(len(index))})
+        codes = column.codes if rows is None else (column.codes[row] for row in rows)
+        return Counter({column.values[code]: n for code, n in Counter(codes).items()})
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+游戏目录增量补丁
+diff: 把两个版本的目录（合并后的游戏JSON/NDJSON 或 xbox_games.db）按TitleId排序后做一次归并连接(merge-join)，
+      线性地找出新增、删除和修改的字段，输出紧凑的增量补丁（文件名以 .gz 结尾时gzip压缩）；
+apply: 在单个事务中把补丁应用到已有的 xbox_games.db，应用前后用目录摘要校验版本，不匹配时回滚；
+changelog: 显示补丁的可读变更摘要。
+
+补丁格式:
+    {"version": 1, "fields": [...],
+     "base": {"count": N, "digest": "..."}, "target": {"count": N, "digest": "..."},
+     "added": {"<TitleId>": [字段值...]},
+     "removed": {"<TitleId>": "<Title>"},
+     "changed": {"<TitleId>": {"<字段>": [旧值, 新值]}}}
+
+用法:
+    python catalog_delta.py diff <旧目录> <新目录> [-o catalog.delta.json] [--changelog CHANGELOG.txt]
+    python catalog_delta.py apply <补丁> [--db xbox_games.db] [--force]
+    python catalog_delta.py changelog <补丁> [--limit 50]
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+
+from analyze_xbox_data import refresh_catalog_stats
+from import_xbox_data import (CONTENT_COLUMNS, JSON_FIELDS, build_upsert_rows, create_content_table,
+                              ensure_title_id_unique, migrate_title_id_num, normalize_title_id, title_id_to_int)
+from instrumentation import add_profile_arguments, count, span, start_profiling
+from search_xbox_games import ensure_search_index
+from update_xbox_games import iter_games
+
+DELTA_VERSION = 1
+
+# 变更摘要中每类变更默认显示的条数
+DEFAULT_CHANGELOG_LIMIT = 50
+
+def is_sqlite_file(path):
+    with open(path, 'rb') as f:
+        return f.read(16) == b'SQLite format 3\x00'
+
+def read_db_rows(conn):
+    """读取ContentItems，返回按TitleId排序的 [(TitleId, 字段值元组)]"""
+    rows = {}
+    for row in conn.execute(f"SELECT TitleId, {', '.join(CONTENT_COLUMNS)} FROM ContentItems ORDER BY Id"):
+        title_id = normalize_title_id(row[0])
+        if title_id is not None:
+            rows[title_id] = tuple(row[1:])
+    return sorted(rows.items())
+
+def load_catalog_rows(path):
+    """读取游戏JSON/NDJSON或xbox_games.db，返回按TitleId排序的 [(TitleId, 字段值元组)]"""
+    if is_sqlite_file(path):
+        conn = sqlite3.connect(path)
+        try:
+            return read_db_rows(conn)
+        finally:
+            conn.close()
+    rows, _, _ = build_upsert_rows(iter_games(path))
+    return sorted(rows.items())
+
+class CatalogDigest:
+    """按TitleId顺序累加的目录摘要，用于确认补丁的基础版本和应用结果"""
+
+    def __init__(self):
+        self.count = 0
+        self._digest = hashlib.sha256()
+
+    def add(self, title_id, values):
+        self.count += 1
+        self._digest.update(json.dumps([title_id, *values], ensure_ascii=False).encode('utf-8'))
+        self._digest.update(b'\n')
+
+    def state(self):
+        return {'count': self.count, 'digest': self._digest.hexdigest()}
+
+def digest_rows(rows):
+    digest = CatalogDigest()
+    for title_id, values in rows:
+        digest.add(title_id, values)
+    return digest.state()
+
+def merge_join(old_rows, new_rows):
+    """一次遍历两个按TitleId排序的序列，产出 (TitleId, 旧字段值或None, 新字段值或None)"""
+    old_iter, new_iter = iter(old_rows), iter(new_rows)
+    old, new = next(old_iter, None), next(new_iter, None)
+    while old is not None or new is not None:
+        if new is None or (old is not None and old[0] < new[0]):
+            yield old[0], old[1], None
+            old = next(old_iter, None)
+        elif old is None or new[0] < old[0]:
+            yield new[0], None, new[1]
+            new = next(new_iter, None)
+        else:
+            yield old[0], old[1], new[1]
+            old, new = next(old_iter, None), next(new_iter, None)
+
+def diff_catalogs(old_rows, new_rows):
+    """计算两个已排序目录之间的增量补丁"""
+    delta = {'version': DELTA_VERSION, 'fields': list(JSON_FIELDS), 'added': {}, 'removed': {}, 'changed': {}}
+    base, target = CatalogDigest(), CatalogDigest()
+    title_index = JSON_FIELDS.index('Title')
+    for title_id, old_values, new_values in merge_join(old_rows, new_rows):
+        if old_values is not None:
+            base.add(title_id, old_values)
+        if new_values is not None:
+            target.add(title_id, new_values)
+
+        if old_values is None:
+            delta['added'][title_id] = list(new_values)
+        elif new_values is None:
+            delta['removed'][title_id] = old_values[title_index]
+        elif old_values != new_values:
+            delta['changed'][title_id] = {
+                field: [old, new]
+                for field, old, new in zip(JSON_FIELDS, old_values, new_values) if old != new
+            }
+    delta['base'] = base.state()
+    delta['target'] = target.state()
+    return delta
+
+def write_delta(delta, path):
+    opener = gzip.open if path.endswith('.gz') else open
+    tmp_path = path + '.tmp'
+    with opener(tmp_path, 'wt', encoding='utf-8') as f:
+        json.dump(delta, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+def read_delta(path):
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8') as f:
+        delta = json.load(f)
+    if delta.get('version') != DELTA_VERSION or delta.get('fields') != list(JSON_FIELDS):
+        raise ValueError(f"不支持的补丁格式: {path}")
+    return delta
+
+def apply_delta(delta, db_file='xbox_games.db', force=False):
+    """在单个事务中把补丁应用到数据库，返回 (新增, 删除, 修改) 数量
+
+    数据库的当前内容必须与补丁的基础版本一致（force时跳过检查，
+    逐条应用：已存在的新增记录被覆盖，不存在的删除/修改记录被忽略）；
+    应用后的内容与补丁的目标版本不一致时回滚。
+    """
+    conn = sqlite3.connect(db_file)
+    try:
+        cursor = conn.cursor()
+        with conn:
+            create_content_table(cursor)
+            ensure_search_index(cursor)
+            ensure_title_id_unique(cursor)
+            migrate_title_id_num(cursor)
+
+            current = {title_id: values for title_id, values in read_db_rows(conn)}
+            if not force and digest_rows(sorted(current.items())) != delta['base']:
+                raise ValueError("数据库内容与补丁的基础版本不一致（可用 --force 强制应用）")
+
+            columns = ', '.join(CONTENT_COLUMNS)
+            column_of = dict(zip(JSON_FIELDS, CONTENT_COLUMNS))
+            removed = [title_id for title_id in delta['removed'] if title_id in current]
+            changed = [(title_id, fields) for title_id, fields in delta['changed'].items() if title_id in current]
+
+            with span('apply_delta'):
+                cursor.executemany('DELETE FROM ContentItems WHERE TitleId = ?',
+                                   ((title_id,) for title_id in removed))
+                # 按被修改的字段组合分组，每组一条UPDATE语句
+                updates = {}
+                for title_id, fields in changed:
+                    names = tuple(sorted(fields))
+                    updates.setdefault(names, []).append(
+                        tuple(fields[name][1] for name in names) + (title_id,))
+                for names, params in updates.items():
+                    assignments = ', '.join(f'{column_of[name]} = ?' for name in names)
+                    cursor.executemany(f'UPDATE ContentItems SET {assignments} WHERE TitleId = ?', params)
+                cursor.executemany(f'''
+                    INSERT INTO ContentItems (TitleId, TitleIdNum, {columns})
+                    VALUES ({', '.join('?' * (len(CONTENT_COLUMNS) + 2))})
+                    ON CONFLICT(TitleId) DO UPDATE SET {', '.join(f'{col} = excluded.{col}' for col in CONTENT_COLUMNS)}
+                ''', ((title_id, title_id_to_int(title_id), *values) for title_id, values in delta['added'].items()))
+
+            if not force and digest_rows(read_db_rows(conn)) != delta['target']:
+                raise ValueError("应用补丁后的内容与目标版本不一致")
+
+            refresh_catalog_stats(conn)
+    finally:
+        conn.close()
+
+    count('rows_inserted', len(delta['added']))
+    count('rows_updated', len(changed))
+    return len(delta['added']), len(removed), len(changed)
+
+def format_changelog(delta, limit=DEFAULT_CHANGELOG_LIMIT):
+    """生成补丁的可读变更摘要，limit为每类变更显示的条数（0为全部）"""
+    added, removed, changed = delta['added'], delta['removed'], delta['changed']
+    title_index = JSON_FIELDS.index('Title')
+    field_counts = {}
+    for fields in changed.values():
+        for field in fields:
+            field_counts[field] = field_counts.get(field, 0) + 1
+
+    lines = [
+        f"目录变更: {delta['base']['count']} 个游戏 -> {delta['target']['count']} 个游戏",
+        f"新增 {len(added)} 个, 删除 {len(removed)} 个, 修改 {len(changed)} 个",
+    ]
+    if field_counts:
+        lines.append("修改的字段: " + ", ".join(
+            f"{field} {n}" for field, n in sorted(field_counts.items(), key=lambda item: (-item[1], item[0]))))
+
+    def section(title, items, render):
+        if not items:
+            return
+        lines.append(f"\n{title}:")
+        shown = items if not limit else items[:limit]
+        lines.extend(render(item) for item in shown)
+        if len(shown) < len(items):
+            lines.append(f"  ... 另有 {len(items) - len(shown)} 个")
+
+    section("新增", sorted(added.items()), lambda item: f"  + {item[0]} {item[1][title_index]}")
+    section("删除", sorted(removed.items()), lambda item: f"  - {item[0]} {item[1]}")
+    section("修改", sorted(changed.items()), lambda item: f"  * {item[0]} " + "; ".join(
+        f"{field}: {old!r} -> {new!r}" for field, (old, new) in item[1].items()))
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description='游戏目录增量补丁：比较、应用和查看变更')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    diff_parser = subparsers.add_parser('diff', help='比较两个版本的目录并生成补丁')
+    diff_parser.add_argument('old', help='旧版本（游戏JSON/NDJSON或xbox_games.db）')
+    diff_parser.add_argument('new', help='新版本（游戏JSON/NDJSON或xbox_games.db）')
+    diff_parser.add_argument('-o', '--output', default='catalog.delta.json', help='补丁文件（.gz结尾时压缩）')
+    diff_parser.add_argument('--changelog', help='同时把变更摘要写入该文件')
+    diff_parser.add_argument('--limit', type=int, default=DEFAULT_CHANGELOG_LIMIT, help='每类变更显示的条数（0为全部）')
+    add_profile_arguments(diff_parser)
+
+    apply_parser = subparsers.add_parser('apply', help='在单个事务中把补丁应用到数据库')
+    apply_parser.add_argument('delta', help='补丁文件')
+    apply_parser.add_argument('--db', default='xbox_games.db', help='目标数据库')
+    apply_parser.add_argument('--force', action='store_true', help='跳过基础版本和目标版本检查')
+    add_profile_arguments(apply_parser)
+
+    changelog_parser = subparsers.add_parser('changelog', help='显示补丁的变更摘要')
+    changelog_parser.add_argument('delta', help='补丁文件')
+    changelog_parser.add_argument('--limit', type=int, default=DEFAULT_CHANGELOG_LIMIT, help='每类变更显示的条数（0为全部）')
+    add_profile_arguments(changelog_parser)
+
+    args = parser.parse_args()
+    start_profiling(args, f'catalog_delta_{args.command}')
+
+    if args.command == 'diff':
+        for path in (args.old, args.new):
+            if not os.path.exists(path):
+                print(f"错误: 找不到 {path}")
+                return
+        with span('load_catalogs'):
+            old_rows, new_rows = load_catalog_rows(args.old), load_catalog_rows(args.new)
+        with span('merge_join'):
+            delta = diff_catalogs(old_rows, new_rows)
+        write_delta(delta, args.output)
+        changelog = format_changelog(delta, args.limit)
+        print(changelog)
+        if args.changelog:
+            with open(args.changelog, 'w', encoding='utf-8') as f:
+                f.write(format_changelog(delta, 0) + "\n")
+        print(f"\n补丁已保存为: {args.output} ({os.path.getsize(args.output) / 1024:.1f} KB)")
+        return
+
+    try:
+        delta = read_delta(args.delta)
+    except (OSError, ValueError) as e:
+        print(f"错误: 无法读取补丁: {e}")
+        return
+
+    if args.command == 'changelog':
+        print(format_changelog(delta, args.limit))
+        return
+
+    try:
+        added, removed, changed = apply_delta(delta, args.db, args.force)
+    except (ValueError, sqlite3.Error) as e:
+        print(f"错误: {e}，数据库未修改")
+        return
+    print(f"补丁已应用到 {args.db}: 新增 {added} 个, 删除 {removed} 个, 修改 {changed} 个")
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,9 @@
+import argparse
 import json
 import os
 
+from title_matcher import TitleTranslator
+
 def update_xbox_games_with_chinese_titles():
     # 定义文件路径
     games_file = 'xbox360_games.json'
@@ -25,7 +28,7 @@ def update_xbox_games_with_chinese_titles():
         # 读取翻译数据
         print("正在读取翻译数据...")
         with open(translations_file, 'r', encoding='utf-8') as f:
-            translations_data = json.load(f)
+            translations_data = TitleTranslator(json.load(f))
         
         # 统计信息
         total_games = len(games_data)
@@ -36,8 +39,9 @@ def update_xbox_games_with_chinese_titles():
         print("正在处理游戏数据...")
         for game in games_data:
             english_title = game.get('Title')
-            if english_title in translations_data:
-                game['Title_cn'] = translations_data[english_title]
+            chinese_title = translations_data.get(english_title)
+            if chinese_title is not None:
+                game['Title_cn'] = chinese_title
                 updated_count += 1
             else:
                 # 如果没有找到翻译，则使用英文标题作为默认值
@@ -53,7 +57,7 @@ def update_xbox_games_with_chinese_titles():
         print("=" * 50)
         print("处理完成！")
         print(f"总共处理了 {total_games} 个游戏")
-        print(f"其中 {updated_count} 个游戏添加了中文标题")
+        print(f"其中 {updated_count} 个游戏添加了中文标题（模糊匹配 {len(translations_data.fuzzy_matches)} 个）")
         print(f"其中 {unchanged_count} 个游戏未找到对应翻译，使用英文标题")
         print(f"更新后的文件已保存为: {output_file}")
         print("=" * 50)
@@ -79,14 +83,20 @@ def create_backup():
     else:
         print(f"找不到原始文件 {games_file}，无法创建备份")
 
-if __name__ == "__main__":
+def main():
+    parser = argparse.ArgumentParser(description='Xbox 360 游戏数据更新工具')
+    parser.add_argument('--backup', action='store_true', help='更新前创建原始文件备份')
+    args = parser.parse_args()
+
     print("Xbox 360 游戏数据更新工具")
     print("=" * 30)
     
-    # 询问是否需要创建备份
-    choice = input("是否需要创建原始文件备份? (y/n): ")
-    if choice.lower() == 'y':
+    # 是否创建备份由命令行参数决定，不再交互询问
+    if args.backup:
         create_backup()
     
     # 执行更新操作
-    update_xbox_games_with_chinese_titles()
\ No newline at end of file
+    update_xbox_games_with_chinese_titles()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+制表符分隔游戏列表（xbox360.txt / xbox360live.txt）的统一加载器
+每个文件逐行流式解析一次，结果按 (路径, mtime, 大小) 缓存在进程内，
+update_xbox_games.py 与 generate_lua_filters.py 的各个步骤共享同一份解析结果。
+"""
+
+import os
+from collections import namedtuple
+
+# 列顺序: Title ID, Game, Developer, Category, Year
+GameRecord = namedtuple('GameRecord', ('title_id', 'title', 'developer', 'category', 'year'))
+
+# 至少需要 Title ID / Game / Developer / Category 四列
+MIN_COLUMNS = 4
+
+_cache = {}
+
+def _parse_game_list(file_path):
+    records = []
+    # 文件带有UTF-8 BOM
+    with open(file_path, 'r', encoding='utf-8-sig') as f:
+        # 跳过标题行
+        next(f, None)
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+
+            parts = line.split('\t')
+            if len(parts) < MIN_COLUMNS:
+                continue
+
+            title_id = parts[0].strip()
+            if not title_id:
+                continue
+
+            records.append(GameRecord(
+                title_id,
+                parts[1].strip(),
+                parts[2].strip(),
+                parts[3].strip(),
+                parts[4].strip() if len(parts) > 4 else ''
+            ))
+    return tuple(records)
+
+def load_game_list(file_path):
+    """解析游戏列表文件并返回GameRecord元组；文件不存在时返回空元组
+
+    同一进程内文件未修改时直接返回缓存结果。
+    """
+    if not file_path or not os.path.exists(file_path):
+        return ()
+
+    key = os.path.abspath(file_path)
+    stat = os.stat(key)
+    version = (stat.st_mtime_ns, stat.st_size)
+
+    cached = _cache.get(key)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    records = _parse_game_list(key)
+    _cache[key] = (version, records)
+    return records
+
+def clear_cache():
+    """清空进程内的解析缓存"""
+    _cache.clear()
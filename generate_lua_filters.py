@@ -8,10 +8,132 @@ Xbox 360游戏分类Lua过滤器生成器
 import os
 import re
 import json
+import shutil
+import argparse
 from pathlib import Path
 
+from build_manifest import BuildManifest, record_hash
+from game_lists import load_game_list
+from instrumentation import add_profile_arguments, count, span, start_profiling
+from update_xbox_games import iter_games
+
+# Lua过滤器输出模式：
+#   or  - 每个TitleId一个相等比较，用or连接（原有格式）
+#   set - 加载时构建一次以TitleId为键的表，过滤函数每个游戏只做一次查表
+#   range - 排序后把连续的TitleId合并为区间，按发行商前缀（高16位）分桶，桶内二分查找
+LUA_MODES = ('or', 'set', 'range')
+
+# 多维过滤器（--facets），从合并后的游戏数据一次遍历生成：
+#   category - 分类（过滤器名和文件名与原有分类过滤器相同）
+#   year / decade - 年份 / 年代，如 "Year 2008"、"Decade 2000s"
+#   developer - 开发商
+#   publisher - 发行商前缀（TitleId高16位），如 "Publisher 4D53 (Microsoft Game Studios)"
+#   platform - "XBLA" 或 "Retail"
+#   chinese - "Chinese Title" 或 "No Chinese Title"
+FACETS = ('category', 'year', 'decade', 'developer', 'publisher', 'platform', 'chinese')
+
+# 除分类外，游戏数少于该值的过滤器不生成（大多数开发商/发行商前缀只有一两个游戏）
+DEFAULT_MIN_FACET_SIZE = 5
+
+# XBLA游戏的TitleId前缀 'XA'
+XBLA_TITLE_ID_PREFIX = 0x5841
+
+# 过滤器名同时用作文件名和Lua字符串，去掉其中不能出现的字符
+UNSAFE_NAME_PATTERN = re.compile(r'[\\/:*?"<>|]+')
+UNKNOWN_VALUES = ('', '???')
+
+def facet_filter_names(game, prefix, facets):
+    """返回游戏在各维度上所属的过滤器名 {维度: 过滤器名}，没有取值的维度不出现"""
+    names = {}
+    category = (game.get('Category') or '').strip()
+    if 'category' in facets and category:
+        names['category'] = UNSAFE_NAME_PATTERN.sub(' ', category)
+    year = str(game.get('Year') or '').strip()
+    if len(year) == 4 and year.isdigit():
+        if 'year' in facets:
+            names['year'] = f"Year {year}"
+        if 'decade' in facets:
+            names['decade'] = f"Decade {year[:3]}0s"
+    developer = (game.get('Developer') or '').strip()
+    if 'developer' in facets and developer not in UNKNOWN_VALUES:
+        names['developer'] = f"Developer {UNSAFE_NAME_PATTERN.sub(' ', developer).strip()}"
+    if 'publisher' in facets:
+        names['publisher'] = f"Publisher {prefix:04X}"
+    if 'platform' in facets:
+        names['platform'] = 'XBLA' if game.get('Platform') == 'XBLA' or prefix == XBLA_TITLE_ID_PREFIX else 'Retail'
+    if 'chinese' in facets:
+        title_cn = (game.get('Title_cn') or '').strip()
+        names['chinese'] = 'Chinese Title' if title_cn and title_cn != game.get('Title') else 'No Chinese Title'
+    return names
+
+def merge_title_id_ranges(title_ids):
+    """把整数TitleId排序去重后合并为连续区间，返回 [(起始, 结束), ...]（闭区间）"""
+    ranges = []
+    for title_id in sorted(set(title_ids)):
+        if ranges and title_id == ranges[-1][1] + 1:
+            ranges[-1][1] = title_id
+        else:
+            ranges.append([title_id, title_id])
+    return [tuple(r) for r in ranges]
+
+def bucket_ranges_by_prefix(ranges):
+    """按高16位（发行商前缀）分桶，跨前缀的区间拆开；返回 {前缀: [(低16位起始, 低16位结束), ...]}"""
+    buckets = {}
+    for start, end in ranges:
+        while start <= end:
+            prefix = start >> 16
+            bucket_end = min(end, (prefix << 16) | 0xFFFF)
+            buckets.setdefault(prefix, []).append((start & 0xFFFF, bucket_end & 0xFFFF))
+            start = bucket_end + 1
+    return buckets
+
+def write_file_atomic(file_path, content):
+    """写入临时文件后原子替换目标文件"""
+    tmp_path = file_path + '.tmp'
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(tmp_path, file_path)
+        count('bytes_written', os.path.getsize(file_path))
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def prepare_staging_dir(output_dir):
+    """以当前输出目录为基础创建暂存目录（保留手工添加的分类文件）"""
+    staging_dir = os.path.normpath(output_dir) + '.staging'
+    if os.path.exists(staging_dir):
+        shutil.rmtree(staging_dir)
+    if os.path.isdir(output_dir):
+        shutil.copytree(output_dir, staging_dir, ignore=shutil.ignore_patterns('*.tmp'))
+    else:
+        Path(staging_dir).mkdir(parents=True)
+    return staging_dir
+
+def swap_output_dir(staging_dir, output_dir):
+    """用写好的暂存目录替换输出目录"""
+    backup_dir = os.path.normpath(output_dir) + '.old'
+    if os.path.exists(backup_dir):
+        shutil.rmtree(backup_dir)
+    if os.path.isdir(output_dir):
+        os.rename(output_dir, backup_dir)
+    os.rename(staging_dir, output_dir)
+    if os.path.exists(backup_dir):
+        shutil.rmtree(backup_dir)
+
+def recover_output_dir(output_dir):
+    """上次替换目录时中断：输出目录不存在但备份目录存在，则恢复备份"""
+    backup_dir = os.path.normpath(output_dir) + '.old'
+    if not os.path.isdir(output_dir) and os.path.isdir(backup_dir):
+        os.rename(backup_dir, output_dir)
+        print(f"已从备份恢复输出目录: {output_dir}")
+
 class Xbox360LuaGenerator:
-    def __init__(self):
+    def __init__(self, mode='or'):
+        if mode not in LUA_MODES:
+            raise ValueError(f"不支持的Lua输出模式: {mode}")
+        self.mode = mode
         self.games_data = []
         self.translations = {}
         
@@ -26,35 +148,16 @@ class Xbox360LuaGenerator:
             self.translations = {}
     
     def parse_game_file(self, file_path):
-        """解析游戏数据文件"""
-        games = []
+        """解析游戏数据文件（使用共享的单次解析结果）"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-            
-            # 跳过标题行
-            for line in lines[1:]:
-                line = line.strip()
-                if not line:
-                    continue
-                
-                # 解析制表符分隔的数据
-                parts = line.split('\t')
-                if len(parts) >= 4:
-                    title_id = parts[0].strip()
-                    game_name = parts[1].strip()
-                    developer = parts[2].strip()
-                    category = parts[3].strip() if len(parts) > 3 else ''
-                    year = parts[4].strip() if len(parts) > 4 else ''
-                    
-                    games.append({
-                        'title_id': title_id,
-                        'game_name': game_name,
-                        'developer': developer,
-                        'category': category,
-                        'year': year,
-                        'hex_id': self.convert_to_hex(title_id)
-                    })
+            games = [{
+                'title_id': record.title_id,
+                'game_name': record.title,
+                'developer': record.developer,
+                'category': record.category,
+                'year': record.year,
+                'hex_id': self.convert_to_hex(record.title_id)
+            } for record in load_game_list(file_path)]
             
             print(f"从 {os.path.basename(file_path)} 解析了 {len(games)} 个游戏")
             return games
@@ -90,61 +193,233 @@ class Xbox360LuaGenerator:
                 categories[category].append(game)
         
         return categories
+
+    def group_merged_games(self, merged_file, facets, min_facet_size=DEFAULT_MIN_FACET_SIZE):
+        """一次遍历合并后的游戏数据，同时按多个维度分组
+
+        返回 ({过滤器名: [游戏]}, 读取的游戏数)，过滤器名即Lua文件名。
+        """
+        groups = {}
+        total = 0
+        for game in iter_games(merged_file):
+            hex_id = self.convert_to_hex(game.get('Title ID') or '')
+            if not hex_id:
+                continue
+            total += 1
+            entry = {
+                'hex_id': hex_id,
+                'game_name': game.get('Title'),
+                'publisher': (game.get('Publisher') or '').strip(),
+            }
+            for facet, name in facet_filter_names(game, int(hex_id, 16) >> 16, facets).items():
+                groups.setdefault((facet, name), []).append(entry)
+
+        categories = {}
+        for (facet, name), games in sorted(groups.items()):
+            if facet != 'category' and len(games) < min_facet_size:
+                continue
+            if facet == 'publisher':
+                # 前缀下有发行商名称的游戏过半属于同一发行商时，用其名称说明前缀（XBLA等共享前缀不加说明）
+                publishers = {}
+                for game in games:
+                    if game['publisher'] not in UNKNOWN_VALUES:
+                        publishers[game['publisher']] = publishers.get(game['publisher'], 0) + 1
+                publisher = max(publishers, key=publishers.get, default=None)
+                if publisher is not None and publishers[publisher] * 2 > sum(publishers.values()):
+                    name = f"{name} ({UNSAFE_NAME_PATTERN.sub(' ', publisher).strip()})"
+            categories[name] = games
+        return categories, total
     
-    def generate_lua_file(self, category, games, output_dir):
-        """生成Lua分类文件 - 使用原始分类名称作为文件名和内容"""
+    def build_lua_content(self, category, games):
+        """生成Lua分类文件内容 - 使用原始分类名称"""
+        if self.mode == 'set':
+            return self.build_lua_set_content(category, games)
+        if self.mode == 'range':
+            return self.build_lua_range_content(category, games)
+
+        # 一次join生成全部比较条件，避免逐条字符串拼接
+        clauses = "\nor ".join(f"Content.TitleId == {game['hex_id']}" for game in games)
+        return f"GameListFilterCategories.User[\"{category}\"] = function(Content)\nreturn ({clauses}\n)\nend\n"
+
+    def build_lua_set_content(self, category, games):
+        """生成查表形式的Lua分类文件内容：TitleId集合在加载时构建一次"""
+        lines = ["local TitleIds = {"]
+        for hex_id in sorted({game['hex_id'] for game in games}):
+            lines.append(f"[{hex_id}] = true,")
+        lines.append("}")
+        lines.append(f"GameListFilterCategories.User[\"{category}\"] = function(Content)")
+        lines.append("return TitleIds[Content.TitleId] == true")
+        lines.append("end")
+        return "\n".join(lines) + "\n"
+
+    def build_lua_range_content(self, category, games):
+        """生成区间形式的Lua分类文件内容
+
+        同一发行商的TitleId集中在同一个高16位前缀下，且常有连续编号，
+        因此按前缀分桶保存低16位的区间端点 {起始1, 结束1, 起始2, 结束2, ...}，
+        过滤函数先按前缀查表，再在桶内二分查找区间。
+        只使用除法和取模，不依赖位运算，兼容Lua 5.1。
+        """
+        ranges = merge_title_id_ranges(int(game['hex_id'], 16) for game in games)
+        lines = ["local Ranges = {"]
+        for prefix, bucket in sorted(bucket_ranges_by_prefix(ranges).items()):
+            bounds = ", ".join(f"0x{start:04X}, 0x{end:04X}" for start, end in bucket)
+            lines.append(f"[0x{prefix:04X}] = {{{bounds}}},")
+        lines.append("}")
+        lines.append(f"GameListFilterCategories.User[\"{category}\"] = function(Content)")
+        lines.append("local id = Content.TitleId")
+        lines.append("local ranges = Ranges[math.floor(id / 0x10000)]")
+        lines.append("if ranges == nil then return false end")
+        lines.append("id = id % 0x10000")
+        lines.append("local lo, hi = 1, #ranges / 2")
+        lines.append("while lo <= hi do")
+        lines.append("local mid = math.floor((lo + hi) / 2)")
+        lines.append("if id < ranges[2 * mid - 1] then hi = mid - 1")
+        lines.append("elseif id > ranges[2 * mid] then lo = mid + 1")
+        lines.append("else return true end")
+        lines.append("end")
+        lines.append("return false")
+        lines.append("end")
+        return "\n".join(lines) + "\n"
+
+    def range_compression(self, games):
+        """返回分类的 (TitleId数, 区间数)"""
+        title_ids = {int(game['hex_id'], 16) for game in games}
+        return len(title_ids), len(merge_title_id_ranges(title_ids))
+
+    def generate_lua_file(self, category, games, output_dir, lua_content=None):
+        """生成Lua分类文件 - 使用原始分类名称作为文件名和内容
+
+        先写入临时文件再原子替换，返回是否成功。
+        """
         if not games:
-            return
+            return True
 
         # 直接使用原始分类名称
         file_name = f"{category}.lua"
         file_path = os.path.join(output_dir, file_name)
 
-        # 生成Lua内容 - 使用原始分类名称
-        lua_content = f"GameListFilterCategories.User[\"{category}\"] = function(Content)\nreturn ("
-
-        # 添加游戏Title ID
-        for i, game in enumerate(games):
-            if i == 0:
-                lua_content += f"Content.TitleId == {game['hex_id']}"
-            else:
-                lua_content += f"\nor Content.TitleId == {game['hex_id']}"
-
-        lua_content += "\n)\nend\n"
+        if lua_content is None:
+            lua_content = self.build_lua_content(category, games)
 
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(lua_content)
+            write_file_atomic(file_path, lua_content)
             print(f"生成文件: {file_name} ({len(games)} 个游戏)")
+            return True
         except Exception as e:
             print(f"生成文件 {file_path} 失败: {e}")
+            return False
     
-    def generate_all_lua_files(self, xbox360_file, xboxlive_file, translations_file, output_dir):
-        """生成所有Lua分类文件"""
-        # 创建输出目录
-        Path(output_dir).mkdir(parents=True, exist_ok=True)
-        
-        # 加载翻译
-        self.load_translations(translations_file)
-        
-        # 解析游戏文件
-        xbox360_games = self.parse_game_file(xbox360_file)
-        xboxlive_games = []
-        if xboxlive_file and os.path.exists(xboxlive_file):
-            xboxlive_games = self.parse_game_file(xboxlive_file)
+    def generate_all_lua_files(self, xbox360_file, xboxlive_file, translations_file, output_dir,
+                               manifest=None, force=False, workers=None,
+                               merged_file=None, facets=None, min_facet_size=DEFAULT_MIN_FACET_SIZE):
+        """生成所有Lua分类文件
+
+        所有文件先由线程池并发写入暂存目录，全部成功后才整体替换输出目录，
+        中途失败时输出目录保持原样。
+        传入manifest时：输入文件未变化则直接跳过；否则只重写内容发生变化的分类文件，
+        并删除上次生成但本次已不存在的分类文件。
+        传入facets时改为从合并后的游戏数据(merged_file)一次遍历生成各维度的过滤器。
+        """
+        recover_output_dir(output_dir)
+
+        tracked_files = [xbox360_file, xboxlive_file, translations_file]
+        options = {'mode': self.mode}
+        if facets:
+            tracked_files = [merged_file]
+            options.update(facets=','.join(sorted(facets)), min_facet_size=min_facet_size)
+        if manifest is not None and not force:
+            unchanged, _ = manifest.files_unchanged('lua', tracked_files, options)
+            previous = manifest.stages.get('lua', {}).get('records', {})
+            outputs_present = all(os.path.exists(os.path.join(output_dir, f"{category}.lua"))
+                                  for category in previous)
+            if unchanged and outputs_present:
+                print("输入文件未变化，跳过Lua文件生成")
+                return
         
-        all_games = xbox360_games + xboxlive_games
-        print(f"总共处理了 {len(all_games)} 个游戏")
+        if facets:
+            with span('group_facets'):
+                categories, total = self.group_merged_games(merged_file, facets, min_facet_size)
+            count('records_processed', total)
+            print(f"从 {os.path.basename(merged_file)} 读取了 {total} 个游戏，"
+                  f"按 {', '.join(facets)} 生成 {len(categories)} 个过滤器")
+        else:
+            # 加载翻译
+            self.load_translations(translations_file)
+
+            # 解析游戏文件
+            with span('parse_games'):
+                xbox360_games = self.parse_game_file(xbox360_file)
+                xboxlive_games = []
+                if xboxlive_file and os.path.exists(xboxlive_file):
+                    xboxlive_games = self.parse_game_file(xboxlive_file)
+
+            all_games = xbox360_games + xboxlive_games
+            count('records_processed', len(all_games))
+            print(f"总共处理了 {len(all_games)} 个游戏")
+
+            # 按类别分类
+            categories = self.categorize_games(all_games)
         
-        # 按类别分类
-        categories = self.categorize_games(all_games)
+        # 生成Lua文件（有清单时只写入内容变化或缺失的分类文件）
+        with span('build_lua'):
+            contents = {category: self.build_lua_content(category, games)
+                        for category, games in categories.items() if games}
+        content_hashes = {category: record_hash(content) for category, content in contents.items()}
+        to_write = set(contents)
+        removed = set()
+        if manifest is not None and not force:
+            changed, removed = manifest.diff_records('lua', content_hashes)
+            to_write = {category for category in contents
+                        if category in changed
+                        or not os.path.exists(os.path.join(output_dir, f"{category}.lua"))}
+            print(f"需要重写 {len(to_write)} 个分类文件，{len(contents) - len(to_write)} 个未变化")
+
+        # 在暂存目录中完成全部写入
+        staging_dir = prepare_staging_dir(output_dir)
+        for category in removed:
+            stale_file = os.path.join(staging_dir, f"{category}.lua")
+            if os.path.exists(stale_file):
+                os.remove(stale_file)
+                print(f"删除过期文件: {category}.lua")
+
+        def write_category(category):
+            try:
+                write_file_atomic(os.path.join(staging_dir, f"{category}.lua"), contents[category])
+                return None
+            except Exception as e:
+                return e
+
+        # 线程池只在写文件时用到，不在导入模块时加载（--help 等调用保持快速启动）
+        from concurrent.futures import ThreadPoolExecutor
+
+        failed = 0
+        with span('write_lua'), ThreadPoolExecutor(max_workers=workers) as executor:
+            for category, error in zip(sorted(to_write), executor.map(write_category, sorted(to_write))):
+                if error is None and self.mode == 'range':
+                    ids, intervals = self.range_compression(categories[category])
+                    print(f"生成文件: {category}.lua ({len(categories[category])} 个游戏, "
+                          f"{ids} 个TitleId合并为 {intervals} 个区间, 压缩比 {ids / intervals:.2f})")
+                elif error is None:
+                    print(f"生成文件: {category}.lua ({len(categories[category])} 个游戏)")
+                else:
+                    print(f"生成文件 {category}.lua 失败: {error}")
+                    failed += 1
         
-        # 生成Lua文件
-        for category, games in categories.items():
-            self.generate_lua_file(category, games, output_dir)
+        if failed:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            print(f"\n有 {failed} 个文件生成失败，输出目录保持不变: {output_dir}")
+            return
         
         # 生成统计信息
-        self.generate_statistics(categories, output_dir)
+        self.generate_statistics(categories, staging_dir)
+
+        swap_output_dir(staging_dir, output_dir)
+
+        if manifest is not None:
+            _, file_hashes = manifest.files_unchanged('lua', tracked_files, options)
+            manifest.update('lua', file_hashes, content_hashes)
+            manifest.save()
         
         print(f"\nLua文件生成完成！文件保存在: {output_dir}")
     
@@ -170,44 +445,16 @@ class Xbox360LuaGenerator:
             'Unknown': '未知'
         }
 
-        # 解析xbox360.txt
-        if os.path.exists(xbox360_file):
+        # 从共享的解析结果中收集分类，不再重复读取文件
+        for file_path in (xbox360_file, xboxlive_file):
             try:
-                with open(xbox360_file, 'r', encoding='utf-8') as f:
-                    lines = f.readlines()
-
-                for line in lines[1:]:  # 跳过标题行
-                    line = line.strip()
-                    if not line:
-                        continue
-
-                    parts = line.split('\t')
-                    if len(parts) > 3:  # 第4个元素是分类（索引3）
-                        category = parts[3].strip()
-                        if category:
-                            categories.add(category)
+                for record in load_game_list(file_path):
+                    if record.category:
+                        categories.add(record.category)
             except Exception as e:
-                print(f"解析xbox360.txt失败: {e}")
+                print(f"解析{os.path.basename(file_path)}失败: {e}")
 
-        # 解析xbox360live.txt
-        if xboxlive_file and os.path.exists(xboxlive_file):
-            try:
-                with open(xboxlive_file, 'r', encoding='utf-8') as f:
-                    lines = f.readlines()
-
-                for line in lines[1:]:  # 跳过标题行
-                    line = line.strip()
-                    if not line:
-                        continue
-
-                    parts = line.split('\t')
-                    if len(parts) > 3:  # 第4个元素是分类（索引3）
-                        category = parts[3].strip()
-                        if category:
-                            categories.add(category)
-            except Exception as e:
-                print(f"解析xbox360live.txt失败: {e}")
-        elif xboxlive_file:
+        if xboxlive_file and not os.path.exists(xboxlive_file):
             print(f"警告: 找不到文件 {xboxlive_file}, 将只处理xbox360.txt")
 
         # 保存分类到genres.txt文件
@@ -233,18 +480,43 @@ class Xbox360LuaGenerator:
             f.write("=" * 40 + "\n\n")
             
             total_games = 0
+            total_ids = 0
+            total_intervals = 0
             for category, games in sorted(categories.items()):
-                count = len(games)
-                total_games += count
-                f.write(f"{category}: {count} 个游戏\n")
+                game_count = len(games)
+                total_games += game_count
+                if self.mode == 'range' and games:
+                    # 区间模式额外记录每个分类的压缩比（TitleId数 / 区间数）
+                    ids, intervals = self.range_compression(games)
+                    total_ids += ids
+                    total_intervals += intervals
+                    f.write(f"{category}: {game_count} 个游戏, {intervals} 个区间, 压缩比 {ids / intervals:.2f}\n")
+                else:
+                    f.write(f"{category}: {game_count} 个游戏\n")
             
             f.write(f"\n总计: {total_games} 个游戏\n")
+            if total_intervals:
+                f.write(f"区间总数: {total_intervals}, 总压缩比 {total_ids / total_intervals:.2f}\n")
         
         print(f"生成统计文件: statistics.txt")
 
 def main():
-    # 配置路径 - 使用Python程序所在目录
-    script_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description='Xbox 360 Lua过滤器生成器')
+    parser.add_argument('--force', action='store_true', help='忽略构建清单，重新生成全部Lua文件')
+    parser.add_argument('--mode', choices=LUA_MODES, default='or',
+                        help='Lua输出模式：or 链式比较(默认)、set 查表 或 range 区间二分查找')
+    parser.add_argument('--facets', nargs='+', choices=FACETS,
+                        help='从合并后的游戏数据生成多维过滤器（默认只按xbox360.txt/xbox360live.txt的分类生成）')
+    parser.add_argument('--merged', help='合并后的游戏数据（默认 xbox360_games_updated.json）')
+    parser.add_argument('--min-facet-size', type=int, default=DEFAULT_MIN_FACET_SIZE,
+                        help=f'分类以外的过滤器至少包含的游戏数(默认 {DEFAULT_MIN_FACET_SIZE})')
+    parser.add_argument('--root', help='数据文件所在目录，genres.txt和lua目录也写在这里（默认程序所在目录）')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    start_profiling(args, 'generate_lua_filters')
+
+    # 配置路径 - 默认使用Python程序所在目录
+    script_dir = os.path.abspath(args.root) if args.root else os.path.dirname(os.path.abspath(__file__))
     base_dir = script_dir  # 当前目录就是根目录
     
     xbox360_file = os.path.join(base_dir, "xbox360.txt")
@@ -252,8 +524,14 @@ def main():
     translations_file = os.path.join(base_dir, "xbox_translations.json")
     genres_file = os.path.join(script_dir, "genres.txt")  # 分类文件在根目录，文件名为genres.txt
     output_dir = os.path.join(script_dir, "lua")  # Lua文件在py程序目录下的lua文件夹
+    manifest_file = os.path.join(script_dir, "build_manifest.json")
+    merged_file = args.merged or os.path.join(base_dir, "xbox360_games_updated.json")
     
     # 检查输入文件
+    if args.facets and not os.path.exists(merged_file):
+        print(f"错误: 找不到文件 {merged_file}，请先运行 update_xbox_games.py")
+        return
+    
     if not os.path.exists(xbox360_file):
         print(f"错误: 找不到文件 {xbox360_file}")
         return
@@ -265,11 +543,12 @@ def main():
     print("=== Xbox 360 Lua过滤器生成器 ===")
     
     # 生成Lua文件
-    generator = Xbox360LuaGenerator()
+    generator = Xbox360LuaGenerator(mode=args.mode)
     
     # 第一步：提取分类到genres.txt
     print("\n第一步：提取游戏分类...")
-    generator.extract_categories_to_genres(xbox360_file, xboxlive_file, genres_file)
+    with span('extract_genres'):
+        generator.extract_categories_to_genres(xbox360_file, xboxlive_file, genres_file)
     
     # 第二步：生成Lua文件
     print("\n第二步：生成Lua分类文件...")
@@ -277,7 +556,12 @@ def main():
         xbox360_file, 
         xboxlive_file, 
         translations_file, 
-        output_dir
+        output_dir,
+        manifest=BuildManifest(manifest_file),
+        force=args.force,
+        merged_file=merged_file,
+        facets=args.facets,
+        min_facet_size=args.min_facet_size
     )
     
     print("\n✓ 所有任务完成！")
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Redump Logiqx datfile 导入工具
+用iterparse流式解析 "Microsoft - Xbox 360 - Datfile" (.dat 或直接读取 .zip 内的 .dat)，
+把每张光盘的 name/size/crc/md5/sha1 在单个事务中导入 xbox_games.db 的 RedumpDiscs 表，
+ISO校验等任务直接查询SQLite，无需重复解析XML。
+
+用法:
+    python import_redump_dat.py [datfile.zip|datfile.dat] [--db xbox_games.db]
+"""
+
+import argparse
+import glob
+import os
+import sqlite3
+import zipfile
+import xml.etree.ElementTree as ET
+
+from instrumentation import add_profile_arguments, count, span, start_profiling
+
+DEFAULT_DATFILE_PATTERN = 'Microsoft - Xbox 360 - Datfile*'
+
+def create_redump_tables(cursor):
+    """创建RedumpDiscs和RedumpDatInfo表"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS RedumpDiscs (
+            Id INTEGER PRIMARY KEY AUTOINCREMENT,
+            GameName TEXT NOT NULL,
+            Category TEXT,
+            RomName TEXT NOT NULL,
+            Size INTEGER,
+            Crc TEXT,
+            Md5 TEXT,
+            Sha1 TEXT,
+            UNIQUE (GameName, RomName)
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS IDX_RedumpDiscs_Size ON RedumpDiscs(Size)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS IDX_RedumpDiscs_Sha1 ON RedumpDiscs(Sha1)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS IDX_RedumpDiscs_Md5 ON RedumpDiscs(Md5)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS IDX_RedumpDiscs_Crc ON RedumpDiscs(Crc)')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS RedumpDatInfo (
+            Name TEXT PRIMARY KEY,
+            Description TEXT,
+            Version TEXT,
+            DiscCount INTEGER
+        )
+    ''')
+
+def redump_table_exists(db_file):
+    """数据库中是否已有导入过的RedumpDiscs表"""
+    if not os.path.exists(db_file):
+        return False
+    conn = sqlite3.connect(db_file)
+    try:
+        return conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'RedumpDatInfo'").fetchone() is not None
+    finally:
+        conn.close()
+
+def find_default_datfile(directory=''):
+    """在指定目录（默认当前目录）查找datfile，优先使用.zip"""
+    pattern = os.path.join(directory, DEFAULT_DATFILE_PATTERN)
+    candidates = sorted(glob.glob(pattern + '.zip')) + sorted(glob.glob(pattern + '.dat'))
+    return candidates[0] if candidates else None
+
+def open_datfile(datfile_path):
+    """打开datfile的二进制流；.zip 直接读取压缩包中的第一个 .dat，不解压到磁盘"""
+    if not zipfile.is_zipfile(datfile_path):
+        return open(datfile_path, 'rb')
+
+    archive = zipfile.ZipFile(datfile_path)
+    members = [name for name in archive.namelist() if name.lower().endswith('.dat')]
+    if not members:
+        archive.close()
+        raise ValueError(f"压缩包中没有.dat文件: {datfile_path}")
+    stream = archive.open(members[0])
+    # 关闭流时一并关闭压缩包
+    original_close = stream.close
+
+    def close():
+        original_close()
+        archive.close()
+
+    stream.close = close
+    return stream
+
+def iter_datfile(stream, header=None):
+    """流式解析datfile，逐个产出 (GameName, Category, RomName, Size, Crc, Md5, Sha1)
+
+    每个<game>处理完后立即清除，内存占用与文件大小无关。
+    传入header字典时填入 <header> 中的 name/description/version。
+    """
+    context = ET.iterparse(stream, events=('start', 'end'))
+    _, root = next(context)
+    for event, elem in context:
+        if event != 'end':
+            continue
+        if elem.tag == 'header':
+            if header is not None:
+                for field in ('name', 'description', 'version'):
+                    header[field] = (elem.findtext(field) or '').strip()
+            root.clear()
+        elif elem.tag == 'game':
+            game_name = elem.get('name', '')
+            category = (elem.findtext('category') or '').strip()
+            for rom in elem.iter('rom'):
+                size = rom.get('size')
+                yield (
+                    game_name,
+                    category,
+                    rom.get('name', ''),
+                    int(size) if size and size.isdigit() else None,
+                    (rom.get('crc') or '').lower() or None,
+                    (rom.get('md5') or '').lower() or None,
+                    (rom.get('sha1') or '').lower() or None,
+                )
+            root.clear()
+
+def import_redump_datfile(datfile_path, db_file='xbox_games.db', manifest=None, force=False):
+    """在单个事务中用datfile内容替换RedumpDiscs表，返回导入的光盘(rom)数量
+
+    传入manifest时，datfile与上次导入相同且数据库中已有RedumpDiscs表则跳过（返回None）。
+    """
+    options = {'db': os.path.abspath(db_file)}
+    if manifest is not None and not force:
+        unchanged, _ = manifest.files_unchanged('datfile', [datfile_path], options)
+        if unchanged and redump_table_exists(db_file):
+            print(f"datfile未变化，跳过导入: {os.path.basename(datfile_path)}")
+            return None
+
+    conn = sqlite3.connect(db_file)
+    header = {}
+    try:
+        with conn:
+            cursor = conn.cursor()
+            create_redump_tables(cursor)
+            cursor.execute('DELETE FROM RedumpDiscs')
+            with span('import_datfile'), open_datfile(datfile_path) as stream:
+                cursor.executemany('''
+                    INSERT OR REPLACE INTO RedumpDiscs (GameName, Category, RomName, Size, Crc, Md5, Sha1)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', iter_datfile(stream, header))
+            disc_count = cursor.execute('SELECT COUNT(*) FROM RedumpDiscs').fetchone()[0]
+            count('rows_inserted', disc_count)
+            cursor.execute('DELETE FROM RedumpDatInfo')
+            cursor.execute('INSERT INTO RedumpDatInfo (Name, Description, Version, DiscCount) VALUES (?, ?, ?, ?)',
+                           (header.get('name', ''), header.get('description', ''), header.get('version', ''), disc_count))
+    finally:
+        conn.close()
+
+    if manifest is not None:
+        _, file_hashes = manifest.files_unchanged('datfile', [datfile_path], options)
+        manifest.update('datfile', file_hashes)
+        manifest.save()
+
+    print(f"datfile: {header.get('description') or os.path.basename(datfile_path)}")
+    print(f"已导入 {disc_count} 条光盘记录到 {db_file} (RedumpDiscs)")
+    return disc_count
+
+def main():
+    parser = argparse.ArgumentParser(description='导入Redump Xbox 360 datfile到SQLite')
+    parser.add_argument('datfile', nargs='?', help='datfile路径(.dat或.zip)，默认自动查找')
+    parser.add_argument('--db', default='xbox_games.db', help='目标数据库')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    start_profiling(args, 'import_redump_dat')
+
+    datfile_path = args.datfile or find_default_datfile()
+    if not datfile_path or not os.path.exists(datfile_path):
+        print("错误: 找不到Redump datfile")
+        return
+
+    try:
+        import_redump_datfile(datfile_path, args.db)
+    except (ET.ParseError, ValueError, zipfile.BadZipFile) as e:
+        print(f"解析datfile失败，数据库未修改: {e}")
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,20 @@
-import json
+import argparse
 import sqlite3
 import os
 
+from analyze_xbox_data import refresh_catalog_stats
+from build_manifest import BuildManifest, file_hash, record_hash
+from instrumentation import add_profile_arguments, count, span, start_profiling
+from search_xbox_games import ensure_search_index
+from update_xbox_games import iter_games
+
 def create_content_table(cursor):
     """创建ContentItems表"""
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS ContentItems (
             Id INTEGER PRIMARY KEY AUTOINCREMENT,
             TitleId TEXT NOT NULL,
+            TitleIdNum INTEGER,
             Title TEXT,
             Title_cn TEXT,
             Developer TEXT,
@@ -19,53 +26,241 @@ def create_content_table(cursor):
         )
     ''')
 
-def import_xbox_games_to_db():
-    """将Xbox游戏数据导入到SQLite数据库"""
+# 参与导入/比较的数据列，顺序与 JSON 字段一一对应
+CONTENT_COLUMNS = ('Title', 'Title_cn', 'Developer', 'Publisher', 'Platform', 'FolderTitle', 'Category', 'Year')
+JSON_FIELDS = ('Title', 'Title_cn', 'Developer', 'Publisher', 'Platform', 'Folder Title', 'Category', 'Year')
+
+def normalize_title_id(title_id):
+    """将Title ID规范化为8位小写十六进制字符串，无法识别时返回None"""
+    if not title_id:
+        return None
+    title_id = str(title_id).strip().lower()
+    if title_id.startswith('0x'):
+        title_id = title_id[2:]
+    if not title_id or len(title_id) > 8:
+        return None
+    try:
+        int(title_id, 16)
+    except ValueError:
+        return None
+    return title_id.zfill(8)
+
+def title_id_to_int(title_id):
+    """将规范化后的Title ID转换为无符号32位整数"""
+    return int(title_id, 16)
+
+def ensure_title_id_unique(cursor):
+    """规范化已有的TitleId并去重，然后建立唯一索引
+
+    旧版本每次运行都会追加一整份数据，这里对每个TitleId只保留最新(Id最大)的一行。
+    与新导入的行一样用normalize_title_id规范化（去掉0x前缀、补零），
+    使 0x4D5307E6 与 4d5307e6 视为同一个TitleId；无法识别的TitleId按去空白后的小写形式比较。
+    """
+    rows = cursor.execute('SELECT Id, TitleId FROM ContentItems ORDER BY Id').fetchall()
+    latest = {}
+    renamed = []
+    for row_id, title_id in rows:
+        key = normalize_title_id(title_id) or str(title_id).strip().lower()
+        latest[key] = row_id
+        if key != title_id:
+            renamed.append((key, row_id))
+
+    keep = set(latest.values())
+    duplicates = [(row_id,) for row_id, _ in rows if row_id not in keep]
+    cursor.executemany('DELETE FROM ContentItems WHERE Id = ?', duplicates)
+    cursor.executemany('UPDATE ContentItems SET TitleId = ? WHERE Id = ?',
+                       [(key, row_id) for key, row_id in renamed if row_id in keep])
+    removed = len(duplicates)
+    cursor.execute('CREATE UNIQUE INDEX IF NOT EXISTS IDX_ContentItems_TitleId ON ContentItems(TitleId)')
+    return removed
+
+def migrate_title_id_num(cursor):
+    """为旧数据库补充TitleIdNum整数列及覆盖索引（可重复执行，已迁移的行不会再处理）"""
+    columns = {row[1] for row in cursor.execute('PRAGMA table_info(ContentItems)')}
+    if 'TitleIdNum' not in columns:
+        cursor.execute('ALTER TABLE ContentItems ADD COLUMN TitleIdNum INTEGER')
+
+    pending = []
+    for row_id, title_id in cursor.execute('SELECT Id, TitleId FROM ContentItems WHERE TitleIdNum IS NULL').fetchall():
+        normalized = normalize_title_id(title_id)
+        if normalized is not None:
+            pending.append((title_id_to_int(normalized), row_id))
+    cursor.executemany('UPDATE ContentItems SET TitleIdNum = ? WHERE Id = ?', pending)
+
+    # 覆盖索引：按TitleIdNum查找中文标题时无需回表
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS IDX_ContentItems_TitleIdNum
+        ON ContentItems(TitleIdNum, Title, Title_cn)
+    ''')
+    return len(pending)
+
+def migrate_existing_db(db_path):
+    """一次性迁移已有的xbox_games.db：去重、规范化TitleId并补充TitleIdNum"""
+    if not os.path.exists(db_path):
+        print(f"数据库文件不存在: {db_path}")
+        return
+
+    conn = sqlite3.connect(db_path)
+    try:
+        with conn:
+            cursor = conn.cursor()
+            removed = ensure_title_id_unique(cursor)
+            migrated = migrate_title_id_num(cursor)
+    finally:
+        conn.close()
+
+    print(f"迁移完成: {db_path}")
+    print(f"- 清理重复记录: {removed} 条")
+    print(f"- 补充TitleIdNum: {migrated} 条")
+
+def build_upsert_rows(games_data):
+    """把JSON游戏列表转换为 (TitleId, 数据列...) 元组，按规范化后的TitleId去重(后出现的覆盖先出现的)
+
+    返回 (rows, 跳过数量, 重复TitleId -> 出现次数)。
+    """
+    rows = {}
+    skipped = 0
+    occurrences = {}
+    for game in games_data:
+        title_id = normalize_title_id(game.get('Title ID'))
+        if title_id is None:
+            print(f"跳过无效的Title ID: '{game.get('Title ID', '')}' ({game.get('Title', 'Unknown')})")
+            skipped += 1
+            continue
+        rows[title_id] = tuple(game.get(field, '') for field in JSON_FIELDS)
+        occurrences[title_id] = occurrences.get(title_id, 0) + 1
+    duplicates = {title_id: count for title_id, count in occurrences.items() if count > 1}
+    return rows, skipped, duplicates
+
+def upsert_games(conn, games_data, source_duplicates=None):
+    """在单个事务中批量upsert游戏数据（搜索索引由触发器同步）并刷新CatalogStats统计表，返回 (新增, 更新, 未变化, 跳过) 数量
+
+    source_duplicates: 完整源数据中的重复TitleId（只upsert部分记录时由调用方提供）。
+    """
+    cursor = conn.cursor()
+    rows, skipped, duplicates = build_upsert_rows(games_data)
+    if source_duplicates is not None:
+        duplicates = source_duplicates
+
+    columns = ', '.join(CONTENT_COLUMNS)
+    assignments = ', '.join(f'{col} = excluded.{col}' for col in CONTENT_COLUMNS)
+    changed = ' OR '.join(f'{col} IS NOT excluded.{col}' for col in CONTENT_COLUMNS)
+    placeholders = ', '.join('?' * (len(CONTENT_COLUMNS) + 2))
+
+    with conn:
+        # 先注册短词索引触发器用到的函数，清理重复记录时触发器才能正常执行
+        ensure_search_index(cursor)
+        removed = ensure_title_id_unique(cursor)
+        if removed:
+            print(f"已清理 {removed} 条重复的TitleId记录")
+        migrate_title_id_num(cursor)
+
+        # 读取现有数据快照，用于区分新增/更新/未变化
+        existing = {
+            row[0]: tuple(row[1:])
+            for row in cursor.execute(f'SELECT TitleId, {columns} FROM ContentItems')
+        }
+
+        inserted_count = updated_count = unchanged_count = 0
+        pending = []
+        for title_id, values in rows.items():
+            old_values = existing.get(title_id)
+            if old_values is None:
+                inserted_count += 1
+            elif old_values == values:
+                unchanged_count += 1
+                continue
+            else:
+                updated_count += 1
+            pending.append((title_id, title_id_to_int(title_id)) + values)
+
+        count('records_processed', len(rows) + skipped)
+        with span('upsert'):
+            cursor.executemany(f'''
+                INSERT INTO ContentItems (TitleId, TitleIdNum, {columns})
+                VALUES ({placeholders})
+                ON CONFLICT(TitleId) DO UPDATE SET {assignments}
+                WHERE {changed}
+            ''', pending)
+            count('rows_inserted', inserted_count)
+            count('rows_updated', updated_count)
+
+        with span('refresh_stats'):
+            refresh_catalog_stats(conn, duplicates)
+
+    return inserted_count, updated_count, unchanged_count, skipped
+
+def import_xbox_games_to_db(games_file='xbox360_games_updated.json', db_file='xbox_games.db',
+                            manifest=None, force=False):
+    """将Xbox游戏数据导入到SQLite数据库（按TitleId upsert，可重复运行）
+
+    传入manifest时只upsert与上次导入相比发生变化的记录；
+    数据库文件在两次运行之间被外部修改时回退为完整upsert。
+    """
     # 检查游戏数据文件是否存在
-    if not os.path.exists('xbox360_games_updated.json'):
-        print("错误: 找不到 xbox360_games_updated.json 文件")
+    if not os.path.exists(games_file):
+        print(f"错误: 找不到 {games_file} 文件")
         return
     
-    # 读取游戏数据
-    with open('xbox360_games_updated.json', 'r', encoding='utf-8') as f:
-        games_data = json.load(f)
+    tracked_files = [games_file, db_file]
+    db_untouched = False
+    if manifest is not None and not force:
+        unchanged, _ = manifest.files_unchanged('import', tracked_files)
+        if unchanged:
+            print("游戏数据与数据库均未变化，跳过导入")
+            return
+        previous_db_hash = manifest.stages.get('import', {}).get('files', {}).get(db_file)
+        db_untouched = previous_db_hash is not None and previous_db_hash == file_hash(db_file)
+    
+    # 增量读取游戏数据（同时支持JSON数组和NDJSON）
+    games_data = iter_games(games_file)
+    
+    record_hashes = {}
+    source_duplicates = None
+    skipped_unchanged = 0
+    if manifest is not None:
+        with span('read_games'):
+            games_data = list(games_data)
+        occurrences = {}
+        for game in games_data:
+            title_id = normalize_title_id(game.get('Title ID'))
+            if title_id is not None:
+                record_hashes[title_id] = record_hash(game)
+                occurrences[title_id] = occurrences.get(title_id, 0) + 1
+        source_duplicates = {title_id: count for title_id, count in occurrences.items() if count > 1}
+        if db_untouched:
+            changed_ids, _ = manifest.diff_records('import', record_hashes)
+            changed_games = [game for game in games_data
+                             if normalize_title_id(game.get('Title ID')) in changed_ids]
+            skipped_unchanged = len(games_data) - len(changed_games)
+            games_data = changed_games
     
     # 连接到数据库（如果不存在会自动创建）
-    conn = sqlite3.connect('xbox_games.db')
-    cursor = conn.cursor()
+    conn = sqlite3.connect(db_file)
     
     # 创建表
-    create_content_table(cursor)
+    create_content_table(conn.cursor())
+    
+    # 批量upsert数据
+    try:
+        inserted_count, updated_count, unchanged_count, skipped = upsert_games(conn, games_data, source_duplicates)
+    except sqlite3.Error as e:
+        print(f"导入数据时出错，已回滚: {e}")
+        conn.close()
+        return
     
-    # 插入数据
-    inserted_count = 0
-    for game in games_data:
-        try:
-            cursor.execute('''
-                INSERT INTO ContentItems 
-                (TitleId, Title, Title_cn, Developer, Publisher, Platform, FolderTitle, Category, Year)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                game.get('Title ID', ''),
-                game.get('Title', ''),
-                game.get('Title_cn', ''),
-                game.get('Developer', ''),
-                game.get('Publisher', ''),
-                game.get('Platform', ''),
-                game.get('Folder Title', ''),
-                game.get('Category', ''),
-                game.get('Year', '')
-            ))
-            inserted_count += 1
-        except Exception as e:
-            print(f"插入游戏 '{game.get('Title', 'Unknown')}' 时出错: {e}")
-    
-    # 提交更改并关闭连接
-    conn.commit()
     conn.close()
+    unchanged_count += skipped_unchanged
+    
+    if manifest is not None:
+        _, file_hashes = manifest.files_unchanged('import', tracked_files)
+        manifest.update('import', file_hashes, record_hashes)
+        manifest.save()
     
-    print(f"成功导入 {inserted_count} 个游戏到数据库")
-    print("数据库文件已保存为: xbox_games.db")
+    print(f"导入完成: 新增 {inserted_count} 个, 更新 {updated_count} 个, 未变化 {unchanged_count} 个游戏")
+    if skipped:
+        print(f"跳过 {skipped} 个Title ID无效的游戏")
+    print(f"数据库文件已保存为: {db_file}")
 
 def query_sample_data():
     """查询并显示示例数据"""
@@ -114,12 +309,27 @@ def query_sample_data():
     
     conn.close()
 
-if __name__ == "__main__":
+def main():
+    parser = argparse.ArgumentParser(description='Xbox游戏数据导入工具')
+    parser.add_argument('--migrate', nargs='?', const='xbox_games.db', metavar='DB',
+                        help='仅迁移已有数据库（默认 xbox_games.db）')
+    parser.add_argument('--force', action='store_true', help='忽略构建清单，强制完整导入')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    start_profiling(args, 'import_xbox_data')
+
     print("Xbox游戏数据导入工具")
     print("=" * 30)
     
+    if args.migrate:
+        migrate_existing_db(args.migrate)
+        return
+    
     # 导入数据
-    import_xbox_games_to_db()
+    import_xbox_games_to_db(manifest=BuildManifest(), force=args.force)
     
     # 显示示例数据
-    query_sample_data()
\ No newline at end of file
+    query_sample_data()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+共享的运行时统计工具
+各脚本用 span() 标记处理阶段、用 count() 累计处理记录数/插入行数/写入字节数等计数器。
+默认不启用，span()/count() 几乎没有开销，也不改变脚本输出；
+命令行加 --profile 时在脚本退出后写出JSON跟踪文件（兼容 chrome://tracing / Perfetto 的 traceEvents），
+加 --cprofile 时同时写出cProfile统计文件（可用 snakeviz、flameprof 等工具生成火焰图）。
+
+用法:
+    parser = argparse.ArgumentParser(...)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    start_profiling(args, 'import_xbox_data')
+
+    with span('upsert'):
+        ...
+        count('rows_inserted', inserted)
+"""
+
+import atexit
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+
+# 当前启用的跟踪器，未启用时为None
+_tracer = None
+
+def peak_rss_mb():
+    """当前进程的峰值常驻内存(MB)"""
+    try:
+        import resource
+    except ImportError:
+        # Windows没有resource模块，改用 GetProcessMemoryInfo
+        import ctypes
+        from ctypes import wintypes
+
+        class ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD),
+                        ('PeakWorkingSetSize', ctypes.c_size_t), ('WorkingSetSize', ctypes.c_size_t),
+                        ('QuotaPeakPagedPoolUsage', ctypes.c_size_t), ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                        ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t), ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                        ('PagefileUsage', ctypes.c_size_t), ('PeakPagefileUsage', ctypes.c_size_t)]
+
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        ctypes.windll.psapi.GetProcessMemoryInfo(ctypes.windll.kernel32.GetCurrentProcess(),
+                                                 ctypes.byref(counters), counters.cb)
+        return counters.PeakWorkingSetSize / (1024 * 1024)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux以KB为单位，macOS以字节为单位
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+class Tracer:
+    """记录嵌套的阶段(span)及其计数器"""
+
+    def __init__(self, name):
+        self.name = name
+        self.started_at = datetime.now().isoformat(timespec='seconds')
+        self.origin = time.perf_counter()
+        self.spans = []
+        self.counters = {}
+        self._stack = []
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def span(self, name):
+        record = {
+            'name': name,
+            'parent': self._stack[-1]['name'] if self._stack else None,
+            'start_s': time.perf_counter() - self.origin,
+            'counters': {},
+        }
+        self.spans.append(record)
+        self._stack.append(record)
+        try:
+            yield record
+        finally:
+            self._stack.pop()
+            record['duration_s'] = time.perf_counter() - self.origin - record['start_s']
+            record['peak_rss_mb'] = round(peak_rss_mb(), 1)
+
+    def count(self, name, value=1):
+        # 工作线程也可能累计计数，计入主线程当前所在的阶段
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+            if self._stack:
+                counters = self._stack[-1]['counters']
+                counters[name] = counters.get(name, 0) + value
+
+    def report(self):
+        wall = time.perf_counter() - self.origin
+        pid = os.getpid()
+        events = [{
+            'name': record['name'], 'ph': 'X', 'pid': pid, 'tid': 0,
+            'ts': round(record['start_s'] * 1e6), 'dur': round(record.get('duration_s', 0) * 1e6),
+            'args': record['counters'],
+        } for record in self.spans]
+        events.extend({
+            'name': name, 'ph': 'C', 'pid': pid, 'ts': round(wall * 1e6), 'args': {name: value},
+        } for name, value in sorted(self.counters.items()))
+        return {
+            'script': self.name,
+            'argv': sys.argv[1:],
+            'started_at': self.started_at,
+            'wall_s': round(wall, 6),
+            'peak_rss_mb': round(peak_rss_mb(), 1),
+            'counters': dict(sorted(self.counters.items())),
+            'spans': [{**record, 'start_s': round(record['start_s'], 6),
+                       'duration_s': round(record.get('duration_s', 0), 6)} for record in self.spans],
+            'traceEvents': events,
+        }
+
+def span(name):
+    """标记一个处理阶段；未启用跟踪时不做任何事"""
+    if _tracer is None:
+        return contextlib.nullcontext()
+    return _tracer.span(name)
+
+def count(name, value=1):
+    """累计计数器（如 records_processed、rows_inserted、bytes_written）；未启用跟踪时不做任何事"""
+    if _tracer is not None:
+        _tracer.count(name, value)
+
+def enabled():
+    return _tracer is not None
+
+def add_profile_arguments(parser):
+    """为脚本的命令行添加 --profile / --cprofile 参数"""
+    parser.add_argument('--profile', nargs='?', const='', metavar='TRACE',
+                        help='退出时写出JSON跟踪文件（默认 <脚本名>.trace.json）')
+    parser.add_argument('--cprofile', metavar='FILE', help='同时用cProfile采样并写出统计文件(.prof)')
+
+def start_profiling(args, name):
+    """根据命令行参数启用跟踪，脚本退出时自动写出结果"""
+    global _tracer
+    trace_file = getattr(args, 'profile', None)
+    cprofile_file = getattr(args, 'cprofile', None)
+    if trace_file is None and cprofile_file is None:
+        return
+
+    profiler = None
+    if cprofile_file:
+        import cProfile
+        profiler = cProfile.Profile()
+
+    _tracer = Tracer(name)
+    root = _tracer.span(name)
+    root.__enter__()
+    if profiler is not None:
+        profiler.enable()
+
+    def finish():
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(cprofile_file)
+            print(f"cProfile统计已写入: {cprofile_file}", file=sys.stderr)
+        root.__exit__(None, None, None)
+        if trace_file is not None:
+            path = trace_file or f'{name}.trace.json'
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(_tracer.report(), f, ensure_ascii=False, indent=2)
+            print(f"跟踪结果已写入: {path}", file=sys.stderr)
+
+    atexit.register(finish)
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地游戏信息查询服务
+在 localhost 上提供HTTP查询接口，后端为一组只读的SQLite连接（连接池），前面加一层LRU缓存，
+前端工具一次请求即可批量查询多个TitleId，不必每次查询都打开数据库或重新加载JSON。
+
+接口:
+    GET  /title/<TitleId>             单个查询，找不到时返回404
+    GET  /titles?ids=4d5307e6,415607e1 批量查询
+    POST /titles  {"titleIds": [...]} 批量查询（TitleId可为十六进制字符串或整数）
+    GET  /stats                       缓存命中率等运行状态
+
+批量查询返回 {"<8位小写TitleId>": {"Title", "Title_cn", "Developer", "Category", "Year"} 或 null}
+
+用法:
+    python lookup_server.py [--db xbox_games.db] [--port 8360] [--pool-size 8] [--cache-size 65536] [--immutable]
+"""
+
+import argparse
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from import_xbox_data import normalize_title_id, title_id_to_int
+
+DEFAULT_PORT = 8360
+LOOKUP_FIELDS = ('Title', 'Title_cn', 'Developer', 'Category', 'Year')
+
+# 单条SQL中IN列表的最大参数数（低于SQLite默认的变量数上限）
+MAX_SQL_VARIABLES = 500
+# 单次批量查询允许的最大TitleId数
+MAX_BATCH_SIZE = 10000
+# 检查数据库文件是否被修改的最小间隔（秒）
+RELOAD_CHECK_INTERVAL = 1.0
+
+class ConnectionPool:
+    """固定数量的只读SQLite连接，线程间共享"""
+
+    def __init__(self, db_file, size=8, immutable=False):
+        # immutable=1 时SQLite不加锁也不检查文件变化，只适合运行期间不会被修改的数据库
+        uri = f"file:{os.path.abspath(db_file)}?mode=ro{'&immutable=1' if immutable else ''}"
+        self.size = size
+        self._connections = queue.Queue()
+        for _ in range(size):
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            conn.execute('PRAGMA query_only = ON')
+            self._connections.put(conn)
+
+    @contextmanager
+    def connection(self):
+        conn = self._connections.get()
+        try:
+            yield conn
+        finally:
+            self._connections.put(conn)
+
+    def close(self):
+        while not self._connections.empty():
+            self._connections.get_nowait().close()
+
+class LRUCache:
+    """线程安全的LRU缓存，记录命中/未命中次数"""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys):
+        """返回 (已缓存的 {key: value}, 未缓存的key列表)"""
+        found = {}
+        missing = []
+        with self._lock:
+            for key in keys:
+                if key in self._items:
+                    self._items.move_to_end(key)
+                    found[key] = self._items[key]
+                else:
+                    missing.append(key)
+            self.hits += len(found)
+            self.misses += len(missing)
+        return found, missing
+
+    def put_many(self, items):
+        with self._lock:
+            for key, value in items.items():
+                self._items[key] = value
+                self._items.move_to_end(key)
+            while len(self._items) > self.capacity:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self):
+        return len(self._items)
+
+class TitleLookup:
+    """带缓存的TitleId批量查询"""
+
+    def __init__(self, db_file, pool_size=8, cache_size=65536, immutable=False):
+        self.db_file = db_file
+        self.pool = ConnectionPool(db_file, pool_size, immutable)
+        self.cache = LRUCache(cache_size)
+        self.immutable = immutable
+        self.queries = 0
+        self._version = self._db_version()
+        self._checked_at = time.monotonic()
+        self._lock = threading.Lock()
+        with self.pool.connection() as conn:
+            columns = {row[1] for row in conn.execute('PRAGMA table_info(ContentItems)')}
+        # 未迁移的旧数据库没有TitleIdNum列，退回按文本TitleId查询（无法使用索引）
+        self.has_title_id_num = 'TitleIdNum' in columns
+
+    def _db_version(self):
+        stat = os.stat(self.db_file)
+        return stat.st_mtime_ns, stat.st_size
+
+    def _check_reload(self):
+        """数据库文件被重新导入后清空缓存"""
+        now = time.monotonic()
+        if self.immutable or now - self._checked_at < RELOAD_CHECK_INTERVAL:
+            return
+        with self._lock:
+            self._checked_at = now
+            version = self._db_version()
+            if version != self._version:
+                self._version = version
+                self.cache.clear()
+
+    def lookup_many(self, title_ids):
+        """批量查询，返回 {规范化TitleId: 信息dict或None}；无效的TitleId原样作为键、值为None"""
+        self._check_reload()
+        results = {}
+        keys = {}
+        for title_id in title_ids:
+            if isinstance(title_id, int):
+                title_id = f'{title_id & 0xFFFFFFFF:08x}'
+            normalized = normalize_title_id(title_id)
+            if normalized is None:
+                results[str(title_id)] = None
+            else:
+                keys[title_id_to_int(normalized)] = normalized
+
+        found, missing = self.cache.get_many(keys)
+        if missing:
+            fetched = dict.fromkeys(missing)
+            columns = ', '.join(LOOKUP_FIELDS)
+            key_column = 'TitleIdNum' if self.has_title_id_num else 'lower(TitleId)'
+            with self.pool.connection() as conn:
+                for start in range(0, len(missing), MAX_SQL_VARIABLES):
+                    chunk = missing[start:start + MAX_SQL_VARIABLES]
+                    params = chunk if self.has_title_id_num else [keys[number] for number in chunk]
+                    rows = conn.execute(f'''
+                        SELECT {key_column}, {columns} FROM ContentItems
+                        WHERE {key_column} IN ({', '.join('?' * len(chunk))})
+                    ''', params)
+                    for row in rows:
+                        number = row[0] if self.has_title_id_num else title_id_to_int(row[0])
+                        fetched[number] = dict(zip(LOOKUP_FIELDS, row[1:]))
+            self.queries += 1
+            # 找不到的TitleId也缓存（值为None），避免重复查询
+            self.cache.put_many(fetched)
+            found.update(fetched)
+
+        for number, normalized in keys.items():
+            results[normalized] = found[number]
+        return results
+
+    def stats(self):
+        total = self.cache.hits + self.cache.misses
+        return {
+            'db': os.path.abspath(self.db_file),
+            'pool_size': self.pool.size,
+            'immutable': self.immutable,
+            'indexed': self.has_title_id_num,
+            'cache_size': len(self.cache),
+            'cache_capacity': self.cache.capacity,
+            'cache_hits': self.cache.hits,
+            'cache_misses': self.cache.misses,
+            'cache_hit_rate': round(self.cache.hits / total, 4) if total else 0.0,
+            'sql_queries': self.queries,
+        }
+
+class LookupHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 保持连接，前端连续查询时不必每次重新建立TCP连接；
+    # 关闭Nagle算法，避免响应头和响应体分两次发送时与延迟ACK叠加出约40ms的等待
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    lookup = None
+    quiet = True
+
+    def send_json(self, status, data):
+        body = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def batch(self, title_ids):
+        if len(title_ids) > MAX_BATCH_SIZE:
+            self.send_json(413, {'error': f'一次最多查询 {MAX_BATCH_SIZE} 个TitleId'})
+            return
+        self.send_json(200, self.lookup.lookup_many(title_ids))
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path.startswith('/title/'):
+            title_id = url.path[len('/title/'):]
+            result = self.lookup.lookup_many([title_id]).get(normalize_title_id(title_id) or title_id)
+            if result is None:
+                self.send_json(404, {'error': f'未找到 {title_id}'})
+            else:
+                self.send_json(200, result)
+        elif url.path == '/titles':
+            ids = [title_id for value in parse_qs(url.query).get('ids', [])
+                   for title_id in value.split(',') if title_id]
+            self.batch(ids)
+        elif url.path == '/stats':
+            self.send_json(200, self.lookup.stats())
+        else:
+            self.send_json(404, {'error': '未知接口'})
+
+    def do_POST(self):
+        if urlsplit(self.path).path != '/titles':
+            self.send_json(404, {'error': '未知接口'})
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            request = json.loads(self.rfile.read(length) or b'{}')
+            title_ids = request.get('titleIds') if isinstance(request, dict) else request
+            if not isinstance(title_ids, list):
+                raise ValueError('titleIds 必须是数组')
+        except ValueError as e:
+            self.send_json(400, {'error': f'请求格式错误: {e}'})
+            return
+        self.batch(title_ids)
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+class LookupServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # 前端一次刷新会同时建立大量连接
+    request_queue_size = 128
+
+def create_server(db_file='xbox_games.db', host='127.0.0.1', port=DEFAULT_PORT,
+                  pool_size=8, cache_size=65536, immutable=False, quiet=True):
+    """创建（未启动的）查询服务；port为0时自动选择空闲端口"""
+    lookup = TitleLookup(db_file, pool_size, cache_size, immutable)
+    handler = type('BoundLookupHandler', (LookupHandler,), {'lookup': lookup, 'quiet': quiet})
+    server = LookupServer((host, port), handler)
+    server.lookup = lookup
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description='本地游戏信息查询服务')
+    parser.add_argument('--db', default='xbox_games.db', help='游戏数据库')
+    parser.add_argument('--host', default='127.0.0.1', help='监听地址（默认只监听本机）')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'监听端口(默认 {DEFAULT_PORT})')
+    parser.add_argument('--pool-size', type=int, default=8, help='只读数据库连接数')
+    parser.add_argument('--cache-size', type=int, default=65536, help='LRU缓存的TitleId数量')
+    parser.add_argument('--immutable', action='store_true',
+                        help='以immutable模式打开数据库（运行期间数据库不会被重新导入时使用）')
+    parser.add_argument('--verbose', action='store_true', help='输出每个请求的日志')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"错误: 找不到数据库 {args.db}，请先运行 import_xbox_data.py")
+        return
+
+    server = create_server(args.db, args.host, args.port, args.pool_size, args.cache_size,
+                           args.immutable, quiet=not args.verbose)
+    if not server.lookup.has_title_id_num:
+        print(f"提示: {args.db} 缺少TitleIdNum列，查询无法使用索引，请先运行 import_xbox_data.py --migrate")
+    print(f"查询服务已启动: http://{args.host}:{server.server_address[1]}/ (数据库 {args.db})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.lookup.pool.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Redump光盘名称 → TitleId 匹配
+Redump datfile 中的光盘名称带有地区/语言/光盘编号标记，如
+"Condemned (USA, Europe) (En,Fr,De,Es,It)"、"Last Remnant, The (USA) (Disc 1)"，
+而游戏目录（xbox_games.db 的 ContentItems 表）只有不带标记的 Title。
+本工具去掉标记并规范化标点和数字后，对目录标题建立 词→TitleId 倒排索引，
+每个光盘名称只与共享词的目录标题比较（按IDF加权的Dice系数计算置信度）；
+目录中的标题常省略副标题和版本名，因此也尝试去掉 " - " 之后的部分再精确匹配，
+一次处理完RedumpDiscs中的全部光盘，结果写入 RedumpTitleMatches 表：
+
+    SELECT d.RomName, d.Sha1, c.Title, c.Title_cn
+    FROM RedumpDiscs d
+    JOIN RedumpTitleMatches m ON m.GameName = d.GameName
+    JOIN ContentItems c ON c.TitleId = m.TitleId
+
+用法:
+    python match_redump_titles.py [--db xbox_games.db] [--min-confidence 0.75] [--show-unmatched 20]
+"""
+
+import argparse
+import math
+import re
+import sqlite3
+
+from instrumentation import add_profile_arguments, count, span, start_profiling
+from title_matcher import TAG_PATTERN, normalize_title, numbers
+
+# 默认接受匹配的最低置信度
+DEFAULT_MIN_CONFIDENCE = 0.75
+
+# 去掉副标题后精确匹配（如 "Kane & Lynch 2 - Dog Days" → "Kane & Lynch 2"）的置信度
+PREFIX_CONFIDENCE = 0.9
+
+# 光盘名称是目录标题的严格前缀、且多出的词不是副标题（如 "Monster Jam" 与 "Monster Jam Battlegrounds"）时
+# 按词匹配的分数乘以该系数：直接接在主标题后面的词通常表示另一个游戏；
+# 以 ":" 或 " - " 分隔的副标题（"Happy Feet Two: The Videogame"）则是光盘名称省略的部分，不惩罚
+EXTRA_TOKENS_PENALTY = 0.85
+CATALOG_SUBTITLE_PATTERN = re.compile(r':| - ')
+
+# Redump把冠词放在标题末尾: "Darkness, The"、"Last Remnant, The - ..."
+TRAILING_ARTICLE_PATTERN = re.compile(r'^(.*?), (The|A|An)\b(.*)$')
+SUBTITLE_SEPARATOR = ' - '
+
+def strip_disc_tags(name):
+    """去掉Redump光盘名称中的地区/语言/光盘编号标记并还原后置冠词"""
+    name = TAG_PATTERN.sub('', name or '').strip()
+    article = TRAILING_ARTICLE_PATTERN.match(name)
+    if article:
+        name = f"{article.group(2)} {article.group(1)}{article.group(3)}"
+    return name
+
+def normalize_disc_name(name):
+    """去掉标记后按目录标题的规则规范化"""
+    return normalize_title(strip_disc_tags(name))
+
+def subtitle_prefixes(name):
+    """依次去掉最后一个副标题，返回规范化后的各个前缀（由长到短，不含完整名称）"""
+    segments = strip_disc_tags(name).split(SUBTITLE_SEPARATOR)
+    prefixes = []
+    for end in range(len(segments) - 1, 0, -1):
+        normalized = normalize_title(SUBTITLE_SEPARATOR.join(segments[:end]))
+        if normalized:
+            prefixes.append(normalized)
+    return prefixes
+
+def create_match_table(cursor):
+    """创建RedumpTitleMatches表（未匹配的光盘TitleId为NULL，Confidence为最高候选分）"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS RedumpTitleMatches (
+            GameName TEXT PRIMARY KEY,
+            TitleId TEXT,
+            Confidence REAL NOT NULL,
+            Method TEXT NOT NULL
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS IDX_RedumpTitleMatches_TitleId ON RedumpTitleMatches(TitleId)')
+
+class CatalogTokenIndex:
+    """目录标题的 规范化标题→TitleId 精确映射和 词→目录条目 倒排索引"""
+
+    def __init__(self, catalog):
+        self.title_ids = []
+        self.normalized = []
+        self.main_titles = []
+        self.tokens = []
+        self.numbers = []
+        self.exact = {}
+        self.index = {}
+
+        for title_id, title in catalog:
+            normalized = normalize_title(title)
+            if not normalized:
+                continue
+            entry = len(self.title_ids)
+            tokens = set(normalized.split())
+            self.title_ids.append(title_id)
+            self.normalized.append(normalized)
+            self.main_titles.append(normalize_title(CATALOG_SUBTITLE_PATTERN.split(title, 1)[0]))
+            self.tokens.append(tokens)
+            self.numbers.append(numbers(normalized))
+            # 同名的多个TitleId（不同地区版本）保留先出现的
+            self.exact.setdefault(normalized, title_id)
+            for token in tokens:
+                self.index.setdefault(token, []).append(entry)
+
+        # 出现越少的词区分度越高
+        total = len(self.title_ids)
+        self.weights = {token: math.log(1 + total / len(postings)) for token, postings in self.index.items()}
+        self.entry_weights = [sum(self.weights[token] for token in tokens) for tokens in self.tokens]
+
+    def match(self, name):
+        """返回 (TitleId或None, 置信度0~1, 匹配方式 exact/token/prefix/none)"""
+        normalized = normalize_disc_name(name)
+        if not normalized:
+            return None, 0.0, 'none'
+
+        title_id = self.exact.get(normalized)
+        if title_id is not None:
+            return title_id, 1.0, 'exact'
+
+        # 只累加与光盘名称共享词的目录条目，不扫描整个目录
+        tokens = set(normalized.split())
+        shared = {}
+        for token in tokens:
+            weight = self.weights.get(token)
+            if weight is None:
+                continue
+            for entry in self.index[token]:
+                shared[entry] = shared.get(entry, 0.0) + weight
+        # 去掉的副标题中含数字（如 "Rock Band - Country Track Pack 2"）时是另一张光盘
+        disc_numbers = numbers(normalized)
+        prefix_id = next((self.exact[prefix] for prefix in subtitle_prefixes(name)
+                          if prefix in self.exact and numbers(prefix) == disc_numbers), None)
+        if not shared:
+            return (prefix_id, PREFIX_CONFIDENCE, 'prefix') if prefix_id else (None, 0.0, 'none')
+
+        # 目录中没有的词按最高权重计入，避免只凭一个常见词就匹配
+        unknown_weight = math.log(1 + len(self.title_ids))
+        query_weight = sum(self.weights.get(token, unknown_weight) for token in tokens)
+        best_entry, best_score = None, 0.0
+        for entry, weight in shared.items():
+            # 续作编号或年份不同的不是同一个游戏
+            if self.numbers[entry] != disc_numbers:
+                continue
+            score = 2 * weight / (query_weight + self.entry_weights[entry])
+            if self.normalized[entry].startswith(normalized + ' ') and self.main_titles[entry] != normalized:
+                score *= EXTRA_TOKENS_PENALTY
+            if score > best_score:
+                best_entry, best_score = entry, score
+
+        # 按词匹配的分数不如去掉副标题后的精确匹配时，采用后者
+        if prefix_id is not None and best_score < PREFIX_CONFIDENCE:
+            return prefix_id, PREFIX_CONFIDENCE, 'prefix'
+        if best_entry is None:
+            return None, 0.0, 'none'
+        return self.title_ids[best_entry], best_score, 'token'
+
+def match_redump_titles(db_file='xbox_games.db', min_confidence=DEFAULT_MIN_CONFIDENCE):
+    """在单个事务中重建RedumpTitleMatches表，返回 {匹配方式: 光盘数}"""
+    conn = sqlite3.connect(db_file)
+    try:
+        cursor = conn.cursor()
+        tables = {row[0] for row in cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        if 'RedumpDiscs' not in tables:
+            raise ValueError("数据库中没有RedumpDiscs表，请先运行 import_redump_dat.py")
+        if 'ContentItems' not in tables:
+            raise ValueError("数据库中没有ContentItems表，请先运行 import_xbox_data.py")
+
+        with span('build_token_index'):
+            index = CatalogTokenIndex(cursor.execute('SELECT TitleId, Title FROM ContentItems ORDER BY Id'))
+        names = [row[0] for row in cursor.execute('SELECT DISTINCT GameName FROM RedumpDiscs ORDER BY GameName')]
+
+        summary = {'exact': 0, 'prefix': 0, 'token': 0, 'none': 0}
+        rows = []
+        with span('match'):
+            for name in names:
+                title_id, confidence, method = index.match(name)
+                if confidence < min_confidence:
+                    title_id, method = None, 'none'
+                summary[method] += 1
+                rows.append((name, title_id, round(confidence, 4), method))
+        count('records_processed', len(rows))
+
+        with conn:
+            create_match_table(cursor)
+            cursor.execute('DELETE FROM RedumpTitleMatches')
+            cursor.executemany(
+                'INSERT INTO RedumpTitleMatches (GameName, TitleId, Confidence, Method) VALUES (?, ?, ?, ?)', rows)
+        count('rows_inserted', len(rows))
+    finally:
+        conn.close()
+
+    matched = len(rows) - summary['none']
+    print(f"光盘名称: {len(rows)} 个, 匹配 {matched} 个（精确 {summary['exact']}, "
+          f"去掉副标题 {summary['prefix']}, 按词匹配 {summary['token']}），未匹配 {summary['none']} 个")
+    return summary
+
+def show_unmatched(db_file, limit):
+    """显示置信度最高的未匹配光盘名称，便于调整阈值或补充目录"""
+    conn = sqlite3.connect(db_file)
+    try:
+        rows = conn.execute('''
+            SELECT GameName, Confidence FROM RedumpTitleMatches
+            WHERE TitleId IS NULL ORDER BY Confidence DESC, GameName LIMIT ?
+        ''', (limit,)).fetchall()
+    finally:
+        conn.close()
+    for name, confidence in rows:
+        print(f"  {confidence:.2f}  {name}")
+
+def main():
+    parser = argparse.ArgumentParser(description='把Redump光盘名称匹配到游戏目录的TitleId')
+    parser.add_argument('--db', default='xbox_games.db', help='包含RedumpDiscs和ContentItems表的数据库')
+    parser.add_argument('--min-confidence', type=float, default=DEFAULT_MIN_CONFIDENCE,
+                        help=f'接受匹配的最低置信度(默认 {DEFAULT_MIN_CONFIDENCE})')
+    parser.add_argument('--show-unmatched', type=int, default=0, metavar='N',
+                        help='显示N个未匹配的光盘名称')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    start_profiling(args, 'match_redump_titles')
+
+    try:
+        match_redump_titles(args.db, args.min_confidence)
+    except ValueError as e:
+        print(f"错误: {e}")
+        return
+
+    if args.show_unmatched:
+        print("\n未匹配的光盘名称（按最高候选置信度排序）:")
+        show_unmatched(args.db, args.show_unmatched)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Xbox游戏数据处理流水线
+把 合并(merge) / 导入数据库(import) / 生成Lua(lua) / 统计(stats) / 导入datfile(datfile) /
+光盘名称匹配(match)
+描述为声明了输入和输出的阶段图：某阶段读取或写入另一个先声明阶段的输出时依赖它，
+互不依赖的阶段在进程池中并行执行，完整重建的耗时取决于关键路径而不是各阶段耗时之和。
+各阶段沿用构建清单，输入未变化时自动跳过。全程无交互。
+
+用法:
+    python run_pipeline.py [--stages merge import match lua stats datfile] [--force] [--workers N]
+                           [--lua-mode or|set|range] [--datfile datfile.zip] [--dry-run]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+import traceback
+from collections import namedtuple
+
+from instrumentation import add_profile_arguments, span, start_profiling
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 流水线使用的文件（相对 --root）
+PATHS = {
+    'games': 'xbox360_games.json',
+    'translations': 'xbox_translations.json',
+    'xbox360': 'xbox360.txt',
+    'xboxlive': 'xbox360live.txt',
+    'merged': 'xbox360_games_updated.json',
+    'db': 'xbox_games.db',
+    'lua': 'lua',
+    'genres': 'genres.txt',
+    'report': 'catalog_report.json',
+    'manifest': 'build_manifest.json',
+}
+
+# inputs/outputs 为 PATHS 中的键（datfile 路径运行时确定）
+Stage = namedtuple('Stage', ('name', 'inputs', 'outputs', 'run'))
+
+def run_merge(paths, options):
+    from build_manifest import BuildManifest
+    from update_xbox_games import update_xbox_games_with_chinese_titles
+
+    update_xbox_games_with_chinese_titles(paths['games'], paths['translations'],
+                                          (paths['xbox360'], paths['xboxlive']), paths['merged'],
+                                          manifest=BuildManifest(paths['manifest']), force=options['force'])
+
+def run_datfile(paths, options):
+    from build_manifest import BuildManifest
+    from import_redump_dat import import_redump_datfile
+
+    if not paths['datfile']:
+        print("找不到Redump datfile，跳过")
+        return
+    import_redump_datfile(paths['datfile'], paths['db'],
+                          manifest=BuildManifest(paths['manifest']), force=options['force'])
+
+def run_import(paths, options):
+    from build_manifest import BuildManifest
+    from import_xbox_data import import_xbox_games_to_db
+
+    import_xbox_games_to_db(paths['merged'], paths['db'],
+                            manifest=BuildManifest(paths['manifest']), force=options['force'])
+
+def run_match(paths, options):
+    from import_redump_dat import redump_table_exists
+    from match_redump_titles import match_redump_titles
+
+    if not redump_table_exists(paths['db']):
+        print("数据库中没有Redump光盘记录，跳过")
+        return
+    match_redump_titles(paths['db'])
+
+def run_lua(paths, options):
+    from build_manifest import BuildManifest
+    from generate_lua_filters import Xbox360LuaGenerator
+
+    xboxlive_file = paths['xboxlive'] if os.path.exists(paths['xboxlive']) else None
+    generator = Xbox360LuaGenerator(mode=options['lua_mode'])
+    generator.extract_categories_to_genres(paths['xbox360'], xboxlive_file, paths['genres'])
+    generator.generate_all_lua_files(paths['xbox360'], xboxlive_file, paths['translations'], paths['lua'],
+                                     manifest=BuildManifest(paths['manifest']), force=options['force'])
+
+def run_stats(paths, options):
+    import sqlite3
+
+    from analyze_xbox_data import load_report, refresh_catalog_stats, stats_available
+
+    conn = sqlite3.connect(paths['db'])
+    try:
+        if options['force'] or not stats_available(conn):
+            with conn:
+                refresh_catalog_stats(conn)
+        report = load_report(conn)
+    finally:
+        conn.close()
+
+    tmp_path = paths['report'] + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, paths['report'])
+    print(f"统计报告: {report['total_games']} 个游戏, 中文覆盖率 {report['chinese_coverage']:.2f}% -> {paths['report']}")
+
+# 按声明顺序排列；写同一输出的阶段按此顺序串行
+STAGES = (
+    Stage('merge', ('games', 'translations', 'xbox360', 'xboxlive'), ('merged',), run_merge),
+    Stage('datfile', ('datfile',), ('db',), run_datfile),
+    Stage('import', ('merged',), ('db',), run_import),
+    Stage('match', ('db',), ('db',), run_match),
+    Stage('lua', ('xbox360', 'xboxlive', 'translations'), ('lua', 'genres'), run_lua),
+    Stage('stats', ('db',), ('report',), run_stats),
+)
+STAGE_NAMES = tuple(stage.name for stage in STAGES)
+
+def build_graph(stages):
+    """根据输入/输出推导依赖：返回 {阶段名: 依赖的阶段名集合}
+
+    后声明的阶段读取先声明阶段的输出、写入其输出或覆盖其输入时，依赖先声明的阶段。
+    """
+    graph = {}
+    for index, stage in enumerate(stages):
+        deps = set()
+        for earlier in stages[:index]:
+            if (set(earlier.outputs) & set(stage.inputs)
+                    or set(earlier.outputs) & set(stage.outputs)
+                    or set(earlier.inputs) & set(stage.outputs)):
+                deps.add(earlier.name)
+        graph[stage.name] = deps
+    return graph
+
+def stage_levels(graph):
+    """按依赖深度分组，同一组内的阶段可以并行"""
+    levels = []
+    done = set()
+    while len(done) < len(graph):
+        level = [name for name, deps in graph.items() if name not in done and deps <= done]
+        levels.append(level)
+        done.update(level)
+    return levels
+
+def execute_stage(name, paths, options):
+    """在工作进程中运行一个阶段，捕获其输出；返回 (阶段名, 输出文本, 耗时, 错误信息)"""
+    stage = next(stage for stage in STAGES if stage.name == name)
+    buffer = io.StringIO()
+    error = None
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(buffer):
+        try:
+            stage.run(paths, options)
+        except Exception:
+            error = traceback.format_exc()
+    return name, buffer.getvalue(), time.perf_counter() - start, error
+
+def run_pipeline(selected, paths, options, workers=None):
+    """按依赖图并行运行选中的阶段，返回 {阶段名: (状态, 耗时)}
+
+    未选中的阶段视为已完成；某阶段失败时跳过所有依赖它的阶段。
+    """
+    stages = [stage for stage in STAGES if stage.name in selected]
+    graph = build_graph(stages)
+    results = {}
+    running = {}
+    origin = time.perf_counter()
+
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+    # 同时就绪的阶段很少，默认每个阶段一个进程，关键路径不受CPU核心数限制
+    with ProcessPoolExecutor(max_workers=workers or len(stages)) as executor:
+        while len(results) < len(stages):
+            for stage in stages:
+                if stage.name in results or stage.name in running.values():
+                    continue
+                deps = graph[stage.name]
+                if any(results.get(dep, ('',))[0] in ('failed', 'skipped') for dep in deps):
+                    results[stage.name] = ('skipped', 0.0)
+                    print(f"[{time.perf_counter() - origin:7.2f}s] 跳过 {stage.name}: 依赖的阶段失败")
+                elif all(dep in results for dep in deps):
+                    print(f"[{time.perf_counter() - origin:7.2f}s] 开始 {stage.name}")
+                    running[executor.submit(execute_stage, stage.name, paths, options)] = stage.name
+
+            if not running:
+                continue
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                running.pop(future)
+                name, output, elapsed, error = future.result()
+                status = 'failed' if error else 'ok'
+                results[name] = (status, elapsed)
+                print(f"[{time.perf_counter() - origin:7.2f}s] 完成 {name} ({elapsed:.2f}s{', 失败' if error else ''})")
+                for line in output.rstrip().splitlines():
+                    print(f"    {line}")
+                if error:
+                    print(error.rstrip())
+
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='按依赖关系并行运行Xbox游戏数据处理流水线')
+    parser.add_argument('--stages', nargs='+', choices=STAGE_NAMES, default=STAGE_NAMES,
+                        help='要运行的阶段（默认全部；未选中的阶段视为已完成）')
+    parser.add_argument('--root', default=ROOT_DIR, help='数据文件所在目录')
+    parser.add_argument('--force', action='store_true', help='忽略构建清单，强制重建所有阶段')
+    parser.add_argument('--workers', type=int, help='并行进程数（默认每个阶段一个进程）')
+    parser.add_argument('--lua-mode', choices=('or', 'set', 'range'), default='or', help='Lua输出模式')
+    parser.add_argument('--datfile', help='Redump datfile(.dat/.zip)，默认在 --root 中查找')
+    parser.add_argument('--dry-run', action='store_true', help='只显示阶段依赖和执行顺序')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    start_profiling(args, 'run_pipeline')
+
+    from import_redump_dat import find_default_datfile
+
+    paths = {key: os.path.join(args.root, name) for key, name in PATHS.items()}
+    paths['datfile'] = os.path.abspath(args.datfile) if args.datfile else find_default_datfile(args.root)
+    options = {'force': args.force, 'lua_mode': args.lua_mode}
+
+    selected = [name for name in STAGE_NAMES if name in args.stages]
+    graph = build_graph([stage for stage in STAGES if stage.name in selected])
+    print("阶段依赖:")
+    for name in selected:
+        print(f"  {name}: {', '.join(sorted(graph[name])) or '-'}")
+    print("执行顺序: " + " -> ".join('[' + ', '.join(level) + ']' for level in stage_levels(graph)))
+    if args.dry_run:
+        return
+
+    start = time.perf_counter()
+    with span('pipeline'):
+        results = run_pipeline(selected, paths, options, args.workers)
+    wall = time.perf_counter() - start
+
+    print("=" * 60)
+    for name in selected:
+        status, elapsed = results[name]
+        print(f"{name:>8}: {status:<8} {elapsed:7.2f}s")
+    total = sum(elapsed for _, elapsed in results.values())
+    print(f"总耗时 {wall:.2f}s（各阶段合计 {total:.2f}s）")
+
+    if any(status != 'ok' for status, _ in results.values()):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
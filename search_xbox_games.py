@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Xbox游戏全文搜索
+在 xbox_games.db 中为 ContentItems 的 Title/Title_cn/Developer/Category 建立 FTS5 外部内容索引，
+使用 trigram 分词器，中英文都能按子串检索；由触发器在 import_xbox_data.py upsert 时自动同步。
+trigram索引只能匹配不少于3个字符的词，因此另建一个短词索引 ContentSearchShort，
+保存同样四列中每个词的单字和相邻两字（如 光环 -> 光 环 光环），
+一两个字符的词（两字中文、输入提示的前缀）在这个索引中查找。搜索结果都按 bm25 排序。
+
+短词索引的内容由Python函数 search_grams() 生成，触发器也调用它，因此写入 ContentItems 的连接
+需要先调用 ensure_search_index() 注册该函数（import_xbox_data.py、catalog_delta.py 都是这样做的）。
+
+用法:
+    python search_xbox_games.py search 光环 [--limit 20] [--db xbox_games.db]
+    python search_xbox_games.py rebuild
+"""
+
+import argparse
+import os
+import re
+import sqlite3
+import sys
+import time
+
+from instrumentation import add_profile_arguments, span, start_profiling
+
+SEARCH_TABLE = 'ContentSearch'
+SEARCH_COLUMNS = ('Title', 'Title_cn', 'Developer', 'Category')
+# bm25 列权重，顺序与 SEARCH_COLUMNS 一致
+SEARCH_WEIGHTS = (10.0, 10.0, 2.0, 1.0)
+
+# trigram分词器至少需要3个字符才能使用索引，更短的词查短词索引
+TRIGRAM_MIN_LENGTH = 3
+
+SHORT_SEARCH_TABLE = 'ContentSearchShort'
+GRAMS_FUNCTION = 'search_grams'
+# 短词索引中的“词”：连续的字母、数字或汉字
+WORD_PATTERN = re.compile(r'[^\W_]+')
+
+def search_grams(text):
+    """文本中每个词的单字和相邻两字，以空格分隔（短词索引的内容）"""
+    if not text:
+        return ''
+    grams = []
+    for word in WORD_PATTERN.findall(str(text).casefold()):
+        grams.extend(word)
+        grams.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return ' '.join(grams)
+
+def register_search_functions(conn):
+    """注册短词索引触发器用到的SQL函数"""
+    conn.create_function(GRAMS_FUNCTION, 1, search_grams, deterministic=True)
+
+def trigram_supported():
+    """trigram分词器需要SQLite 3.34+"""
+    return sqlite3.sqlite_version_info >= (3, 34, 0)
+
+def table_exists(cursor, name):
+    return cursor.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (name,)).fetchone() is not None
+
+def ensure_search_index(cursor):
+    """创建FTS5搜索表、短词索引和同步触发器；新建的表从ContentItems重建索引，返回是否有表是新建的"""
+    register_search_functions(cursor.connection)
+    exists = table_exists(cursor, SEARCH_TABLE)
+    columns = ', '.join(SEARCH_COLUMNS)
+    new_values = ', '.join(f'new.{column}' for column in SEARCH_COLUMNS)
+    old_values = ', '.join(f'old.{column}' for column in SEARCH_COLUMNS)
+
+    if not exists:
+        tokenizer = 'trigram' if trigram_supported() else 'unicode61'
+        cursor.execute(f'''
+            CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5(
+                {columns}, content='ContentItems', content_rowid='Id', tokenize='{tokenizer}'
+            )
+        ''')
+
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS ContentItems_search_insert AFTER INSERT ON ContentItems BEGIN
+            INSERT INTO {SEARCH_TABLE} (rowid, {columns}) VALUES (new.Id, {new_values});
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS ContentItems_search_delete AFTER DELETE ON ContentItems BEGIN
+            INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}, rowid, {columns}) VALUES ('delete', old.Id, {old_values});
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS ContentItems_search_update AFTER UPDATE OF {columns} ON ContentItems BEGIN
+            INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}, rowid, {columns}) VALUES ('delete', old.Id, {old_values});
+            INSERT INTO {SEARCH_TABLE} (rowid, {columns}) VALUES (new.Id, {new_values});
+        END
+    ''')
+
+    if not exists:
+        cursor.execute(f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('rebuild')")
+    short_created = ensure_short_search_index(cursor)
+    return not exists or short_created
+
+def ensure_short_search_index(cursor):
+    """创建短词索引（无内容FTS5表，只保存单字和两字）和同步触发器；新建时写入全部记录，返回是否新建"""
+    exists = table_exists(cursor, SHORT_SEARCH_TABLE)
+    columns = ', '.join(SEARCH_COLUMNS)
+    new_values = ', '.join(f'{GRAMS_FUNCTION}(new.{column})' for column in SEARCH_COLUMNS)
+    old_values = ', '.join(f'{GRAMS_FUNCTION}(old.{column})' for column in SEARCH_COLUMNS)
+
+    if not exists:
+        cursor.execute(f'''
+            CREATE VIRTUAL TABLE {SHORT_SEARCH_TABLE} USING fts5(
+                {columns}, content='', tokenize='unicode61'
+            )
+        ''')
+
+    # 无内容表删除记录时需要提供与写入时相同的值，由同一个函数从旧值重新生成
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS ContentItems_short_search_insert AFTER INSERT ON ContentItems BEGIN
+            INSERT INTO {SHORT_SEARCH_TABLE} (rowid, {columns}) VALUES (new.Id, {new_values});
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS ContentItems_short_search_delete AFTER DELETE ON ContentItems BEGIN
+            INSERT INTO {SHORT_SEARCH_TABLE} ({SHORT_SEARCH_TABLE}, rowid, {columns}) VALUES ('delete', old.Id, {old_values});
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS ContentItems_short_search_update AFTER UPDATE OF {columns} ON ContentItems BEGIN
+            INSERT INTO {SHORT_SEARCH_TABLE} ({SHORT_SEARCH_TABLE}, rowid, {columns}) VALUES ('delete', old.Id, {old_values});
+            INSERT INTO {SHORT_SEARCH_TABLE} (rowid, {columns}) VALUES (new.Id, {new_values});
+        END
+    ''')
+
+    if not exists:
+        rebuild_short_search_index(cursor)
+    return not exists
+
+def rebuild_short_search_index(cursor):
+    """无内容表不支持 'rebuild'，清空后重新写入每条记录的单字和两字"""
+    columns = ', '.join(SEARCH_COLUMNS)
+    grams = ', '.join(f'{GRAMS_FUNCTION}({column})' for column in SEARCH_COLUMNS)
+    cursor.execute(f"INSERT INTO {SHORT_SEARCH_TABLE} ({SHORT_SEARCH_TABLE}) VALUES ('delete-all')")
+    cursor.execute(f'INSERT INTO {SHORT_SEARCH_TABLE} (rowid, {columns}) SELECT Id, {grams} FROM ContentItems')
+
+def rebuild_search_index(cursor):
+    """从ContentItems完整重建搜索索引和短词索引"""
+    cursor.execute(f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('rebuild')")
+    rebuild_short_search_index(cursor)
+
+def fts_phrase(term):
+    return '"' + term.replace('"', '""') + '"'
+
+def short_term_query(term):
+    """短词在短词索引中的查询（按与 search_grams 相同的规则拆词）；不含字母、数字或汉字时返回None"""
+    words = WORD_PATTERN.findall(term.casefold())
+    if not words:
+        return None
+    return ' '.join(fts_phrase(word) for word in words)
+
+def search(conn, query, limit=20):
+    """搜索游戏，返回 [(TitleId, Title, Title_cn, Developer, Category, Year, 得分), ...]
+
+    每个空格分隔的词都必须匹配；不少于3个字符的词走trigram索引，更短的词（如两个汉字）走短词索引，
+    结果按bm25排序（有长词时按trigram索引的得分，短词只作过滤）。
+    只由标点组成的短词没有可索引的字符，作为子串条件过滤。
+    """
+    terms = [term for term in query.split() if term]
+    if not terms:
+        return []
+
+    long_terms = [term for term in terms if len(term) >= TRIGRAM_MIN_LENGTH]
+    short_queries = []
+    like_terms = []
+    for term in terms:
+        if len(term) < TRIGRAM_MIN_LENGTH:
+            short_query = short_term_query(term)
+            if short_query is None:
+                like_terms.append(term)
+            else:
+                short_queries.append(short_query)
+
+    columns = ', '.join(f'c.{column}' for column in ('TitleId', 'Title', 'Title_cn', 'Developer', 'Category', 'Year'))
+    weights = ', '.join(str(weight) for weight in SEARCH_WEIGHTS)
+    conditions = []
+    params = []
+    for term in like_terms:
+        pattern = '%' + term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        conditions.append('(' + ' OR '.join(f"c.{column} LIKE ? ESCAPE '\\'" for column in SEARCH_COLUMNS) + ')')
+        params.extend([pattern] * len(SEARCH_COLUMNS))
+
+    if long_terms:
+        if short_queries:
+            conditions.append(f'c.Id IN (SELECT rowid FROM {SHORT_SEARCH_TABLE} WHERE {SHORT_SEARCH_TABLE} MATCH ?)')
+            params.append(' '.join(short_queries))
+        table, match = SEARCH_TABLE, ' '.join(fts_phrase(term) for term in long_terms)
+    elif short_queries:
+        table, match = SHORT_SEARCH_TABLE, ' '.join(short_queries)
+    else:
+        # 只有标点组成的短词，无法使用索引，按标题长度排序（越短越接近完全匹配）
+        sql = f'''
+            SELECT {columns}, 0.0 AS score
+            FROM ContentItems AS c
+            WHERE {' AND '.join(conditions)}
+            ORDER BY length(c.Title_cn), length(c.Title)
+            LIMIT ?
+        '''
+        return conn.execute(sql, params + [limit]).fetchall()
+
+    sql = f'''
+        SELECT {columns}, bm25({table}, {weights}) AS score
+        FROM {table} JOIN ContentItems AS c ON c.Id = {table}.rowid
+        WHERE {table} MATCH ? {''.join(' AND ' + condition for condition in conditions)}
+        ORDER BY score
+        LIMIT ?
+    '''
+    return conn.execute(sql, [match] + params + [limit]).fetchall()
+
+def main():
+    parser = argparse.ArgumentParser(description='Xbox游戏全文搜索')
+    parser.add_argument('--db', default='xbox_games.db', help='游戏数据库')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    search_parser = subparsers.add_parser('search', help='搜索标题/中文标题/开发商/分类')
+    search_parser.add_argument('query', nargs='+',
+                               help='搜索词，每个词都必须匹配；少于3个字符的词（如两字中文）查短词索引')
+    search_parser.add_argument('--limit', type=int, default=20, help='最多返回的结果数')
+    add_profile_arguments(search_parser)
+
+    rebuild_parser = subparsers.add_parser('rebuild', help='重建搜索索引和短词索引')
+    add_profile_arguments(rebuild_parser)
+    args = parser.parse_args()
+    start_profiling(args, 'search_xbox_games')
+
+    if not os.path.exists(args.db):
+        print(f"错误: 找不到数据库 {args.db}，请先运行 import_xbox_data.py")
+        sys.exit(1)
+
+    conn = sqlite3.connect(args.db)
+    try:
+        with span('ensure_index'), conn:
+            created = ensure_search_index(conn.cursor())
+            if args.command == 'rebuild' and not created:
+                rebuild_search_index(conn.cursor())
+        if args.command == 'rebuild':
+            print(f"搜索索引已重建: {args.db}")
+            return
+
+        start = time.perf_counter()
+        with span('search'):
+            results = search(conn, ' '.join(args.query), args.limit)
+        elapsed = (time.perf_counter() - start) * 1000
+    finally:
+        conn.close()
+
+    for title_id, title, title_cn, developer, category, year, score in results:
+        print(f"{title_id} | {title} | {title_cn} | {developer} | {category} | {year} | {score:.2f}")
+    print(f"\n共 {len(results)} 个结果 ({elapsed:.2f} ms)")
+
+if __name__ == "__main__":
+    main()
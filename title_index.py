@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TitleId→游戏信息 二进制索引
+把合并后的游戏数据导出为按TitleId排序的定长记录 + 去重字符串表，
+读取端用mmap打开并二分查找，启动和查询都不需要解析JSON。
+
+文件格式（小端）:
+    头部      magic "XTIX", 版本(u16), 字段数(u16), 记录数(u32), 字符串表偏移(u32)
+    字段名    字段数 × u32   字符串表中的偏移
+    记录      记录数 × (u32 TitleId + 字段数 × u32 字符串偏移)，按TitleId升序
+    字符串表  每个字符串为 u16 长度 + UTF-8 字节，相同字符串只存一份
+
+用法:
+    python title_index.py export [--input xbox360_games_updated.json] [--output xbox360_titles.idx]
+    python title_index.py lookup 415608d8 584109b7 ...
+"""
+
+import argparse
+import mmap
+import os
+import struct
+
+from import_xbox_data import normalize_title_id, title_id_to_int
+from instrumentation import add_profile_arguments, span, start_profiling
+from update_xbox_games import iter_games
+
+INDEX_FILE = 'xbox360_titles.idx'
+INDEX_MAGIC = b'XTIX'
+INDEX_VERSION = 1
+
+# 导出的字段（JSON中的字段名）
+INDEX_FIELDS = ('Title', 'Title_cn', 'Developer', 'Publisher', 'Platform', 'Category', 'Year')
+
+HEADER = struct.Struct('<4sHHII')
+U32 = struct.Struct('<I')
+STRING_LENGTH = struct.Struct('<H')
+# 单个字符串最多保存的UTF-8字节数（长度字段为u16）
+MAX_STRING_BYTES = 0xFFFF
+
+def encode_string(value, limit=MAX_STRING_BYTES):
+    """UTF-8编码，超过limit字节时在字符边界处截断（不会截断多字节字符）"""
+    encoded = value.encode('utf-8')
+    if len(encoded) <= limit:
+        return encoded
+    # 截断处不完整的多字节字符在解码时被丢弃
+    return encoded[:limit].decode('utf-8', 'ignore').encode('utf-8')
+
+def export_title_index(games, index_path=INDEX_FILE, fields=INDEX_FIELDS):
+    """把游戏数据导出为二进制索引文件，返回导出的记录数（相同TitleId后出现的覆盖先出现的）"""
+    string_table = bytearray()
+    string_offsets = {}
+
+    def intern(value):
+        value = value or ''
+        offset = string_offsets.get(value)
+        if offset is None:
+            encoded = encode_string(value)
+            offset = len(string_table)
+            string_table.extend(STRING_LENGTH.pack(len(encoded)))
+            string_table.extend(encoded)
+            string_offsets[value] = offset
+        return offset
+
+    field_offsets = [intern(field) for field in fields]
+
+    records = {}
+    for game in games:
+        title_id = normalize_title_id(game.get('Title ID'))
+        if title_id is None:
+            continue
+        records[title_id_to_int(title_id)] = [intern(str(game.get(field, '') or '')) for field in fields]
+
+    record_struct = struct.Struct('<I' + 'I' * len(fields))
+    string_table_offset = HEADER.size + U32.size * len(fields) + record_struct.size * len(records)
+
+    tmp_path = index_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(INDEX_MAGIC, INDEX_VERSION, len(fields), len(records), string_table_offset))
+        f.write(struct.pack(f'<{len(fields)}I', *field_offsets))
+        for title_id_num in sorted(records):
+            f.write(record_struct.pack(title_id_num, *records[title_id_num]))
+        f.write(string_table)
+    os.replace(tmp_path, index_path)
+    return len(records)
+
+class TitleIndex:
+    """用mmap打开的只读TitleId索引，按TitleId二分查找"""
+
+    def __init__(self, index_path=INDEX_FILE):
+        self.index_path = index_path
+        self._file = open(index_path, 'rb')
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"索引文件为空: {index_path}")
+
+        magic, version, field_count, self._count, self._strings = HEADER.unpack_from(self._mm, 0)
+        if magic != INDEX_MAGIC or version != INDEX_VERSION:
+            self.close()
+            raise ValueError(f"不是有效的TitleId索引文件: {index_path}")
+
+        self._record = struct.Struct('<I' + 'I' * field_count)
+        self._records_start = HEADER.size + U32.size * field_count
+        self.fields = tuple(self._string(offset) for offset in
+                            struct.unpack_from(f'<{field_count}I', self._mm, HEADER.size))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def close(self):
+        if getattr(self, '_mm', None) is not None:
+            self._mm.close()
+            self._mm = None
+        self._file.close()
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, title_id):
+        return self._find(title_id) is not None
+
+    def _string(self, offset):
+        position = self._strings + offset
+        (length,) = STRING_LENGTH.unpack_from(self._mm, position)
+        start = position + STRING_LENGTH.size
+        return self._mm[start:start + length].decode('utf-8')
+
+    def _title_id_at(self, index):
+        return U32.unpack_from(self._mm, self._records_start + index * self._record.size)[0]
+
+    def _find(self, title_id):
+        if isinstance(title_id, str):
+            title_id = normalize_title_id(title_id)
+            if title_id is None:
+                return None
+            title_id = title_id_to_int(title_id)
+
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self._title_id_at(middle) < title_id:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self._count and self._title_id_at(low) == title_id:
+            return low
+        return None
+
+    def _record_at(self, index):
+        values = self._record.unpack_from(self._mm, self._records_start + index * self._record.size)
+        game = {'Title ID': f'{values[0]:08x}'}
+        for field, offset in zip(self.fields, values[1:]):
+            game[field] = self._string(offset)
+        return game
+
+    def get(self, title_id, default=None):
+        """按TitleId（十六进制字符串或整数）查找游戏信息"""
+        index = self._find(title_id)
+        return default if index is None else self._record_at(index)
+
+    def __iter__(self):
+        """按TitleId升序遍历全部游戏"""
+        for index in range(self._count):
+            yield self._record_at(index)
+
+def main():
+    parser = argparse.ArgumentParser(description='TitleId二进制索引导出与查询')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    export_parser = subparsers.add_parser('export', help='从合并后的游戏数据导出索引')
+    export_parser.add_argument('--input', default='xbox360_games_updated.json', help='合并后的游戏数据(JSON/NDJSON)')
+    export_parser.add_argument('--output', default=INDEX_FILE, help='索引文件')
+    add_profile_arguments(export_parser)
+
+    lookup_parser = subparsers.add_parser('lookup', help='按TitleId查询')
+    lookup_parser.add_argument('title_ids', nargs='+', help='十六进制TitleId')
+    lookup_parser.add_argument('--index', default=INDEX_FILE, help='索引文件')
+    add_profile_arguments(lookup_parser)
+
+    args = parser.parse_args()
+    start_profiling(args, 'title_index')
+
+    if args.command == 'export':
+        if not os.path.exists(args.input):
+            print(f"错误: 找不到 {args.input} 文件")
+            return
+        with span('export'):
+            exported = export_title_index(iter_games(args.input), args.output)
+        print(f"已导出 {exported} 个游戏到索引: {args.output} ({os.path.getsize(args.output) / 1024:.1f} KB)")
+    else:
+        with span('lookup'), TitleIndex(args.index) as index:
+            for title_id in args.title_ids:
+                game = index.get(title_id)
+                if game is None:
+                    print(f"{title_id}: 未找到")
+                else:
+                    print(f"{game['Title ID']}: {game['Title']} | {game['Title_cn']} | "
+                          f"{game['Developer']} | {game['Category']} | {game['Year']}")
+
+if __name__ == "__main__":
+    main()
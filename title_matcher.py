@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+游戏标题模糊匹配
+对翻译表的英文标题建立 规范化标题→原始键 映射和三元组(trigram)倒排索引，
+未能精确匹配的标题只与共享三元组最多的少量候选比较，并给出匹配置信度。
+
+用法:
+    python title_matcher.py "Operation Darkness(NA)" "Tom Clancy's EndWar" ...
+"""
+
+import json
+import re
+import sys
+import unicodedata
+from difflib import SequenceMatcher
+
+from instrumentation import count
+
+# 比较前去掉的品牌前缀
+TITLE_PREFIXES = ("tom clancy's ", "sid meier's ", "disney's ", "marvel's ", "disney pixar ", "disney/pixar ")
+
+# 去掉的版本/地区后缀，如 (NA)、[JP]、/EU、- Game of the Year Edition
+TAG_PATTERN = re.compile(r'\s*[\(\[][^\)\]]*[\)\]]')
+REGION_SUFFIX_PATTERN = re.compile(r'\s*/\s*(?:jp|jpn|eu|na|us|usa|pal|ntsc|asia)$')
+TRADEMARK_PATTERN = re.compile('[\u2122\u00ae\u00a9]')
+EDITION_PATTERN = re.compile(r"\s+(?:-\s+)?(?:game of the year|goty|collector's|limited|platinum hits|classics)\b.*$")
+NON_WORD_PATTERN = re.compile(r'[^\w]+')
+
+ROMAN_NUMERALS = {'ii': '2', 'iii': '3', 'iv': '4', 'v': '5', 'vi': '6', 'vii': '7', 'viii': '8', 'ix': '9'}
+
+# 默认接受模糊匹配的最低置信度
+DEFAULT_MIN_SCORE = 0.95
+
+# 每个标题最多细比较的候选数
+MAX_CANDIDATES = 8
+# 出现在超过该比例键中的三元组不参与候选召回（几乎没有区分度）
+COMMON_TRIGRAM_RATIO = 0.05
+# 参与召回的三元组最多出现在多少个键中（绝对上限，翻译表很大时按比例计算的阈值也不超过它）
+MAX_TRIGRAM_POSTINGS = 200
+# 每个标题只用出现次数最少的若干个三元组召回候选，单次查询的开销与翻译表大小无关
+RAREST_TRIGRAMS = 12
+
+def normalize_title(title):
+    """规范化标题：全角转半角、小写、去掉地区标记/品牌前缀/标点、罗马数字转阿拉伯数字"""
+    if not title:
+        return ''
+    title = TRADEMARK_PATTERN.sub('', title)
+    title = unicodedata.normalize('NFKC', title).lower().replace('&', ' and ')
+    title = TAG_PATTERN.sub('', title)
+    title = REGION_SUFFIX_PATTERN.sub('', title)
+    title = EDITION_PATTERN.sub('', title)
+    for prefix in TITLE_PREFIXES:
+        if title.startswith(prefix):
+            title = title[len(prefix):]
+            break
+    words = [ROMAN_NUMERALS.get(word, word) for word in NON_WORD_PATTERN.split(title) if word]
+    if words and words[0] == 'the':
+        words = words[1:]
+    return ' '.join(words)
+
+def numbers(normalized):
+    """标题中含数字的词（续作编号、年份，如 2、2k11），模糊匹配时必须一致"""
+    return {word for word in normalized.split() if any(c.isdigit() for c in word)}
+
+def trigrams(text):
+    padded = f'  {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class TitleMatcher:
+    """基于规范化键和三元组倒排索引的标题匹配器"""
+
+    def __init__(self, keys):
+        self.keys = []
+        self.normalized = []
+        self.exact = {}
+        self.index = {}
+
+        for key in keys:
+            normalized = normalize_title(key)
+            if not normalized:
+                continue
+            key_id = len(self.keys)
+            self.keys.append(key)
+            self.normalized.append(normalized)
+            self.exact.setdefault(normalized, key)
+            for gram in trigrams(normalized):
+                self.index.setdefault(gram, []).append(key_id)
+
+        # 过于常见的三元组不用于召回候选
+        limit = max(MAX_CANDIDATES, min(int(len(self.keys) * COMMON_TRIGRAM_RATIO), MAX_TRIGRAM_POSTINGS))
+        self.common = {gram for gram, postings in self.index.items() if len(postings) > limit}
+
+    def candidates(self, normalized):
+        """按共享三元组数量返回最可能的候选键编号"""
+        counts = {}
+        grams = [gram for gram in trigrams(normalized) if gram in self.index and gram not in self.common]
+        # 只累加最稀有的三元组的倒排列表（每个列表不超过MAX_TRIGRAM_POSTINGS）
+        grams.sort(key=lambda gram: (len(self.index[gram]), gram))
+        for gram in grams[:RAREST_TRIGRAMS]:
+            for key_id in self.index[gram]:
+                counts[key_id] = counts.get(key_id, 0) + 1
+        return sorted(counts, key=counts.get, reverse=True)[:MAX_CANDIDATES]
+
+    def match(self, title, min_score=0.0):
+        """返回 (翻译表中的原始键, 置信度0~1)，没有达到min_score的候选时返回 (None, 最高分)"""
+        normalized = normalize_title(title)
+        if not normalized:
+            return None, 0.0
+
+        key = self.exact.get(normalized)
+        if key is not None:
+            return key, 1.0
+
+        title_numbers = numbers(normalized)
+        best_key, best_score = None, 0.0
+        for key_id in self.candidates(normalized):
+            # 续作编号或年份不同的不是同一个游戏
+            if numbers(self.normalized[key_id]) != title_numbers:
+                continue
+            score = SequenceMatcher(None, normalized, self.normalized[key_id]).ratio()
+            if score > best_score:
+                best_key, best_score = self.keys[key_id], score
+
+        if best_score < min_score:
+            return None, best_score
+        return best_key, best_score
+
+class TitleTranslator:
+    """先精确查找翻译表，找不到时使用模糊匹配"""
+
+    def __init__(self, translations, min_score=DEFAULT_MIN_SCORE, fuzzy=True):
+        self.translations = translations
+        self.min_score = min_score
+        self.matcher = TitleMatcher(translations) if fuzzy else None
+        # 模糊匹配结果: 标题 -> (翻译表键, 置信度)
+        self.fuzzy_matches = {}
+        self._unmatched = set()
+
+    def __contains__(self, title):
+        return self.lookup(title) is not None
+
+    def lookup(self, title):
+        """返回中文标题，找不到时返回None"""
+        if title in self.translations:
+            return self.translations[title]
+        if self.matcher is None or not title:
+            return None
+        if title in self.fuzzy_matches:
+            key, _ = self.fuzzy_matches[title]
+            return self.translations[key]
+        if title in self._unmatched:
+            return None
+
+        key, score = self.matcher.match(title, self.min_score)
+        count('fuzzy_lookups')
+        if key is None:
+            self._unmatched.add(title)
+            return None
+        self.fuzzy_matches[title] = (key, score)
+        return self.translations[key]
+
+    def get(self, title, default=None):
+        translation = self.lookup(title)
+        return default if translation is None else translation
+
+def main():
+    with open('xbox_translations.json', 'r', encoding='utf-8') as f:
+        translations = json.load(f)
+
+    matcher = TitleMatcher(translations)
+    for title in sys.argv[1:]:
+        key, score = matcher.match(title)
+        if key is None:
+            print(f"{title}: 未找到候选")
+        else:
+            print(f"{title} -> {key} ({translations[key]}) 置信度 {score:.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多来源翻译库
+把多个 英文标题→中文标题 翻译文件按优先级合并：同一标题只保留优先级最高的来源的译文，
+译文不同时记录冲突；再用预先构建的字符级 str.translate 转换表一次性把全部译文转换为指定的文字变体，
+并统一全角/半角字符，结果按标题键保存为一个文件。
+标题键只统一大小写、全角/半角、引号/破折号、商标符号和空白，保留版本和副标题等词
+（Dishonored 与 Dishonored GOTY Edition 是两个条目）；去掉这些词的模糊匹配由 update_xbox_games.py 在查找时进行。
+update_xbox_games.py --translations <该文件> 直接读取转换好的译文，不必逐个标题转换或查找多个翻译文件。
+
+文字变体:
+    zh-Hans  简体中文
+    zh-Hant  繁体中文（一个简体字对应多个繁体字且无法按字判断的，如 后/後、干/乾/幹，保持不变）
+    zh       不转换简繁，只统一全角/半角
+
+用法:
+    python translation_store.py [--source xbox_translations.json ...] [--variant zh-Hans] [--output FILE]
+    python translation_store.py --convert "心靈殺手：魘長夢多" --variant zh-Hans
+"""
+
+import argparse
+import json
+import os
+import re
+import unicodedata
+from collections import namedtuple
+
+VARIANTS = ('zh-Hans', 'zh-Hant', 'zh')
+DEFAULT_VARIANT = 'zh-Hans'
+
+# 合并结果文件的格式版本
+STORE_VERSION = 1
+
+# 繁体→简体 字符对（每两个字符为一对：繁体、简体）；
+# 多个繁体字对应同一个简体字时，排在前面的用于简体→繁体转换
+CHARACTER_PAIRS = (
+    '萬万與与醜丑專专業业叢丛東东絲丝丟丢兩两嚴严喪丧個个豐丰臨临為为麗丽舉举麼么義义烏乌樂乐喬乔習习鄉乡書书買买亂乱爭争於于'
+    '虧亏雲云亞亚產产畝亩親亲褻亵億亿僅仅從从侖仑倉仓儀仪們们價价眾众優优夥伙會会傘伞偉伟傳传傷伤倫伦偽伪佇伫體体餘余傭佣僉佥'
+    '俠侠侶侣僥侥偵侦側侧僑侨儈侩儕侪儂侬俁俣儔俦儼俨倆俩儷俪儉俭債债傾倾僂偻僨偾償偿儻傥儐傧儲储儺傩兒儿兌兑兗兖黨党蘭兰關关'
+    '興兴茲兹養养獸兽內内岡冈冊册寫写軍军農农塚冢馮冯衝冲決决況况凍冻淨净涼凉減减湊凑凜凛幾几鳳凤鳧凫憑凭凱凯擊击鑿凿芻刍劃划'
+    '劉刘則则剛刚創创刪删別别剗刬剄刭劊刽劌刿劑剂剮剐劍剑剝剥劇剧勸劝辦办務务勱劢動动勵励勁劲勞劳勢势勳勋勻匀匭匦匱匮區区醫医'
+    '華华協协單单賣卖盧卢鹵卤衛卫卻却廠厂廳厅歷历曆历厲厉壓压厭厌厙厍廁厕廂厢厴厣廈厦廚厨廄厩廝厮縣县參参雙双發发變变敘叙疊叠'
+    '葉叶號号嘆叹嘰叽籲吁後后嚇吓呂吕嗎吗噸吨聽听啟启吳吴吶呐嘔呕嚦呖唄呗員员咼呙嗆呛嗚呜詠咏嚨咙嚀咛噝咝響响啞哑噠哒嘵哓嗶哔'
+    '噦哕嘩哗噲哙嚌哜噥哝喲哟嘜唛嗊唝嘮唠啢唡嗩唢喚唤嘖啧嗇啬囀啭齧啮嘽啴嘯啸噴喷嘍喽嚳喾囁嗫噯嗳噓嘘嚶嘤囑嘱嚕噜團团園园圍围'
+    '國国圖图圓圆聖圣壙圹場场壞坏塊块堅坚壇坛壢坜壩坝塢坞墳坟墜坠壟垄壚垆壘垒墾垦堊垩埡垭塏垲壎埙塒埘堝埚塹堑墮堕壯壮聲声殼壳'
+    '壺壶處处備备復复夠够頭头誇夸夾夹奪夺奩奁奐奂奮奋獎奖奧奥妝妆婦妇媽妈嫵妩嫗妪媯妫姍姗婁娄婭娅嬈娆嬌娇孌娈娛娱媧娲嫻娴嬰婴'
+    '嬋婵嬸婶媼媪嬡嫒嬪嫔嬙嫱孫孙學学孿孪寶宝實实寵宠審审憲宪宮宫寬宽賓宾寢寝對对尋寻導导壽寿將将爾尔塵尘嘗尝堯尧盡尽層层屆届'
+    '屍尸屜屉屬属屢屡屨屦嶼屿歲岁豈岂嶇岖崗岗峴岘嶴岙嵐岚島岛嶺岭嶽岳崠岽巋岿嶧峄峽峡嶠峤崢峥巒峦嶗崂崍崃嶄崭嶸嵘巔巅鞏巩幣币'
+    '帥帅師师幃帏帳帐簾帘幟帜帶带幀帧幫帮幬帱幗帼冪幂幹干乾干並并廣广莊庄慶庆廬庐廡庑庫库應应廟庙龐庞廢废開开異异棄弃張张彌弥'
+    '弳弪彎弯彈弹強强歸归當当錄录匯汇彙汇彥彦徹彻徑径徠徕憶忆懺忏憂忧愾忾懷怀態态慫怂憮怃慪怄悵怅愴怆憐怜總总懟怼懌怿戀恋懇恳'
+    '惡恶慟恸懨恹愷恺惻恻惱恼惲恽悅悦懸悬慳悭憫悯驚惊懼惧慘惨懲惩憊惫愜惬慚惭憚惮慣惯慍愠憤愤願愿懾慑戇戆戔戋戲戏戧戗戰战戦战'
+    '戩戬戶户撲扑執执擴扩捫扪掃扫揚扬擾扰撫抚拋抛摶抟摳抠掄抡搶抢護护報报擔担擬拟攏拢揀拣擁拥攔拦擰拧撥拨擇择掛挂摯挚攣挛撾挝'
+    '撻挞挾挟撓挠擋挡撟挢掙挣擠挤揮挥撏挦撈捞損损撿捡換换搗捣據据擄掳摑掴擲掷撣掸摻掺摜掼攬揽撳揿攙搀擱搁摟搂攪搅攜携攝摄攄摅'
+    '擺摆搖摇擯摈攤摊攖撄撐撑攆撵擷撷擼撸攛撺擻擞攢攒敵敌斂敛數数齋斋斕斓鬥斗斬斩斷断無无舊旧時时曠旷暘旸曇昙晝昼曨昽顯显晉晋'
+    '曬晒曉晓曄晔暈晕暉晖暫暂曖暧術术樸朴機机殺杀雜杂權权條条來来楊杨榪杩傑杰極极構构樅枞樞枢棗枣櫪枥梘枧棖枨槍枪楓枫梟枭櫃柜'
+    '檸柠檉柽梔栀柵栅標标棧栈櫛栉櫳栊棟栋櫨栌櫟栎欄栏樹树棲栖樣样欒栾椏桠橈桡楨桢檔档榿桤橋桥樺桦檜桧槳桨樁桩夢梦檮梼棶梾檢检'
+    '欞棂槨椁櫝椟槧椠槓杠欏椤橢椭樓楼欖榄櫬榇櫚榈櫸榉檟槚檻槛檳槟櫧槠橫横檣樯櫻樱櫫橥櫥橱櫓橹櫞橼檁檩歡欢歐欧殲歼殤殇殘残殞殒'
+    '殮殓殫殚殯殡毆殴毀毁轂毂畢毕斃毙氈毡毿毵氌氇氣气氫氢氬氩氳氲漢汉湯汤溝沟沒没灃沣漚沤瀝沥淪沦滄沧渢沨溈沩滬沪濘泞淚泪澩泶'
+    '瀧泷瀘泸濼泺瀉泻潑泼澤泽涇泾潔洁灑洒窪洼浹浃淺浅漿浆澆浇湞浈濁浊測测澮浍濟济瀏浏渾浑滸浒濃浓潯浔濤涛澇涝淶涞漣涟渦涡渙涣'
+    '滌涤潤润澗涧漲涨澀涩淵渊漬渍瀆渎漸渐澠渑漁渔瀋沈滲渗溫温遊游灣湾濕湿潰溃濺溅漵溆滎荥潷滗滯滞灩滟灄滠滿满瀅滢濾滤濫滥灤滦'
+    '濱滨灘滩澦滪瀠潆瀟潇瀲潋濰潍潛潜瀨濑瀾澜瀰弥灕漓滅灭燈灯靈灵災灾燦灿煬炀爐炉燉炖煒炜熗炝點点煉炼熾炽爍烁爛烂烴烃燭烛煙烟'
+    '煩烦燒烧燁烨燴烩燙烫燼烬熱热煥焕燜焖燾焘愛爱爺爷牘牍犛牦牽牵犧牺犢犊狀状獷犷猶犹狽狈猙狰獰狞獨独狹狭獅狮獪狯猻狲獄狱獵猎'
+    '獼猕玀猡豬猪貓猫蝟猬獻献獺獭璣玑瑪玛瑋玮環环現现璽玺瓏珑琿珲璉琏瑣琐瓊琼瑤瑶瓔璎甌瓯甕瓮畫画暢畅疇畴癤疖療疗瘧疟癘疠瘍疡'
+    '瘋疯皰疱痙痉癢痒癆痨痺痹瘂痖瘓痪瘞瘗瘡疮瘻瘘癟瘪癱瘫癮瘾癭瘿癩癞癬癣癲癫皚皑皺皱盞盏鹽盐監监蓋盖盜盗盤盘瞘眍睏困睜睁睞睐'
+    '瞼睑瞞瞒矚瞩矯矫磯矶礬矾礦矿碭砀碼码磚砖硨砗硯砚礪砺礱砻礫砾礎础碩硕硤硖磽硗確确鹼碱礙碍磣碜禮礼禕祎禰祢禍祸禎祯離离禿秃'
+    '種种積积稱称穢秽穠秾穩稳穀谷窮穷竊窃竅窍窯窑竄窜窩窝窺窥竇窦豎竖競竞筆笔筍笋箋笺籠笼箏筝籌筹簽签簡简籩笾箇个節节範范築筑'
+    '篩筛篤笃簣篑簍篓籃篮籬篱糴籴類类秈籼粵粤糞粪糧粮糲粝糝糁餱糇緊紧縶絷糾纠紆纡紅红紂纣纖纤紇纥約约級级紈纨纊纩紀纪紉纫緯纬'
+    '紜纭純纯紕纰紗纱綱纲納纳縱纵綸纶紛纷紙纸紋纹紡纺紐纽紓纾線线紺绀紲绁紱绂練练組组紳绅細细織织終终縐绉絆绊紼绋絀绌紹绍繹绎'
+    '經经紿绐綁绑絨绒結结絝绔繞绕絰绖絎绗繪绘給给絢绚絳绛絡络絕绝絞绞統统綆绠綃绡絹绢繡绣綌绤綏绥繼继綈绨績绩緒绪綾绫續续綺绮'
+    '緋绯綽绰緄绲繩绳維维綿绵綬绶繃绷綢绸綹绺綣绻綜综綻绽綰绾綠绿綴缀緇缁緙缂緗缃緘缄緬缅纜缆緹缇緲缈緝缉縕缊繢缋緦缌綞缍緞缎'
+    '緶缏緱缑縋缒緩缓締缔縷缕編编緡缗緣缘縉缙縛缚縟缛縝缜縫缝縗缞縞缟纏缠縭缡縊缢縑缣繽缤縹缥縵缦縲缧繆缪繅缫纓缨縮缩繚缭繒缯'
+    '繕缮繳缴纘缵罌罂網网羅罗罰罚罷罢羆罴羈羁羋芈羥羟翹翘耬耧聳耸恥耻聶聂聾聋職职聹聍聯联聵聩聰聪肅肃腸肠膚肤腎肾腫肿脹胀脅胁'
+    '膽胆勝胜朧胧臚胪脛胫膠胶脈脉膾脍髒脏臟脏臍脐腦脑膿脓臠脔腳脚脫脱腡脶臉脸臘腊醃腌膩腻靦腼騰腾臏膑輿舆艤舣艦舰艙舱艫舻艱艰'
+    '豔艳艷艳藝艺薌芗蕪芜蘆芦蓯苁葦苇藶苈莧苋萇苌蒼苍苧苎蘋苹莖茎蘢茏蔦茑塋茔煢茕繭茧荊荆薦荐莢荚蕘荛蓽荜蕎荞薈荟薺荠蕩荡榮荣'
+    '葷荤犖荦熒荧蕁荨藎荩蓀荪蔭荫蕒荬葒荭藥药蒞莅萊莱蓮莲蒔莳萵莴薟莶獲获穫获蕕莸瑩莹鶯莺蓴莼蘿萝螢萤營营縈萦蕭萧薩萨蔥葱蕆蒇'
+    '蕢蒉蔣蒋蔞蒌藍蓝薊蓟蘺蓠蕷蓣鎣蓥驀蓦薔蔷蘞蔹藺蔺藹蔼蘄蕲蘊蕴藪薮蘚藓蘇苏甦苏虜虏慮虑虛虚蟲虫虯虬蟣虮雖虽蝦虾蠆虿蝕蚀蟻蚁'
+    '螞蚂蠶蚕蠔蚝蜆蚬蠱蛊蠣蛎蟶蛏蠻蛮蟄蛰蛺蛱蟯蛲螄蛳蠐蛴蛻蜕蝸蜗蠟蜡蠅蝇蟈蝈蟬蝉蠍蝎螻蝼蠑蝾蟎螨釁衅銜衔補补襯衬袞衮襖袄褘袆'
+    '襪袜襲袭襏袯裝装襠裆褌裈褳裢襝裣褲裤裊袅嫋袅襇裥褸褛襤褴製制見见觀观規规覓觅視视覘觇覽览覺觉覬觊覡觋覿觌覥觍覦觎覯觏覲觐'
+    '覷觑觴觞觸触觶觯計计訂订訃讣認认譏讥訐讦訌讧討讨讓让訕讪訖讫訓训議议訊讯記记講讲諱讳謳讴詎讵訝讶訥讷許许訛讹論论訟讼諷讽'
+    '設设訪访訣诀證证詁诂訶诃評评詛诅識识詐诈訴诉診诊詆诋謅诌詞词詘诎詔诏譯译詒诒誆诓誄诔試试詿诖詩诗詰诘詼诙誠诚誅诛詵诜話话'
+    '誕诞詬诟詮诠詭诡詢询詣诣諍诤該该詳详詫诧諢诨詡诩誡诫誣诬語语誚诮誤误誥诰誘诱誨诲誑诳說说誦诵誒诶請请諸诸諏诹諾诺讀读諑诼'
+    '誹诽課课諉诿諛谀誰谁諗谂調调諂谄諒谅諄谆誶谇談谈誼谊謀谋諶谌諜谍謊谎諫谏諧谐謔谑謁谒謂谓諤谔諭谕諼谖讒谗諮谘諳谙諺谚諦谛'
+    '謎谜諞谝謨谟讜谠謖谡謝谢謠谣謗谤謚谥謙谦謐谧謹谨謾谩謫谪謬谬譚谭譖谮譙谯讕谰譜谱譎谲讞谳譴谴譫谵讖谶譽誉貝贝貞贞負负財财'
+    '貢贡貧贫貨货販贩貪贪貫贯責责貯贮貰贳貲赀貳贰貴贵貶贬貸贷貺贶費费貼贴貽贻貿贸賀贺賁贲賂赂賃赁賄贿賅赅資资賈贾賊贼賑赈賒赊'
+    '賕赇賙赒賚赉賜赐賞赏賠赔賡赓賢贤賤贱賦赋賧赕質质賬账賭赌賴赖賺赚賻赙購购賽赛賾赜贄贽贅赘贇赟贈赠贊赞贍赡贏赢贐赆贓赃贖赎'
+    '贗赝贛赣趙赵趕赶趨趋躉趸躍跃蹌跄跡迹蹺跷蹕跸躚跹躂跶蹤踪躊踌蹣蹒躡蹑躥蹿躦躜軀躯車车軋轧軌轨軒轩軔轫軟软軸轴軻轲軼轶軲轱'
+    '軺轺軹轵輕轻載载輊轾較较輔辅輒辄輛辆輦辇輩辈輝辉輥辊輞辋輟辍輪轮輯辑輸输轄辖輾辗轅辕轆辘轉转轍辙轎轿轟轰辭辞辯辩邊边遼辽'
+    '達达遷迁過过邁迈運运還还這这進进遠远違违連连遲迟邇迩逕迳適适選选遜逊遞递邐逦邏逻遺遗遙遥鄧邓鄺邝鄔邬郵邮鄒邹鄴邺鄰邻鬱郁'
+    '郟郏鄶郐鄭郑鄆郓酈郦鄖郧醞酝醱酦醬酱釅酽釃酾釀酿釋释裡里裏里鑒鉴鑾銮鏨錾針针釘钉釗钊釧钏釣钓釹钕釺钎鈣钙鈦钛鋇钡鈍钝鈔钞'
+    '鐘钟鍾钟鈉钠鋼钢鈑钣鈐钤鑰钥欽钦鈞钧鎢钨鉤钩鈕钮鈀钯鈺钰錢钱鉦钲鉗钳鉬钼鈷钴鉢钵鉛铅鉚铆鈾铀鉑铂鐵铁鉅钜鉸铰銬铐鉻铬鋁铝'
+    '銅铜銑铣銓铨銖铢銀银銃铳銘铭銨铵鋒锋鋪铺鍋锅鏽锈銷销鎖锁鋰锂鋤锄錯错錨锚錫锡鑼锣錘锤鎚锤錐锥錦锦鍵键鋸锯鍛锻鏢镖鏡镜鎮镇'
+    '鎬镐鐮镰鑲镶鈴铃長长門门閂闩閃闪閉闭問问闖闯閏闰閑闲閒闲間间閔闵悶闷閘闸鬧闹閨闺聞闻閩闽閭闾閥阀閣阁閡阂閱阅閻阎闊阔闡阐'
+    '闐阗闌阑闕阙闢辟闇暗隊队陽阳陰阴陣阵階阶際际陸陆隴陇陳陈陘陉陝陕隉陧隕陨險险隨随隱隐隸隶雋隽難难雛雏雞鸡霧雾霽霁靂雳靄霭'
+    '靚靓靜静靨靥韃鞑韁缰韉鞯韋韦韌韧韓韩韙韪韜韬頁页頂顶頃顷項项順顺須须頊顼頑顽顧顾頓顿頎颀頒颁頌颂頏颃預预顱颅領领頗颇頸颈'
+    '頡颉頰颊頜颌潁颍頦颏頹颓頷颔頻频顆颗題题額额顎颚顏颜顓颛顛颠顢颟顥颢顫颤顰颦顳颞顴颧風风颯飒颱台臺台颳刮颶飓飄飘飆飙飛飞'
+    '飢饥饑饥飩饨飪饪飫饫飭饬飯饭飲饮飴饴飼饲飽饱飾饰餃饺餅饼餌饵餉饷餒馁餓饿餚肴餞饯餡馅館馆餵喂餿馊饅馒饉馑饋馈饒饶饞馋饗飨'
+    '饜餍馬马馭驭馱驮馳驰馴驯駁驳駐驻駑驽駒驹駕驾駘骀駛驶駝驼駙驸駟驷駭骇駢骈駱骆驗验騁骋駿骏騎骑騏骐騙骗騷骚騮骝騶驺驅驱驃骠'
+    '騾骡驕骄驊骅驍骁驛驿驟骤驢驴驥骥驤骧驪骊骯肮髏髅髖髋鬆松鬍胡鬚须鬨哄鬩阋鬮阄魎魉魘魇魚鱼魯鲁魷鱿鮑鲍鮮鲜鯊鲨鯉鲤鯨鲸鱷鳄'
+    '鰐鳄鰭鳍鱗鳞鳥鸟鳩鸠鳴鸣鴉鸦鴨鸭鴦鸯鴻鸿鴿鸽鵝鹅鵑鹃鵡鹉鵬鹏鵲鹊鶴鹤鷹鹰鷲鹫鷗鸥鸚鹦鸞鸾鹹咸麥麦麩麸黃黄黴霉黷黩鼴鼹齊齐'
+    '齒齿齡龄齦龈齪龊齲龋龍龙龔龚龕龛龜龟兇凶恆恒電电檯台'
+)
+
+# 这些简体字同时是常用的繁体字或对应多个繁体字（如 皇后/以後、干涉/乾燥/幹部），转换为繁体时保持不变
+AMBIGUOUS_SIMPLIFIED = '后干里台余沈丑几斗范谷松胡凶吁咸霉困哄喂肴刮辟暗制郁朴'
+
+# 中文标题中统一使用全角的标点；其余全角ASCII字符（字母、数字、括号、连字符等）统一为半角
+FULL_WIDTH_PUNCTUATION = '：！？～'
+
+# 批量转换时连接各条译文的分隔符
+SEPARATOR = '\n'
+
+# 冲突: 标题键, 保留的 (来源, 英文标题, 译文), 舍弃的 (来源, 英文标题, 译文)
+Conflict = namedtuple('Conflict', 'key kept dropped')
+
+def build_translate_tables():
+    """构建各文字变体的 str.translate 转换表（模块导入时构建一次）"""
+    width = {code: code - 0xFEE0 for code in range(0xFF01, 0xFF5F)}
+    width[0x3000] = ' '
+    for char in FULL_WIDTH_PUNCTUATION:
+        del width[ord(char)]
+        width[ord(char) - 0xFEE0] = char
+
+    simplified = dict(width)
+    traditional = dict(width)
+    for i in range(0, len(CHARACTER_PAIRS), 2):
+        trad, simp = CHARACTER_PAIRS[i], CHARACTER_PAIRS[i + 1]
+        simplified.setdefault(ord(trad), simp)
+        if simp not in AMBIGUOUS_SIMPLIFIED:
+            traditional.setdefault(ord(simp), trad)
+    return {'zh-Hans': simplified, 'zh-Hant': traditional, 'zh': width}
+
+TRANSLATE_TABLES = build_translate_tables()
+
+def convert(text, variant=DEFAULT_VARIANT):
+    """把单条文本转换为指定的文字变体"""
+    return text.translate(TRANSLATE_TABLES[variant])
+
+def convert_all(texts, variant=DEFAULT_VARIANT):
+    """批量转换：连接成一个字符串后只调用一次 str.translate"""
+    texts = list(texts)
+    table = TRANSLATE_TABLES[variant]
+    if any(SEPARATOR in text for text in texts):
+        return [text.translate(table) for text in texts]
+    return SEPARATOR.join(texts).translate(table).split(SEPARATOR) if texts else []
+
+# 标题键中统一写法的标点，商标符号去掉（NFKC会把 ™ 变成 TM）
+KEY_PUNCTUATION_TABLE = str.maketrans({
+    '‘': "'", '’': "'", '`': "'", '´': "'", '“': '"', '”': '"',
+    '‐': '-', '‑': '-', '–': '-', '—': '-', '™': None, '®': None, '©': None,
+})
+# 标点前的空白
+SPACE_BEFORE_PUNCTUATION_PATTERN = re.compile(r'\s+([:;,.!?])')
+
+def title_key(title):
+    """翻译条目的键：NFKC、忽略大小写、统一标点和空白，不去掉任何词"""
+    title = unicodedata.normalize('NFKC', title.translate(KEY_PUNCTUATION_TABLE)).casefold()
+    return ' '.join(SPACE_BEFORE_PUNCTUATION_PATTERN.sub(r'\1', title).split())
+
+def load_translation_source(path):
+    """读取一个 英文标题→中文标题 的翻译文件"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if not isinstance(data, dict) or not all(isinstance(value, str) for value in data.values()):
+        raise ValueError(f"{path} 不是 英文标题→中文标题 的JSON对象")
+    return data
+
+class TranslationStore:
+    """按优先级合并的翻译库，译文已转换为同一种文字变体"""
+
+    def __init__(self, variant=DEFAULT_VARIANT):
+        if variant not in TRANSLATE_TABLES:
+            raise ValueError(f"不支持的文字变体: {variant}")
+        self.variant = variant
+        self.sources = []
+        # 标题键 -> [译文, 英文标题列表, 来源]
+        self.entries = {}
+        self.conflicts = []
+        # 转换后与原文不同的译文数
+        self.converted = 0
+
+    def add_source(self, name, translations):
+        """添加一个翻译来源；按优先级从高到低依次添加，先添加的来源优先"""
+        self.sources.append(name)
+        titles = list(translations)
+        originals = [translations[title] for title in titles]
+        texts = convert_all(originals, self.variant)
+        self.converted += sum(1 for original, text in zip(originals, texts) if original != text)
+
+        for title, text in zip(titles, texts):
+            key = title_key(title)
+            entry = self.entries.get(key)
+            if entry is None:
+                self.entries[key] = [text, [title], name]
+                continue
+            kept_text, kept_titles, kept_source = entry
+            if title not in kept_titles:
+                kept_titles.append(title)
+            if text != kept_text:
+                self.conflicts.append(Conflict(key, (kept_source, kept_titles[0], kept_text), (name, title, text)))
+
+    def translations(self):
+        """返回 英文标题→译文（每个来源中的英文写法都保留，指向同一条译文）"""
+        return {title: text for text, titles, _ in self.entries.values() for title in titles}
+
+    def save(self, path):
+        """按标题键保存合并结果（先写临时文件再替换）"""
+        data = {
+            'version': STORE_VERSION,
+            'variant': self.variant,
+            'sources': self.sources,
+            'translations': {key: {'Title_cn': text, 'Titles': titles, 'Source': source}
+                             for key, (text, titles, source) in sorted(self.entries.items())},
+        }
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, path)
+
+def is_store_data(data):
+    return isinstance(data, dict) and data.get('version') == STORE_VERSION and isinstance(data.get('translations'), dict)
+
+def load_translations(path):
+    """读取翻译文件，返回 英文标题→中文标题
+
+    可以是原始翻译文件，也可以是本工具保存的合并结果（直接使用已转换的译文）。
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if not is_store_data(data):
+        return data
+    return {title: entry['Title_cn'] for entry in data['translations'].values() for title in entry['Titles']}
+
+def build_store(sources, variant=DEFAULT_VARIANT):
+    """按顺序（优先级从高到低）合并多个翻译文件"""
+    store = TranslationStore(variant)
+    for path in sources:
+        store.add_source(os.path.basename(path), load_translation_source(path))
+    return store
+
+def main():
+    parser = argparse.ArgumentParser(description='合并多个翻译文件并统一简繁体和全角/半角')
+    parser.add_argument('--source', action='append', metavar='FILE',
+                        help='翻译文件，可指定多次，排在前面的优先（默认 xbox_translations.json）')
+    parser.add_argument('--variant', choices=VARIANTS, default=DEFAULT_VARIANT,
+                        help=f'输出的文字变体(默认 {DEFAULT_VARIANT})')
+    parser.add_argument('--output', help='合并结果文件（默认 xbox_translations.<变体>.json）')
+    parser.add_argument('--show-conflicts', type=int, default=10, metavar='N', help='显示前N个冲突')
+    parser.add_argument('--convert', nargs='+', metavar='TEXT', help='只转换给定的文本并输出')
+    args = parser.parse_args()
+
+    if args.convert:
+        for text in convert_all(args.convert, args.variant):
+            print(text)
+        return
+
+    sources = args.source or ['xbox_translations.json']
+    output = args.output or f'xbox_translations.{args.variant}.json'
+    try:
+        store = build_store(sources, args.variant)
+    except (OSError, ValueError) as e:
+        print(f"错误: {e}")
+        return
+    store.save(output)
+
+    titles = sum(len(titles) for _, titles, _ in store.entries.values())
+    print(f"来源: {', '.join(store.sources)}")
+    print(f"合并后 {len(store.entries)} 个标题（{titles} 种英文写法），转换为 {args.variant} 时改动 {store.converted} 条译文")
+    print(f"冲突: {len(store.conflicts)} 个（保留优先级高的来源）")
+    for conflict in store.conflicts[:args.show_conflicts]:
+        kept_source, kept_title, kept_text = conflict.kept
+        source, title, text = conflict.dropped
+        print(f"  {conflict.key}: 保留 {kept_text} ({kept_source}: {kept_title}), 舍弃 {text} ({source}: {title})")
+    print(f"合并结果已保存为: {output}")
+
+if __name__ == "__main__":
+    main()
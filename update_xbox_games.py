@@ -1,173 +1,284 @@
+import argparse
 import json
 import os
 
+from build_manifest import BuildManifest, record_hash
+from game_lists import load_game_list
+from instrumentation import add_profile_arguments, count, span, start_profiling
+from title_matcher import DEFAULT_MIN_SCORE, TitleTranslator
+from translation_store import load_translations
+
+# 增量读取JSON数组时每次读入的字符数
+JSON_CHUNK_SIZE = 64 * 1024
+
+def iter_txt_records(file_path):
+    """Yield (title_id, game_info) tuples from the shared parse of the tab-separated txt file"""
+    for record in load_game_list(file_path):
+        title_id = record.title_id.lower()  # Convert to lowercase for consistency with JSON
+        # 没有游戏名的行视为无效
+        if not record.title:
+            continue
+
+        yield title_id, {
+            'Title': record.title,
+            'Developer': record.developer,
+            'Publisher': '',  # 文件中没有Publisher列，设为空
+            'Category': record.category,
+            'Year': record.year
+        }
+
 def parse_txt_file(file_path):
     """Parse the txt file and return a dictionary with Title ID as key and game info as value"""
     data = {}
-    if os.path.exists(file_path):
-        with open(file_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-            
-            # Skip header line
-            for line in lines[1:]:
-                # Skip empty lines
-                if not line.strip():
-                    continue
-                    
-                # Split the line by tab, filter out empty strings caused by consecutive tabs
-                parts = [part.strip() for part in line.strip().split('\t') if part.strip()]
-                if len(parts) >= 5:
-                    title_id = parts[0].lower()  # Convert to lowercase for consistency with JSON
-                    game_name = parts[1]
-                    developer = parts[2]
-                    category = parts[3]
-                    year = parts[4]
-                    
-                    # Only add if Title ID is not already in the data (to avoid duplicates)
-                    if title_id and title_id not in data:
-                        data[title_id] = {
-                            'Title': game_name,
-                            'Developer': developer,
-                            'Publisher': '',  # 文件中没有Publisher列，设为空
-                            'Category': category,
-                            'Year': year
-                        }
-                elif len(parts) >= 4:
-                    # Handle cases where Year might be missing
-                    title_id = parts[0].lower()
-                    game_name = parts[1]
-                    developer = parts[2]
-                    category = parts[3]
-                    year = ''
-                    
-                    if title_id and title_id not in data:
-                        data[title_id] = {
-                            'Title': game_name,
-                            'Developer': developer,
-                            'Publisher': '',
-                            'Category': category,
-                            'Year': year
-                        }
+    for title_id, game_info in iter_txt_records(file_path):
+        # Only add if Title ID is not already in the data (to avoid duplicates)
+        if title_id not in data:
+            data[title_id] = game_info
     return data
 
-def update_xbox_games_with_chinese_titles():
-    # 定义文件路径
-    games_file = 'xbox360_games.json'
-    translations_file = 'xbox_translations.json'
-    txt_file1 = 'xbox360.txt'
-    txt_file2 = 'xbox360live.txt'
-    output_file = 'xbox360_games_updated.json'
-    
-    # 读取游戏数据
-    with open(games_file, 'r', encoding='utf-8') as f:
-        games_data = json.load(f)
-    
-    # 读取翻译数据
-    with open(translations_file, 'r', encoding='utf-8') as f:
-        translations_data = json.load(f)
-    
-    # 读取txt文件中的游戏信息
+def iter_json_array(file_path, chunk_size=JSON_CHUNK_SIZE):
+    """逐个产出顶层JSON数组中的元素，不把整个文件解析进内存"""
+    decoder = json.JSONDecoder()
+    with open(file_path, 'r', encoding='utf-8') as f:
+        buffer = f.read(chunk_size).lstrip()
+        if not buffer.startswith('['):
+            raise ValueError(f"{file_path} 不是JSON数组")
+        buffer = buffer[1:]
+        eof = False
+
+        while True:
+            buffer = buffer.lstrip().lstrip(',').lstrip()
+            if buffer.startswith(']'):
+                return
+            try:
+                item, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                # 当前缓冲区中的元素不完整，继续读取
+                if eof:
+                    raise
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buffer += chunk
+                continue
+            yield item
+            buffer = buffer[end:]
+
+def iter_games(file_path):
+    """按扩展名读取游戏列表：.ndjson 按行读取，其他按JSON数组增量读取"""
+    if file_path.endswith('.ndjson'):
+        with open(file_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    else:
+        yield from iter_json_array(file_path)
+
+class MergedGameWriter:
+    """增量写出合并后的游戏数据，支持紧凑JSON数组和NDJSON两种格式
+
+    先写入临时文件，关闭时再替换目标文件，中途失败不会留下半个输出文件。
+    """
+
+    def __init__(self, output_file, output_format='json'):
+        if output_format not in ('json', 'ndjson'):
+            raise ValueError(f"不支持的输出格式: {output_format}")
+        self.output_file = output_file
+        self.output_format = output_format
+        self.count = 0
+        self._tmp_file = output_file + '.tmp'
+        self._f = None
+
+    def __enter__(self):
+        self._f = open(self._tmp_file, 'w', encoding='utf-8')
+        if self.output_format == 'json':
+            self._f.write('[')
+        return self
+
+    def write(self, game):
+        line = json.dumps(game, ensure_ascii=False, separators=(',', ':'))
+        if self.output_format == 'json':
+            self._f.write(',\n' if self.count else '\n')
+            self._f.write(line)
+        else:
+            self._f.write(line + '\n')
+        self.count += 1
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.output_format == 'json':
+            self._f.write('\n]\n')
+        self._f.close()
+        if exc_type is None:
+            os.replace(self._tmp_file, self.output_file)
+        else:
+            os.remove(self._tmp_file)
+        return False
+
+def merge_game(game, translations_data, txt_game_info):
+    """为一个已有游戏补充中文标题和txt中的Developer/Category/Year，返回是否补充了txt信息"""
+    # 添加中文标题（如果没有找到翻译，则使用英文标题作为默认值）
+    english_title = game.get('Title')
+    game['Title_cn'] = translations_data.get(english_title, english_title)
+
+    if not txt_game_info:
+        return False
+
+    developer = txt_game_info.get('Developer')
+    category = txt_game_info.get('Category')
+    year = txt_game_info.get('Year')
+
+    # 检查是否需要更新Developer
+    needs_developer = developer and (game.get('Developer') == '???' or not game.get('Developer'))
+    # 检查是否需要添加Category
+    needs_category = category and ('Category' not in game or not game.get('Category'))
+    # 检查是否需要添加Year
+    needs_year = year and ('Year' not in game or not game.get('Year'))
+
+    # 更新Developer信息
+    if needs_developer:
+        game['Developer'] = developer
+    # 添加Category信息
+    if needs_category:
+        game['Category'] = category
+    # 添加Year信息
+    if needs_year:
+        game['Year'] = year
+
+    return bool(needs_developer or needs_category or needs_year)
+
+def build_new_game(title_id, txt_game_info, translations_data):
+    """根据txt文件中有但JSON中没有的游戏创建新条目"""
+    title = txt_game_info['Title']
+    new_game = {
+        'Platform': 'Xbox 360',
+        'Title ID': title_id,  # Keep the lowercase format
+        'Title': title,
+        'Developer': txt_game_info['Developer'],
+        'Publisher': txt_game_info['Publisher'],
+        # 添加中文标题（如果有）
+        'Title_cn': translations_data.get(title, title)
+    }
+
+    # 添加Category和Year
+    if txt_game_info['Category']:
+        new_game['Category'] = txt_game_info['Category']
+    if txt_game_info['Year']:
+        new_game['Year'] = txt_game_info['Year']
+    return new_game
+
+def update_xbox_games_with_chinese_titles(games_file='xbox360_games.json',
+                                          translations_file='xbox_translations.json',
+                                          txt_files=('xbox360.txt', 'xbox360live.txt'),
+                                          output_file='xbox360_games_updated.json',
+                                          output_format='json',
+                                          manifest=None,
+                                          force=False,
+                                          fuzzy=True,
+                                          min_score=DEFAULT_MIN_SCORE):
+    """单次流式合并：游戏JSON逐条读取、按Title ID与txt索引连接后立即写出
+
+    传入manifest时，若所有输入和输出文件与上次运行一致则直接跳过。
+    fuzzy为True时，标题不在翻译表中会再做模糊匹配（置信度不低于min_score才采用）。
+    """
+    tracked_files = [games_file, translations_file, *txt_files, output_file]
+    options = {'fuzzy': fuzzy, 'min_score': min_score}
+    if manifest is not None and not force:
+        unchanged, _ = manifest.files_unchanged('merge', tracked_files, options)
+        if unchanged:
+            print(f"输入文件未变化，跳过合并: {output_file}")
+            return
+
+    # 读取翻译数据（原始翻译文件，或 translation_store.py 合并、转换好的结果）
+    with span('load_translations'):
+        translations_data = TitleTranslator(load_translations(translations_file), min_score, fuzzy)
+        count('translations_loaded', len(translations_data.translations))
+
+    # 建立txt文件的Title ID索引（后面的文件覆盖前面的文件）
     txt_data = {}
-    txt_data.update(parse_txt_file(txt_file1))
-    txt_data.update(parse_txt_file(txt_file2))
-    
-    # 创建一个以Title ID为键的现有游戏字典，方便查找
-    existing_games = {}
-    for game in games_data:
-        title_id = game.get('Title ID')
-        if title_id:
-            existing_games[title_id.lower()] = game
-    
+    with span('parse_txt'):
+        for txt_file in txt_files:
+            txt_data.update(parse_txt_file(txt_file))
+        count('txt_records', len(txt_data))
+
     # 为每个游戏添加中文标题和额外信息
     updated_count = 0
     category_year_added_count = 0
-    
-    # 先处理已有的游戏
-    for game in games_data:
-        # 添加中文标题
-        english_title = game.get('Title')
-        if english_title in translations_data:
-            game['Title_cn'] = translations_data[english_title]
-            updated_count += 1
-        else:
-            # 如果没有找到翻译，则使用英文标题作为默认值
-            game['Title_cn'] = english_title
-            
-        # 添加Developer、Category和Year信息（如果有）
-        title_id = game.get('Title ID')
-        if title_id:
-            # Convert to lowercase for consistency with txt files
-            title_id_lower = title_id.lower()
-            if title_id_lower in txt_data:
-                txt_game_info = txt_data[title_id_lower]
-                developer = txt_game_info.get('Developer')
-                category = txt_game_info.get('Category')
-                year = txt_game_info.get('Year')
-                
-                # 检查是否需要更新Developer
-                needs_developer = developer and (game.get('Developer') == '???' or not game.get('Developer'))
-                # 检查是否需要添加Category
-                needs_category = category and ('Category' not in game or not game.get('Category'))
-                # 检查是否需要添加Year
-                needs_year = year and ('Year' not in game or not game.get('Year'))
-                
-                # 更新Developer信息
-                if needs_developer:
-                    game['Developer'] = developer
-                # 添加Category信息
-                if needs_category:
-                    game['Category'] = category
-                # 添加Year信息
-                if needs_year:
-                    game['Year'] = year
-                    
-                # Count this as adding category/year info only if at least one was added
-                if needs_developer or needs_category or needs_year:
-                    category_year_added_count += 1
-    
-    # 添加txt文件中有但JSON中没有的游戏
-    new_games_count = 0
-    for title_id, txt_game_info in txt_data.items():
-        if title_id not in existing_games:
-            # 创建新游戏条目
-            new_game = {
-                'Platform': 'Xbox 360',
-                'Title ID': title_id,  # Keep the lowercase format
-                'Title': txt_game_info['Title'],
-                'Developer': txt_game_info['Developer'],
-                'Publisher': txt_game_info['Publisher']
-            }
-            
-            # 添加中文标题（如果有）
+    seen_ids = set()
+    record_hashes = {}
+
+    with span('merge'), MergedGameWriter(output_file, output_format) as writer:
+        # 先处理已有的游戏
+        for game in iter_games(games_file):
+            title_id = (game.get('Title ID') or '').lower()
+            if title_id:
+                seen_ids.add(title_id)
+
+            if merge_game(game, translations_data, txt_data.get(title_id)):
+                category_year_added_count += 1
+            if game.get('Title') in translations_data:
+                updated_count += 1
+            writer.write(game)
+            if manifest is not None and title_id:
+                record_hashes[title_id] = record_hash(game)
+
+        # 添加txt文件中有但JSON中没有的游戏
+        new_games_count = 0
+        for title_id, txt_game_info in txt_data.items():
+            if title_id in seen_ids:
+                continue
+            new_game = build_new_game(title_id, txt_game_info, translations_data)
             if txt_game_info['Title'] in translations_data:
-                new_game['Title_cn'] = translations_data[txt_game_info['Title']]
                 updated_count += 1
-            else:
-                new_game['Title_cn'] = txt_game_info['Title']
-            
-            # 添加Category和Year
-            if txt_game_info['Category']:
-                new_game['Category'] = txt_game_info['Category']
-            if txt_game_info['Year']:
-                new_game['Year'] = txt_game_info['Year']
-            
-            # 添加到游戏列表
-            games_data.append(new_game)
+            writer.write(new_game)
+            if manifest is not None:
+                record_hashes[title_id] = record_hash(new_game)
             new_games_count += 1
-    
+
+    count('records_processed', writer.count)
+    count('bytes_written', os.path.getsize(output_file))
+
     # Update count for category/year additions (we counted new games as having category/year added)
     category_year_added_count += new_games_count
-    
-    # 保存更新后的数据
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(games_data, f, ensure_ascii=False, indent=4)
-    
-    print(f"处理完成！总共处理了 {len(games_data)} 个游戏，其中:")
-    print(f"- 原始游戏数量: {len(existing_games)}")
+
+    print(f"处理完成！总共处理了 {writer.count} 个游戏，其中:")
+    print(f"- 原始游戏数量: {len(seen_ids)}")
     print(f"- 新增游戏数量: {new_games_count}")
     print(f"- 添加了中文标题的游戏: {updated_count} 个")
     print(f"- 添加了 Category 和/或 Year 信息的游戏: {category_year_added_count} 个")
+    if translations_data.fuzzy_matches:
+        print(f"- 其中模糊匹配的标题: {len(translations_data.fuzzy_matches)} 个")
+        for title, (key, score) in sorted(translations_data.fuzzy_matches.items(),
+                                          key=lambda item: item[1][1])[:5]:
+            print(f"    {title} -> {key} (置信度 {score:.2f})")
     print(f"更新后的文件已保存为: {output_file}")
 
+    if manifest is not None:
+        changed, removed = manifest.diff_records('merge', record_hashes)
+        print(f"- 与上次运行相比: 变化 {len(changed)} 个, 删除 {len(removed)} 个")
+        _, file_hashes = manifest.files_unchanged('merge', tracked_files, options)
+        manifest.update('merge', file_hashes, record_hashes)
+        manifest.save()
+
+def main():
+    parser = argparse.ArgumentParser(description='合并Xbox 360游戏数据、txt信息和中文标题')
+    parser.add_argument('--format', choices=('json', 'ndjson'), default='json',
+                        help='输出格式：紧凑JSON数组(默认)或NDJSON')
+    parser.add_argument('--output', help='输出文件（默认 xbox360_games_updated.json / .ndjson）')
+    parser.add_argument('--translations', default='xbox_translations.json',
+                        help='翻译文件，可以是 translation_store.py 生成的合并结果(默认 xbox_translations.json)')
+    parser.add_argument('--force', action='store_true', help='忽略构建清单，强制完整重建')
+    parser.add_argument('--no-fuzzy', action='store_true', help='只使用精确标题匹配翻译')
+    parser.add_argument('--min-score', type=float, default=DEFAULT_MIN_SCORE,
+                        help=f'模糊匹配的最低置信度(默认 {DEFAULT_MIN_SCORE})')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    start_profiling(args, 'update_xbox_games')
+
+    output_file = args.output or ('xbox360_games_updated.ndjson' if args.format == 'ndjson'
+                                  else 'xbox360_games_updated.json')
+    update_xbox_games_with_chinese_titles(translations_file=args.translations,
+                                          output_file=output_file, output_format=args.format,
+                                          manifest=BuildManifest(), force=args.force,
+                                          fuzzy=not args.no_fuzzy, min_score=args.min_score)
+
 if __name__ == "__main__":
-    update_xbox_games_with_chinese_titles()
\ No newline at end of file
+    main()
@@ -1,21 +1,64 @@
-import json
-
-# 读取更新后的游戏数据
-with open('xbox360_games_updated.json', 'r', encoding='utf-8') as f:
-    games_data = json.load(f)
-
-print('Total games:', len(games_data))
-print('\nFirst 10 games with Developer info:')
-for i in range(min(10, len(games_data))):
-    game = games_data[i]
-    print(f'Title: {game["Title"]} | Developer: {game["Developer"]}')
-
-# 查找一些特定游戏验证Developer字段
-print('\nSpecific game examples:')
-game_titles = ['Air Conflicts: Secret Wars', 'Zoids Assault', 'Operation Darkness(NA)']
-for game in games_data:
-    if game["Title"] in game_titles:
-        developer = game.get("Developer", "N/A")
-        category = game.get("Category", "N/A")
-        year = game.get("Year", "N/A")
-        print(f'Title: {game["Title"]} | Developer: {developer} | Category: {category} | Year: {year}')
+import argparse
+import os
+from itertools import islice
+
+# 与 title_index.INDEX_FILE 相同；在这里定义，启动时不导入title_index及其依赖
+INDEX_FILE = 'xbox360_titles.idx'
+
+# 需要验证Developer字段的游戏: Title ID -> 标题
+SPECIFIC_GAMES = {
+    '413307d3': 'Air Conflicts: Secret Wars',
+    '415407d1': 'Zoids Assault',
+    '415407d2': 'Operation Darkness',
+}
+
+def field(game, name):
+    """字段值，缺少或为空时显示N/A（二进制索引把缺少的字段存为空字符串）"""
+    return game.get(name) or 'N/A'
+
+def print_game(game):
+    print(f'Title: {game["Title"]} | Developer: {field(game, "Developer")} | '
+          f'Category: {field(game, "Category")} | Year: {field(game, "Year")}')
+
+def print_report(total, first_games, get):
+    """两种数据来源使用相同的输出：按TitleId排序的前10个游戏和按TitleId查找的特定游戏"""
+    print('Total games:', total)
+    print('\nFirst 10 games with Developer info (by Title ID):')
+    for game in first_games:
+        print(f'Title: {game["Title"]} | Developer: {field(game, "Developer")}')
+
+    # 查找一些特定游戏验证Developer字段
+    print('\nSpecific game examples:')
+    for title_id in SPECIFIC_GAMES:
+        game = get(title_id)
+        if game is not None:
+            print_game(game)
+
+def verify_with_index(index_file):
+    # 使用二进制索引，按TitleId直接查找，无需解析JSON
+    from title_index import TitleIndex
+
+    with TitleIndex(index_file) as index:
+        print_report(len(index), islice(index, 10), index.get)
+
+def verify_with_catalog(games_file):
+    # 读取更新后的游戏数据（列式目录，按TitleId主索引查找）
+    from catalog import Catalog
+
+    catalog = Catalog.load(games_file)
+    first_games = (catalog.row(row) for row in catalog.sorted_rows[:10])
+    print_report(len(catalog), first_games, catalog.get)
+
+def main():
+    parser = argparse.ArgumentParser(description='检查合并后游戏数据的Developer字段')
+    parser.add_argument('--games', default='xbox360_games_updated.json', help='合并后的游戏数据（JSON或.ndjson）')
+    parser.add_argument('--index', default=INDEX_FILE, help='TitleId二进制索引（存在时优先使用）')
+    args = parser.parse_args()
+
+    if os.path.exists(args.index):
+        verify_with_index(args.index)
+    else:
+        verify_with_catalog(args.games)
+
+if __name__ == "__main__":
+    main()
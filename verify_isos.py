@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ISO镜像校验工具
+对照Redump datfile（xbox_games.db 中的 RedumpDiscs 表，由 import_redump_dat.py 导入）校验目录中的 .iso 文件：
+先用内存中的 大小→候选光盘 索引做大小预检，不可能匹配的文件不计算哈希；
+其余文件用进程池并行处理，每个文件只读一遍（尽量使用mmap），同时计算 CRC32/MD5/SHA1。
+datfile中三个哈希齐全且一致的为 verified；条目只有部分哈希时报告为 partial（未完整校验），
+没有任何哈希的条目不能用来校验。
+
+用法:
+    python verify_isos.py verify <ISO目录> [--db xbox_games.db] [--datfile datfile.zip] [--workers N]
+"""
+
+import argparse
+import hashlib
+import mmap
+import os
+import sqlite3
+import sys
+import zlib
+
+from instrumentation import add_profile_arguments, count, span, start_profiling
+
+# 每次送入哈希计算的字节数
+HASH_CHUNK_SIZE = 16 * 1024 * 1024
+
+# 与 hash_file 返回值及索引中哈希的顺序一致
+HASH_NAMES = ('crc', 'md5', 'sha1')
+
+def load_size_index(db_file='xbox_games.db', datfile_path=None):
+    """构建 大小 -> [(GameName, RomName, Crc, Md5, Sha1), ...] 索引
+
+    优先读取数据库中的RedumpDiscs表，没有时直接流式解析datfile。
+    """
+    rows = None
+    if datfile_path is None and os.path.exists(db_file):
+        conn = sqlite3.connect(db_file)
+        try:
+            rows = conn.execute(
+                'SELECT GameName, RomName, Size, Crc, Md5, Sha1 FROM RedumpDiscs WHERE Size IS NOT NULL').fetchall()
+        except sqlite3.OperationalError:
+            rows = None
+        finally:
+            conn.close()
+
+    if rows is None:
+        from import_redump_dat import find_default_datfile, iter_datfile, open_datfile
+
+        datfile_path = datfile_path or find_default_datfile()
+        if not datfile_path:
+            raise FileNotFoundError("数据库中没有RedumpDiscs表，也找不到Redump datfile")
+        with open_datfile(datfile_path) as stream:
+            rows = [(game_name, rom_name, size, crc, md5, sha1)
+                    for game_name, _, rom_name, size, crc, md5, sha1 in iter_datfile(stream)
+                    if size is not None]
+
+    size_index = {}
+    for game_name, rom_name, size, crc, md5, sha1 in rows:
+        size_index.setdefault(size, []).append((game_name, rom_name, crc, md5, sha1))
+    return size_index
+
+def hash_file(file_path):
+    """单遍读取文件，同时计算CRC32/MD5/SHA1，返回 (crc, md5, sha1) 小写十六进制"""
+    crc = 0
+    md5 = hashlib.md5()
+    sha1 = hashlib.sha1()
+
+    with open(file_path, 'rb') as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            mapped = None
+
+        if mapped is not None:
+            with mapped, memoryview(mapped) as view:
+                for start in range(0, len(view), HASH_CHUNK_SIZE):
+                    chunk = view[start:start + HASH_CHUNK_SIZE]
+                    crc = zlib.crc32(chunk, crc)
+                    md5.update(chunk)
+                    sha1.update(chunk)
+                    chunk.release()
+        else:
+            # 无法映射（如空文件或32位系统上的大文件）时分块读取
+            buffer = bytearray(HASH_CHUNK_SIZE)
+            view = memoryview(buffer)
+            while True:
+                read = f.readinto(buffer)
+                if not read:
+                    break
+                crc = zlib.crc32(view[:read], crc)
+                md5.update(view[:read])
+                sha1.update(view[:read])
+
+    return f'{crc & 0xFFFFFFFF:08x}', md5.hexdigest(), sha1.hexdigest()
+
+def find_iso_files(directory):
+    """递归查找目录中的 .iso 文件"""
+    for root, _, files in os.walk(directory):
+        for name in sorted(files):
+            if name.lower().endswith('.iso'):
+                yield os.path.join(root, name)
+
+def match_hashes(hashes, candidates):
+    """在同大小的候选光盘中查找哈希一致的条目，返回 (状态, 光盘名称, 比较过的哈希名)，没有时返回None
+
+    datfile中缺少的哈希不参与比较，但至少要有一个哈希存在且一致：
+    三个哈希都一致为 verified，条目只有部分哈希且都一致为 partial。
+    """
+    partial = None
+    for game_name, _, *expected in candidates:
+        checked = [name for name, value in zip(HASH_NAMES, expected) if value]
+        if not checked or any(value and value != actual for value, actual in zip(expected, hashes)):
+            continue
+        if len(checked) == len(HASH_NAMES):
+            return 'verified', game_name, checked
+        if partial is None:
+            partial = ('partial', game_name, checked)
+    return partial
+
+def verify_directory(directory, db_file='xbox_games.db', datfile_path=None, workers=None):
+    """校验目录中的全部ISO，返回 {文件路径: (状态, 说明)}"""
+    with span('load_size_index'):
+        size_index = load_size_index(db_file, datfile_path)
+    results = {}
+
+    # 大小预检：没有同大小候选的文件直接判定为未知，不计算哈希
+    to_hash = []
+    for file_path in find_iso_files(directory):
+        size = os.path.getsize(file_path)
+        if size in size_index:
+            to_hash.append(file_path)
+        else:
+            results[file_path] = ('unknown', '没有相同大小的Redump光盘')
+
+    print(f"找到 {len(to_hash) + len(results)} 个ISO，其中 {len(to_hash)} 个需要计算哈希")
+
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    with span('hash'), ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(hash_file, file_path): file_path for file_path in to_hash}
+        for future in as_completed(futures):
+            file_path = futures[future]
+            try:
+                hashes = future.result()
+            except OSError as e:
+                results[file_path] = ('error', f'读取失败: {e}')
+                continue
+            count('files_hashed')
+            count('bytes_hashed', os.path.getsize(file_path))
+            candidates = size_index[os.path.getsize(file_path)]
+            match = match_hashes(hashes, candidates)
+            if match:
+                status, game_name, checked = match
+                if status == 'partial':
+                    game_name = f"{game_name}（datfile中只有 {'/'.join(checked)}，未完整校验）"
+                results[file_path] = (status, game_name)
+            elif not any(any(disc[2:]) for disc in candidates):
+                results[file_path] = ('unknown', '相同大小的Redump光盘都没有哈希，无法校验')
+            else:
+                results[file_path] = ('mismatch', f'哈希不匹配 (crc={hashes[0]} sha1={hashes[2]})')
+            print(f"[{results[file_path][0]}] {os.path.basename(file_path)}")
+
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='对照Redump datfile校验Xbox 360 ISO镜像')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    verify_parser = subparsers.add_parser('verify', help='校验目录中的ISO文件')
+    verify_parser.add_argument('directory', help='ISO所在目录（递归查找）')
+    verify_parser.add_argument('--db', default='xbox_games.db', help='包含RedumpDiscs表的数据库')
+    verify_parser.add_argument('--datfile', help='直接使用datfile(.dat/.zip)，不读取数据库')
+    verify_parser.add_argument('--workers', type=int, help='并行进程数（默认CPU核心数）')
+    add_profile_arguments(verify_parser)
+    args = parser.parse_args()
+    start_profiling(args, 'verify_isos')
+
+    if not os.path.isdir(args.directory):
+        print(f"错误: 找不到目录 {args.directory}")
+        sys.exit(2)
+
+    try:
+        results = verify_directory(args.directory, args.db, args.datfile, args.workers)
+    except FileNotFoundError as e:
+        print(f"错误: {e}")
+        sys.exit(2)
+
+    counts = {}
+    print("\n校验结果:")
+    print("=" * 60)
+    for file_path, (status, detail) in sorted(results.items()):
+        counts[status] = counts.get(status, 0) + 1
+        print(f"{status:>8}: {file_path} - {detail}")
+    print("=" * 60)
+    print(f"通过: {counts.get('verified', 0)}, 部分校验: {counts.get('partial', 0)}, 不匹配: {counts.get('mismatch', 0)}, "
+          f"未知: {counts.get('unknown', 0)}, 错误: {counts.get('error', 0)}")
+
+    if counts.get('mismatch') or counts.get('error'):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
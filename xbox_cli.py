@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Xbox 360 游戏数据工具统一入口
+各子命令对应仓库中的一个脚本，参数与直接运行该脚本相同。
+子命令的模块只在调用时才导入（本文件只导入标准库的argparse/importlib/os/sys），
+--help 和不带子命令的调用不会加载任何数据处理模块或数据文件。
+
+用法:
+    python xbox_cli.py [--root DIR] <子命令> [参数...]
+    python xbox_cli.py merge --no-fuzzy
+    python xbox_cli.py import --force
+    python xbox_cli.py lua --mode range
+    python xbox_cli.py analyze --json
+    python xbox_cli.py verify
+    python xbox_cli.py lua --help
+"""
+
+import argparse
+import importlib
+import os
+import sys
+
+# 子命令 -> (模块, 说明)；模块需提供 main()，在调用子命令时才导入
+COMMANDS = {
+    'merge': ('update_xbox_games', '合并游戏数据、txt信息和中文标题'),
+    'import': ('import_xbox_data', '把合并后的数据导入SQLite数据库'),
+    'lua': ('generate_lua_filters', '生成Aurora Lua过滤器'),
+    'analyze': ('analyze_xbox_data', '数据库统计报告'),
+    'verify': ('verify_developer', '检查合并后游戏数据的Developer字段'),
+    'verify-isos': ('verify_isos', '对照Redump datfile校验ISO镜像'),
+    'datfile': ('import_redump_dat', '导入Redump datfile'),
+    'match': ('match_redump_titles', '把Redump光盘名称匹配到TitleId'),
+    'search': ('search_xbox_games', '全文搜索游戏'),
+    'index': ('title_index', 'TitleId二进制索引导出与查询'),
+    'delta': ('catalog_delta', '游戏目录增量补丁'),
+    'translations': ('translation_store', '合并多个翻译文件并统一简繁体和全角/半角'),
+    'localize': ('apply_content_localization', '批量本地化Aurora content.db'),
+    'serve': ('lookup_server', '本地游戏信息查询服务'),
+    'pipeline': ('run_pipeline', '按依赖关系运行完整处理流水线'),
+}
+
+# 默认以程序所在目录（而不是当前目录）为数据目录的子命令，--root 作为参数传给它们
+ROOT_OPTION_COMMANDS = ('lua', 'pipeline')
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='Xbox 360 游戏数据工具',
+                                     epilog='子命令的参数见: %(prog)s <子命令> --help')
+    parser.add_argument('--root', metavar='DIR',
+                        help='数据文件所在目录（各子命令的相对路径以此为准，默认当前目录）')
+    subparsers = parser.add_subparsers(dest='command', metavar='<子命令>')
+    for name, (_, help_text) in COMMANDS.items():
+        # 子命令的参数（包括 --help）原样交给对应模块的 main() 解析
+        subparsers.add_parser(name, help=help_text, add_help=False)
+    return parser
+
+def run_command(name, argv, prog=None):
+    """导入子命令的模块并以argv作为命令行参数运行其main()"""
+    module_name, _ = COMMANDS[name]
+    module = importlib.import_module(module_name)
+    saved_argv = sys.argv
+    # 模块内的argparse以 sys.argv[0] 作为程序名，使用法提示显示为 "xbox_cli.py <子命令>"
+    sys.argv = [f"{prog or os.path.basename(saved_argv[0])} {name}"] + list(argv)
+    try:
+        return module.main()
+    finally:
+        sys.argv = saved_argv
+
+def main(argv=None):
+    parser = build_parser()
+    args, rest = parser.parse_known_args(argv)
+    if args.command is None:
+        if rest:
+            parser.error(f"无法识别的参数: {' '.join(rest)}")
+        parser.print_help()
+        return
+
+    if args.root:
+        if not os.path.isdir(args.root):
+            parser.error(f"找不到数据目录 {args.root}")
+        if args.command in ROOT_OPTION_COMMANDS:
+            rest = ['--root', os.path.abspath(args.root)] + rest
+        os.chdir(args.root)
+    # 子命令模块都是仓库根目录下的脚本，从其他目录运行时也能导入
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    if script_dir not in sys.path:
+        sys.path.insert(0, script_dir)
+    run_command(args.command, rest, parser.prog)
+
+if __name__ == "__main__":
+    main()